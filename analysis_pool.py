@@ -0,0 +1,154 @@
+import os
+import atexit
+import threading
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Tuple
+import numpy as np
+from indicator_engine import IndicatorEngine, INDICATORS, HIGH, LOW, CLOSE, VOLUME
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Kline columns copied into shared memory, one (symbols, candles) plane each
+SHARED_COLUMNS = (HIGH, LOW, CLOSE, VOLUME)
+
+# Worker-process state: the attached shared block and engines by settings
+_worker_block = None
+_worker_engines = {}
+
+def _attach(name: str) -> SharedMemory:
+    global _worker_block
+
+    if _worker_block is None or _worker_block.name != name:
+        # The parent replaced the block with a larger one
+        if _worker_block is not None:
+            _worker_block.close()
+        _worker_block = SharedMemory(name=name)
+    return _worker_block
+
+def _score_shard(name: str, shape: Tuple[int, int, int], start: int, end: int, settings: Tuple) -> np.ndarray:
+    """Runs in a worker: indicators for rows start:end of the shared planes, as an (indicators, rows) array"""
+    planes = np.ndarray(shape, dtype=np.float64, buffer=_attach(name).buf)
+    engine = _worker_engines.get(settings)
+    if engine is None:
+        engine = _worker_engines[settings] = IndicatorEngine(**dict(settings))
+    values = engine.compute_columns(*(plane[start:end] for plane in planes))
+    return np.stack([values[name] for name in INDICATORS])
+
+class AnalysisPool:
+    """Persistent worker processes that score shards of a candle matrix held in shared memory"""
+
+    def __init__(self, processes: int = None):
+        self.processes = processes or Config.ANALYSIS_PROCESSES or os.cpu_count() or 1
+        self.block = None
+        self.passes = 0
+        self.shards = 0
+        self.failures = 0
+
+        self._executor = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _planes(self, symbols: int, candles: int) -> np.ndarray:
+        """(columns, symbols, candles) array backed by the shared block, grown when too small"""
+        shape = (len(SHARED_COLUMNS), symbols, candles)
+        size = int(np.prod(shape)) * 8
+        if self.block is None or self.block.size < size:
+            self._release_block()
+            # Headroom so a slowly growing universe does not reallocate every cycle
+            self.block = SharedMemory(create=True, size=size * 2)
+        return np.ndarray(shape, dtype=np.float64, buffer=self.block.buf)
+
+    def _release_block(self):
+        if self.block is not None:
+            self.block.close()
+            self.block.unlink()
+            self.block = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs Flask and websocket threads is not safe
+            self._executor = ProcessPoolExecutor(max_workers=self.processes,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def score(self, arrays: List[np.ndarray], settings: Dict) -> Dict[str, np.ndarray]:
+        """Indicators for equal-length kline arrays, computed in shards across the workers"""
+        with self._lock:
+            planes = self._planes(len(arrays), len(arrays[0]))
+            # Only the four columns the indicators read are copied, straight into shared memory
+            for plane, column in zip(planes, SHARED_COLUMNS):
+                np.stack([klines[:, column] for klines in arrays], out=plane)
+
+            bounds = np.linspace(0, len(arrays), self.processes + 1).astype(int)
+            settings_key = tuple(sorted(settings.items()))
+            executor = self._get_executor()
+            try:
+                futures = [
+                    executor.submit(_score_shard, self.block.name, planes.shape, int(start), int(end), settings_key)
+                    for start, end in zip(bounds[:-1], bounds[1:]) if end > start
+                ]
+                # Results must be collected before the block can be rewritten
+                blocks = [future.result() for future in futures]
+            except Exception:
+                # A dead worker breaks the whole pool; start fresh on the next pass
+                self.failures += 1
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+                raise
+            self.passes += 1
+            self.shards += len(futures)
+
+        values = np.concatenate(blocks, axis=1)
+        return {name: values[i] for i, name in enumerate(INDICATORS)}
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+            self._release_block()
+
+    def get_stats(self) -> Dict:
+        return {
+            'processes': self.processes,
+            'passes': self.passes,
+            'shards': self.shards,
+            'failures': self.failures,
+            'shared_bytes': self.block.size if self.block is not None else 0
+        }
+
+class ProcessIndicatorEngine(IndicatorEngine):
+    """IndicatorEngine that shards large universes across the analysis worker processes"""
+
+    def __init__(self, pool: AnalysisPool = None, min_symbols: int = None, **settings):
+        super().__init__(**settings)
+        self.pool = pool or get_shared_analysis_pool()
+        self.min_symbols = min_symbols or Config.ANALYSIS_PROCESS_MIN_SYMBOLS
+
+    def _compute_group(self, arrays: List[np.ndarray]) -> Dict[str, np.ndarray]:
+        # Small universes are cheaper to score here than to ship to another process
+        if len(arrays) < self.min_symbols:
+            return super()._compute_group(arrays)
+        try:
+            return self.pool.score(arrays, self.settings())
+        except Exception as e:
+            logger.error(f"Analysis workers failed, scoring in-process: {e}")
+            return super()._compute_group(arrays)
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+def get_shared_analysis_pool() -> AnalysisPool:
+    """Get the process-wide analysis worker pool"""
+    global _shared_pool
+
+    if _shared_pool is None:
+        with _shared_pool_lock:
+            if _shared_pool is None:
+                _shared_pool = AnalysisPool()
+    return _shared_pool
@@ -8,14 +8,15 @@ import plotly.graph_objs as go
 import plotly.utils
 from binance_client import BinanceClient
 from database import TradingDatabase
-from whale_trap_strategy import WhaleTrapStrategy
+from whale_trap_strategy import WhaleTrapStrategy, get_analysis_strategy
 from config import Config
+from rate_limiter import PRIORITY_WEB
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'
 
 # Global variables
-binance_client = BinanceClient()
+binance_client = BinanceClient(default_priority=PRIORITY_WEB)
 db = TradingDatabase()
 strategy = None
 strategy_thread = None
@@ -63,11 +64,24 @@ def get_open_trades():
 def get_market_data(symbol):
     """Get market data for a symbol"""
     try:
-        # Get current price
-        current_price = binance_client.get_ticker_price(symbol)
+        # Prefer the running strategy's market stream over REST polling
+        stream = getattr(strategy, 'market_stream', None)
+        mini_ticker = None
+        if stream is not None and stream.is_fresh(symbol, Config.STREAM_MAX_AGE):
+            mini_ticker = stream.get_mini_ticker(symbol)
         
-        # Get 24hr stats
-        ticker_24h = binance_client.get_24hr_ticker(symbol)
+        if mini_ticker:
+            current_price = mini_ticker['close']
+            price_change_24h = (mini_ticker['close'] - mini_ticker['open']) / mini_ticker['open'] * 100 if mini_ticker['open'] else 0
+            volume_24h = mini_ticker['volume']
+        else:
+            # Get current price
+            current_price = binance_client.get_ticker_price(symbol)
+            
+            # Get 24hr stats
+            ticker_24h = binance_client.get_24hr_ticker(symbol)
+            price_change_24h = float(ticker_24h.get('priceChangePercent', 0))
+            volume_24h = float(ticker_24h.get('volume', 0))
         
         # Get historical data for chart
         klines = binance_client.get_klines(symbol, '1h', 24)
@@ -83,8 +97,8 @@ def get_market_data(symbol):
         return jsonify({
             'symbol': symbol,
             'current_price': current_price,
-            'price_change_24h': float(ticker_24h.get('priceChangePercent', 0)),
-            'volume_24h': float(ticker_24h.get('volume', 0)),
+            'price_change_24h': price_change_24h,
+            'volume_24h': volume_24h,
             'chart_data': chart_data
         })
     except Exception as e:
@@ -137,6 +151,8 @@ def stop_strategy():
     
     try:
         strategy_running = False
+        if strategy is not None and hasattr(strategy, 'stop'):
+            strategy.stop()
         return jsonify({'message': 'Strategy stopped successfully'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -202,8 +218,7 @@ def get_pnl():
 def analyze_symbol(symbol):
     """Analyze a specific symbol"""
     try:
-        strategy_temp = WhaleTrapStrategy()
-        analysis = strategy_temp.analyze_market_conditions(symbol)
+        analysis = get_analysis_strategy().analyze_market_conditions(symbol)
         return jsonify(analysis)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -9,8 +9,9 @@ import plotly.graph_objs as go
 import plotly.utils
 from binance_client import BinanceClient
 from database import TradingDatabase
-from whale_trap_strategy import WhaleTrapStrategy
+from whale_trap_strategy import WhaleTrapStrategy, get_analysis_strategy
 from config import Config
+from rate_limiter import PRIORITY_WEB
 from user_auth import UserAuth
 
 app = Flask(__name__)
@@ -18,7 +19,7 @@ app.secret_key = 'your-super-secret-flask-key-change-this'
 
 # Initialize components
 user_auth = UserAuth()
-binance_client = BinanceClient()
+binance_client = BinanceClient(default_priority=PRIORITY_WEB)
 db = TradingDatabase()
 strategy = None
 strategy_thread = None
@@ -147,7 +148,7 @@ def get_account_info():
         # Use user's API credentials if available
         user = session.get('user')
         if user.get('api_key') and user.get('api_secret'):
-            client = BinanceClient(user['api_key'], user['api_secret'])
+            client = BinanceClient(user['api_key'], user['api_secret'], default_priority=PRIORITY_WEB)
         else:
             client = binance_client
         
@@ -187,8 +188,21 @@ def get_open_trades():
 def get_market_data(symbol):
     """Get market data for a symbol"""
     try:
-        current_price = binance_client.get_ticker_price(symbol)
-        ticker_24h = binance_client.get_24hr_ticker(symbol)
+        # Prefer the running strategy's market stream over REST polling
+        stream = getattr(strategy, 'market_stream', None)
+        mini_ticker = None
+        if stream is not None and stream.is_fresh(symbol, Config.STREAM_MAX_AGE):
+            mini_ticker = stream.get_mini_ticker(symbol)
+        
+        if mini_ticker:
+            current_price = mini_ticker['close']
+            price_change_24h = (mini_ticker['close'] - mini_ticker['open']) / mini_ticker['open'] * 100 if mini_ticker['open'] else 0
+            volume_24h = mini_ticker['volume']
+        else:
+            current_price = binance_client.get_ticker_price(symbol)
+            ticker_24h = binance_client.get_24hr_ticker(symbol)
+            price_change_24h = float(ticker_24h.get('priceChangePercent', 0))
+            volume_24h = float(ticker_24h.get('volume', 0))
         klines = binance_client.get_klines(symbol, '1h', 24)
         
         chart_data = []
@@ -202,8 +216,8 @@ def get_market_data(symbol):
         return jsonify({
             'symbol': symbol,
             'current_price': current_price,
-            'price_change_24h': float(ticker_24h.get('priceChangePercent', 0)),
-            'volume_24h': float(ticker_24h.get('volume', 0)),
+            'price_change_24h': price_change_24h,
+            'volume_24h': volume_24h,
             'chart_data': chart_data
         })
     except Exception as e:
@@ -318,30 +332,7 @@ def get_pnl():
 def analyze_symbol(symbol):
     """Analyze a specific symbol"""
     try:
-        # Get technical indicators
-        klines = binance_client.get_klines(symbol, '1h', 24)
-        
-        if 'error' in klines:
-            return jsonify({'error': 'Failed to get market data'}), 500
-        
-        # Calculate basic indicators
-        prices = [float(kline[4]) for kline in klines]
-        volumes = [float(kline[5]) for kline in klines]
-        
-        current_price = prices[-1]
-        price_change = ((current_price - prices[0]) / prices[0]) * 100
-        avg_volume = sum(volumes) / len(volumes)
-        current_volume = volumes[-1]
-        volume_change = ((current_volume - avg_volume) / avg_volume) * 100
-        
-        analysis = {
-            'symbol': symbol,
-            'current_price': current_price,
-            'price_change_24h': price_change,
-            'volume_change': volume_change,
-            'recommendation': 'BUY' if price_change > 0 and volume_change > 20 else 'HOLD'
-        }
-        
+        analysis = get_analysis_strategy().analyze_market_conditions(symbol)
         return jsonify(analysis)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,254 @@
+import asyncio
+import time
+import hmac
+import hashlib
+import threading
+from urllib.parse import urlencode
+from typing import Callable, Dict, List, Optional, Iterable
+import logging
+import aiohttp
+from rate_limiter import get_shared_limiter, endpoint_weight, is_order_request, PRIORITY_ORDER, PRIORITY_SCAN
+from config import Config
+import fast_json
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class AsyncBinanceClient:
+    """Asyncio counterpart to BinanceClient with concurrent fan-out"""
+
+    def __init__(self, api_key: str = None, secret_key: str = None, max_in_flight: int = None,
+                 default_priority: int = PRIORITY_SCAN, base_url: str = None):
+        self.api_key = api_key or Config.BINANCE_API_KEY
+        self.secret_key = secret_key or Config.BINANCE_SECRET_KEY
+        self.base_url = (base_url or Config.BINANCE_BASE_URL).rstrip('/')
+        self.testnet = False  # Set to True for testing
+
+        if self.testnet:
+            self.base_url = "https://testnet.binance.vision"
+
+        self.max_in_flight = max_in_flight or Config.ASYNC_MAX_IN_FLIGHT
+        self.rate_limiter = get_shared_limiter()
+        self.default_priority = default_priority
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Create the keep-alive session lazily inside the running loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_in_flight,
+                limit_per_host=self.max_in_flight,
+                keepalive_timeout=60
+            )
+            timeout = aiohttp.ClientTimeout(
+                sock_connect=Config.HTTP_CONNECT_TIMEOUT,
+                sock_read=Config.HTTP_READ_TIMEOUT
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        return self._session
+
+    async def close(self):
+        """Close the underlying HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _generate_signature(self, params: str) -> str:
+        """Generate HMAC SHA256 signature"""
+        return hmac.new(
+            self.secret_key.encode('utf-8'),
+            params.encode('utf-8'),
+            hashlib.sha256
+        ).hexdigest()
+
+    async def _make_request(self, method: str, endpoint: str, params: Dict = None, signed: bool = False,
+                            decoder: Callable = None) -> Dict:
+        """Make HTTP request to Binance API, decoding the body with decoder(bytes) when given"""
+        session = await self._get_session()
+        url = f"{self.base_url}{endpoint}"
+        headers = {}
+
+        if self.api_key:
+            headers['X-MBX-APIKEY'] = self.api_key
+
+        # aiohttp only accepts string query values
+        params = {key: str(value) for key, value in (params or {}).items()}
+
+        if signed:
+            params['timestamp'] = str(int(time.time() * 1000))
+            params['signature'] = self._generate_signature(urlencode(params))
+
+        is_order = is_order_request(method, endpoint)
+        await self.rate_limiter.acquire_async(
+            endpoint_weight(method, endpoint, params),
+            PRIORITY_ORDER if is_order else self.default_priority,
+            is_order=is_order
+        )
+        
+        try:
+            async with self._semaphore:
+                async with session.request(method, url, params=params, headers=headers) as response:
+                    self.rate_limiter.update_from_headers(response.headers)
+                    if response.status in (418, 429):
+                        self.rate_limiter.on_rate_limited(response.status, response.headers.get('Retry-After'))
+                    response.raise_for_status()
+                    return (decoder or fast_json.loads)(await response.read())
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"API request failed: {e}")
+            return {"error": str(e)}
+        except ValueError as e:
+            logger.error(f"Could not decode {endpoint} response: {e}")
+            return {"error": str(e)}
+
+    async def get_account_info(self) -> Dict:
+        """Get account information"""
+        return await self._make_request('GET', '/api/v3/account', signed=True)
+
+    async def get_balance(self, asset: str = 'USDT') -> float:
+        """Get balance for specific asset"""
+        account = await self.get_account_info()
+        if 'error' in account:
+            return 0.0
+
+        for balance in account.get('balances', []):
+            if balance['asset'] == asset:
+                return float(balance['free'])
+        return 0.0
+
+    async def get_ticker_price(self, symbol: str) -> Optional[float]:
+        """Get current price for a symbol"""
+        response = await self._make_request('GET', '/api/v3/ticker/price', {'symbol': symbol})
+
+        if 'error' not in response:
+            return float(response['price'])
+        return None
+
+    async def get_24hr_ticker(self, symbol: str) -> Dict:
+        """Get 24hr ticker statistics"""
+        return await self._make_request('GET', '/api/v3/ticker/24hr', {'symbol': symbol})
+
+    async def get_klines(self, symbol: str, interval: str = '1m', limit: int = 100) -> List:
+        """Get candlestick data"""
+        params = {
+            'symbol': symbol,
+            'interval': interval,
+            'limit': limit
+        }
+        return await self._make_request('GET', '/api/v3/klines', params)
+
+    async def get_klines_array(self, symbol: str, interval: str = '1m', limit: int = 100,
+                               start_time: int = None):
+        """Get candlestick data as an (n, 12) float array, or an error dict"""
+        params = {
+            'symbol': symbol,
+            'interval': interval,
+            'limit': limit
+        }
+        if start_time is not None:
+            params['startTime'] = start_time
+        return await self._make_request('GET', '/api/v3/klines', params, decoder=fast_json.decode_klines)
+
+    async def get_order_book(self, symbol: str, limit: int = 100) -> Dict:
+        """Get order book for a symbol"""
+        return await self._make_request('GET', '/api/v3/depth', {'symbol': symbol, 'limit': limit})
+
+    async def get_order_book_arrays(self, symbol: str, limit: int = 100) -> Dict:
+        """Get order book with bids and asks as (n, 2) [price, quantity] float arrays"""
+        return await self._make_request('GET', '/api/v3/depth', {'symbol': symbol, 'limit': limit},
+                                        decoder=fast_json.decode_depth)
+
+    async def get_exchange_info(self) -> Dict:
+        """Get exchange information"""
+        return await self._make_request('GET', '/api/v3/exchangeInfo')
+
+    async def place_market_order(self, symbol: str, side: str, quantity: float) -> Dict:
+        """Place a market order"""
+        params = {
+            'symbol': symbol,
+            'side': side.upper(),
+            'type': 'MARKET',
+            'quantity': quantity
+        }
+        return await self._make_request('POST', '/api/v3/order', params, signed=True)
+
+    async def place_limit_order(self, symbol: str, side: str, quantity: float, price: float) -> Dict:
+        """Place a limit order"""
+        params = {
+            'symbol': symbol,
+            'side': side.upper(),
+            'type': 'LIMIT',
+            'timeInForce': 'GTC',
+            'quantity': quantity,
+            'price': price
+        }
+        return await self._make_request('POST', '/api/v3/order', params, signed=True)
+
+    async def cancel_order(self, symbol: str, order_id: int) -> Dict:
+        """Cancel an order"""
+        params = {
+            'symbol': symbol,
+            'orderId': order_id
+        }
+        return await self._make_request('DELETE', '/api/v3/order', params, signed=True)
+
+    async def get_open_orders(self, symbol: str = None) -> List:
+        """Get open orders"""
+        params = {}
+        if symbol:
+            params['symbol'] = symbol
+        return await self._make_request('GET', '/api/v3/openOrders', params, signed=True)
+
+    async def get_order_status(self, symbol: str, order_id: int) -> Dict:
+        """Get order status"""
+        params = {
+            'symbol': symbol,
+            'orderId': order_id
+        }
+        return await self._make_request('GET', '/api/v3/order', params, signed=True)
+
+    async def gather_klines(self, symbols: Iterable[str], interval: str = '1m', limit: int = 100) -> Dict[str, List]:
+        """Fetch klines for many symbols concurrently, capped at max_in_flight"""
+        symbols = list(symbols)
+        results = await asyncio.gather(*(self.get_klines(symbol, interval, limit) for symbol in symbols))
+        return dict(zip(symbols, results))
+
+    async def gather_order_books(self, symbols: Iterable[str], limit: int = 100, arrays: bool = False) -> Dict[str, Dict]:
+        """Fetch order books for many symbols concurrently, capped at max_in_flight; arrays=True decodes to NumPy"""
+        symbols = list(symbols)
+        fetch = self.get_order_book_arrays if arrays else self.get_order_book
+        results = await asyncio.gather(*(fetch(symbol, limit) for symbol in symbols))
+        return dict(zip(symbols, results))
+
+class BackgroundLoop:
+    """Event loop in a daemon thread so synchronous strategy loops can await coroutines"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name='async-binance-loop', daemon=True)
+        self.thread.start()
+
+    def run(self, coro, timeout: float = None):
+        """Run a coroutine on the background loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+_background_loop = None
+_background_loop_lock = threading.Lock()
+
+def get_background_loop() -> BackgroundLoop:
+    """Get the process-wide background event loop"""
+    global _background_loop
+
+    if _background_loop is None:
+        with _background_loop_lock:
+            if _background_loop is None:
+                _background_loop = BackgroundLoop()
+    return _background_loop
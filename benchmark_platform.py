@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+OneMilX Trading Platform - Benchmark Script
+Times hot paths against deterministic synthetic data so results are comparable between runs
+"""
+
+import sys
+import json
+import time
+from datetime import datetime
+
+def _time(func, repeat: int = 100) -> float:
+    """Mean wall time of func() in microseconds"""
+    func()  # Warm caches and lazy imports
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+def _report(name: str, baseline: float, fast: float):
+    print(f"   {name:<28} baseline {baseline:>10.1f}µs   fast {fast:>10.1f}µs   {baseline / fast:>5.1f}x")
+
+def benchmark_json_decoding():
+    """stdlib json + float() per element vs fast_json decoders"""
+    print("\n⚡ Benchmarking JSON decoding...")
+
+    import numpy as np
+    import fast_json
+    from exchange_simulator import synthesize_recording
+
+    symbols = [f"SIM{i:04d}USDT" for i in range(2000)]
+    recording = synthesize_recording(symbols[:1], candles=1000, levels=1000)
+    klines = json.loads(recording.by_path[('GET', '/api/v3/klines')][0]['body'])
+    depth = json.loads(recording.by_path[('GET', '/api/v3/depth')][0]['body'])
+    # Compact separators like the exchange sends
+    klines_raw = json.dumps(klines, separators=(',', ':')).encode()
+    depth_raw = json.dumps(depth, separators=(',', ':')).encode()
+    tickers_raw = json.dumps([{'symbol': symbol, 'price': f"{i * 0.37 + 1:.8f}"} for i, symbol in enumerate(symbols)],
+                             separators=(',', ':')).encode()
+
+    def klines_baseline():
+        return np.array([[float(value) for value in row] for row in json.loads(klines_raw)])
+
+    def depth_baseline():
+        data = json.loads(depth_raw)
+        return ([[float(p), float(q)] for p, q in data['bids']], [[float(p), float(q)] for p, q in data['asks']])
+
+    def tickers_baseline():
+        data = json.loads(tickers_raw)
+        return [t['symbol'] for t in data], np.array([float(t['price']) for t in data])
+
+    assert np.allclose(klines_baseline(), fast_json.decode_klines(klines_raw))
+    assert np.allclose(depth_baseline()[1], fast_json.decode_depth(depth_raw)['asks'])
+    assert np.allclose(tickers_baseline()[1], fast_json.decode_ticker_prices(tickers_raw)[1])
+
+    print(f"   orjson available: {fast_json.HAS_ORJSON}")
+    _report('klines (1000 rows)', _time(klines_baseline), _time(lambda: fast_json.decode_klines(klines_raw)))
+    _report('depth (1000 levels)', _time(depth_baseline), _time(lambda: fast_json.decode_depth(depth_raw)))
+    _report('ticker/price (2000 symbols)', _time(tickers_baseline), _time(lambda: fast_json.decode_ticker_prices(tickers_raw)))
+    _report('generic loads (24hr-size)', _time(lambda: json.loads(tickers_raw)), _time(lambda: fast_json.loads(tickers_raw)))
+    return True
+
+def benchmark_indicators():
+    """ta per symbol (the old whale path) vs one IndicatorEngine pass over the universe"""
+    print("\n📐 Benchmarking indicators...")
+
+    import numpy as np
+    import pandas as pd
+    import ta
+    from indicator_engine import IndicatorEngine
+
+    rng = np.random.default_rng(7)
+    symbols = [f"SIM{i:03d}USDT" for i in range(400)]
+    klines = np.zeros((len(symbols), 100, 12))
+    klines[:, :, 4] = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(symbols), 100)), axis=1))
+    klines[:, :, 2] = klines[:, :, 4] * (1 + rng.uniform(0, 0.01, (len(symbols), 100)))
+    klines[:, :, 3] = klines[:, :, 4] * (1 - rng.uniform(0, 0.01, (len(symbols), 100)))
+    klines[:, :, 5] = rng.uniform(1, 100, (len(symbols), 100))
+    klines_by_symbol = dict(zip(symbols, klines))
+    engine = IndicatorEngine()
+
+    def one_symbol_ta():
+        close, high, low = pd.Series(klines[0, :, 4]), pd.Series(klines[0, :, 2]), pd.Series(klines[0, :, 3])
+        volume = pd.Series(klines[0, :, 5])
+        return (volume.rolling(window=20).mean(), ta.trend.sma_indicator(close, window=20),
+                ta.trend.ema_indicator(close, window=12), ta.momentum.rsi(close, window=14),
+                ta.trend.macd_diff(close), ta.volatility.bollinger_hband(close), ta.volatility.bollinger_mavg(close),
+                ta.volatility.bollinger_lband(close), ta.volatility.average_true_range(high, low, close))
+
+    baseline = _time(one_symbol_ta, repeat=20)
+    _report('1 symbol (ta vs engine)', baseline, _time(lambda: engine.compute({symbols[0]: klines[0]})))
+    _report(f'{len(symbols)} symbols (ta vs engine)', baseline * len(symbols),
+            _time(lambda: engine.compute(klines_by_symbol), repeat=20))
+    return True
+
+def benchmark_ultra_analysis():
+    """Per-symbol ultra_fast_analysis: the pandas DataFrame version vs the NumPy fast path"""
+    print("\n🏎️ Benchmarking ultra-fast analysis...")
+
+    import numpy as np
+    import pandas as pd
+    from ultra_ai_strategy import UltraAIStrategy
+
+    def pandas_analysis(symbol, klines):
+        df = pd.DataFrame(klines, columns=[
+            'timestamp', 'open', 'high', 'low', 'close', 'volume', 'close_time', 'quote_volume',
+            'trades', 'taker_buy_base', 'taker_buy_quote', 'ignore'
+        ])
+        for col in ['open', 'high', 'low', 'close', 'volume']:
+            df[col] = pd.to_numeric(df[col])
+        current_price, prev_price = df['close'].iloc[-1], df['close'].iloc[-2]
+        avg_volume = df['volume'].rolling(5).mean().iloc[-1]
+        price_change = (current_price - prev_price) / prev_price
+        volume_ratio = df['volume'].iloc[-1] / avg_volume if avg_volume > 0 else 1
+        signal_strength, signal_type = 0, 'neutral'
+        if price_change > 0.002:
+            signal_strength, signal_type = signal_strength + 0.4, 'momentum_up'
+        elif price_change < -0.002:
+            signal_strength, signal_type = signal_strength - 0.4, 'momentum_down'
+        if volume_ratio > 1.2:
+            signal_strength, signal_type = signal_strength + 0.3, 'volume_spike'
+        if (df['close'].iloc[-1] - df['close'].iloc[-2]) - (df['close'].iloc[-2] - df['close'].iloc[-3]) > 0:
+            signal_strength += 0.2
+        return {'symbol': symbol, 'signal': signal_type, 'confidence': min(abs(signal_strength), 1.0),
+                'direction': 'buy' if signal_strength > 0 else 'sell', 'price_change': price_change,
+                'volume_ratio': volume_ratio, 'current_price': current_price}
+
+    rng = np.random.default_rng(7)
+    samples = np.zeros((500, 10, 12))
+    samples[:, :, 4] = 100 * np.exp(np.cumsum(rng.normal(0, 0.003, (500, 10)), axis=1))
+    samples[:, :, 5] = rng.uniform(1, 100, (500, 10))
+    strategy = UltraAIStrategy()
+
+    # Same decisions everywhere; ratios may differ in the last bit (pandas sums windows with Kahan compensation)
+    for klines in samples:
+        expected = pandas_analysis('SIMUSDT', klines)
+        actual = strategy.ultra_fast_analysis('SIMUSDT', klines)
+        for key, value in expected.items():
+            assert actual[key] == value if isinstance(value, str) else np.isclose(actual[key], value, rtol=1e-12), key
+
+    _report('analysis (10 candles)', _time(lambda: pandas_analysis('SIMUSDT', samples[0])),
+            _time(lambda: strategy.ultra_fast_analysis('SIMUSDT', samples[0])))
+    return True
+
+def benchmark_order_books():
+    """pandas whale metrics per book (the old detect_whale_activity path) vs orderbook_analytics"""
+    print("\n🐋 Benchmarking order book analytics...")
+
+    import pandas as pd
+    import fast_json
+    from exchange_simulator import synthesize_recording
+    from orderbook_analytics import analyze_book, analyze_books
+
+    symbols = [f"SIM{i:03d}USDT" for i in range(100)]
+    recording = synthesize_recording(symbols, seed=7, candles=2, levels=100)
+    raw_books = {entry['params']['symbol']: entry['body'].encode()
+                 for entry in recording.by_path[('GET', '/api/v3/depth')]}
+    books = {symbol: json.loads(raw) for symbol, raw in raw_books.items()}
+    decoded = {symbol: fast_json.decode_depth(raw) for symbol, raw in raw_books.items()}
+
+    def pandas_metrics(order_book):
+        bids = pd.DataFrame(order_book['bids'], columns=['price', 'quantity'])
+        asks = pd.DataFrame(order_book['asks'], columns=['price', 'quantity'])
+        for frame in (bids, asks):
+            frame['price'] = pd.to_numeric(frame['price'])
+            frame['quantity'] = pd.to_numeric(frame['quantity'])
+        total_bid_volume, total_ask_volume = bids['quantity'].sum(), asks['quantity'].sum()
+        return {
+            'imbalance': (total_bid_volume - total_ask_volume) / (total_bid_volume + total_ask_volume),
+            'large_bids': len(bids[bids['quantity'] > bids['quantity'].quantile(0.9)]),
+            'large_asks': len(asks[asks['quantity'] > asks['quantity'].quantile(0.9)]),
+            'lowest_bid': bids['price'].min(),
+            'highest_ask': asks['price'].max()
+        }
+
+    batch = analyze_books(decoded)
+    for symbol, order_book in books.items():
+        expected = pandas_metrics(order_book)
+        actual = batch.row(symbol)
+        assert all(abs(actual[key] - value) <= 1e-12 * max(1.0, abs(value)) for key, value in expected.items()), symbol
+
+    first = symbols[0]
+    _report('1 book (raw levels)', _time(lambda: pandas_metrics(books[first])), _time(lambda: analyze_book(books[first])))
+    _report(f'{len(books)} books (batch)', _time(lambda: [pandas_metrics(book) for book in books.values()], repeat=5),
+            _time(lambda: analyze_books(decoded), repeat=20))
+    return True
+
+def benchmark_trigger_index():
+    """Per-position stop/take-profit/time checks (the old monitor loop) vs TriggerIndex.check_snapshot"""
+    print("\n🎯 Benchmarking exit trigger checks...")
+
+    import numpy as np
+    from datetime import timedelta
+    from trigger_index import TriggerIndex
+
+    rng = np.random.default_rng(7)
+    symbols = [f"SIM{i:03d}USDT" for i in range(500)]
+    prices = {symbol: float(price) for symbol, price in zip(symbols, rng.uniform(1, 1000, len(symbols)))}
+    now = datetime.now()
+    max_hold = timedelta(minutes=2)
+
+    # 10 positions per symbol, entered around the current price at different times
+    positions = {}
+    index = TriggerIndex()
+    for symbol in symbols:
+        for n in range(10):
+            entry = prices[symbol] * float(rng.uniform(0.997, 1.003))
+            entry_time = now - timedelta(seconds=float(rng.uniform(0, 121)))
+            trade = {'symbol': symbol, 'stop_loss': entry * 0.995, 'take_profit': entry * 1.005, 'entry_time': entry_time}
+            positions[(symbol, n)] = trade
+            index.add((symbol, n), symbol, trade['stop_loss'], trade['take_profit'],
+                      entry_time.timestamp() + max_hold.total_seconds())
+
+    def loop_checks():
+        current = datetime.now()
+        fired = []
+        for key, trade in positions.items():
+            price = prices.get(trade['symbol'])
+            if not price:
+                continue
+            if price <= trade['stop_loss']:
+                fired.append((key, 'stop_loss'))
+            elif price >= trade['take_profit']:
+                fired.append((key, 'take_profit'))
+            elif current - trade['entry_time'] > max_hold:
+                fired.append((key, 'time_exit'))
+        return fired
+
+    expected = sorted(loop_checks())
+    actual = sorted((key, reason) for key, reason, _ in index.check_snapshot(prices))
+    assert actual == expected, (len(actual), len(expected))
+    print(f"   {len(positions)} positions on {len(symbols)} symbols, {len(expected)} fired")
+
+    _report('snapshot check', _time(loop_checks, repeat=20), _time(lambda: index.check_snapshot(prices), repeat=20))
+    symbol = symbols[0]
+    _report('one price update', _time(loop_checks, repeat=20), _time(lambda: index.check(symbol, prices[symbol])))
+    return True
+
+def benchmark_scan_cycle():
+    """One full ultra_market_scan against the replaying exchange simulator"""
+    print("\n⏱️ Benchmarking scan cycle against the exchange simulator...")
+
+    from config import Config
+    from exchange_simulator import ExchangeSimulator, synthesize_recording
+
+    symbols = [f"SIM{i:03d}USDT" for i in range(100)]
+    simulator = ExchangeSimulator('replay', synthesize_recording(symbols, seed=7), latency=0.005, jitter=0.002, seed=7)
+    Config.BINANCE_BASE_URL = simulator.start()
+    try:
+        from ultra_ai_strategy import UltraAIStrategy
+        from async_binance_client import get_background_loop
+
+        strategy = UltraAIStrategy()
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            strategy.ultra_market_scan()
+            timings.append(time.perf_counter() - start)
+        print(f"   {len(symbols)} symbols, {simulator.requests_served} requests served, {simulator.misses} misses")
+        print(f"   scan cycle: first {timings[0] * 1000:.1f}ms, best {min(timings) * 1000:.1f}ms")
+        get_background_loop().run(strategy.async_binance.close())
+    finally:
+        simulator.stop()
+    return True
+
+def main():
+    """Run all benchmarks"""
+    print("🚀 OneMilX Trading Platform - Benchmarks")
+    print("=" * 50)
+    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    benchmarks = [
+        ("JSON Decoding", benchmark_json_decoding),
+        ("Indicators", benchmark_indicators),
+        ("Ultra Analysis", benchmark_ultra_analysis),
+        ("Order Books", benchmark_order_books),
+        ("Trigger Index", benchmark_trigger_index),
+        ("Scan Cycle", benchmark_scan_cycle),
+    ]
+
+    selected = sys.argv[1:]
+    for name, func in benchmarks:
+        if selected and not any(word.lower() in name.lower() for word in selected):
+            continue
+        try:
+            func()
+        except Exception as e:
+            print(f"❌ {name} benchmark crashed: {e}")
+
+if __name__ == "__main__":
+    main()
@@ -4,22 +4,54 @@ import hmac
 import hashlib
 import json
 from urllib.parse import urlencode
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
+import numpy as np
 import logging
 from config import Config
+import fast_json
+from http_session import get_shared_session
+from symbol_index import SymbolIndex
+from market_snapshot import PriceSnapshot, Ticker24hSnapshot, get_shared_cache
+from rate_limiter import (
+    get_shared_limiter, endpoint_weight, is_order_request,
+    PRIORITY_ORDER, PRIORITY_SCAN
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class BinanceClient:
-    def __init__(self, api_key: str = None, secret_key: str = None):
+    def __init__(self, api_key: str = None, secret_key: str = None, default_priority: int = PRIORITY_SCAN,
+                 base_url: str = None):
         self.api_key = api_key or Config.BINANCE_API_KEY
         self.secret_key = secret_key or Config.BINANCE_SECRET_KEY
-        self.base_url = "https://api.binance.com"
+        self.base_url = (base_url or Config.BINANCE_BASE_URL).rstrip('/')
         self.testnet = False  # Set to True for testing
         
         if self.testnet:
             self.base_url = "https://testnet.binance.vision"
+        
+        # Keep-alive connection pool shared by every client in the process
+        self.http = get_shared_session()
+        
+        # Request weight budget shared by all strategies and web handlers
+        self.rate_limiter = get_shared_limiter()
+        self.default_priority = default_priority
+        
+        # exchangeInfo is downloaded once per TTL and looked up in memory
+        self.symbol_index = SymbolIndex(self.get_exchange_info)
+    
+    def warm_up(self, connections: int = None) -> int:
+        """Pre-open keep-alive connections so the scan loop skips handshakes"""
+        return self.http.warm_up(f"{self.base_url}/api/v3/ping", connections or Config.HTTP_WARM_CONNECTIONS)
+    
+    def get_pool_stats(self) -> Dict:
+        """Get connection pool hit/miss counters"""
+        return self.http.get_pool_stats()
+    
+    def get_rate_limit_status(self) -> Dict:
+        """Get shared request weight budget and throttling counters"""
+        return self.rate_limiter.get_status()
     
     def _generate_signature(self, params: str) -> str:
         """Generate HMAC SHA256 signature"""
@@ -29,34 +61,46 @@ class BinanceClient:
             hashlib.sha256
         ).hexdigest()
     
-    def _make_request(self, method: str, endpoint: str, params: Dict = None, signed: bool = False) -> Dict:
-        """Make HTTP request to Binance API"""
+    def _make_request(self, method: str, endpoint: str, params: Dict = None, signed: bool = False,
+                      priority: int = None, decoder: Callable = None) -> Dict:
+        """Make HTTP request to Binance API, decoding the body with decoder(bytes) when given"""
         url = f"{self.base_url}{endpoint}"
         headers = {}
         
         if self.api_key:
             headers['X-MBX-APIKEY'] = self.api_key
         
-        if signed and params:
+        if signed:
+            params = dict(params or {})
             params['timestamp'] = int(time.time() * 1000)
             query_string = urlencode(params)
             signature = self._generate_signature(query_string)
             params['signature'] = signature
         
+        is_order = is_order_request(method, endpoint)
+        if priority is None:
+            priority = PRIORITY_ORDER if is_order else self.default_priority
+        self.rate_limiter.acquire(
+            endpoint_weight(method, endpoint, params),
+            priority,
+            is_order=is_order
+        )
+        
         try:
-            if method == 'GET':
-                response = requests.get(url, params=params, headers=headers)
-            elif method == 'POST':
-                response = requests.post(url, params=params, headers=headers)
-            elif method == 'DELETE':
-                response = requests.delete(url, params=params, headers=headers)
+            response = self.http.request(method, url, params=params, headers=headers)
+            self.rate_limiter.update_from_headers(response.headers)
+            if response.status_code in (418, 429):
+                self.rate_limiter.on_rate_limited(response.status_code, response.headers.get('Retry-After'))
             
             response.raise_for_status()
-            return response.json()
+            return (decoder or fast_json.loads)(response.content)
         
         except requests.exceptions.RequestException as e:
             logger.error(f"API request failed: {e}")
             return {"error": str(e)}
+        except ValueError as e:
+            logger.error(f"Could not decode {endpoint} response: {e}")
+            return {"error": str(e)}
     
     def get_account_info(self) -> Dict:
         """Get account information"""
@@ -82,6 +126,29 @@ class BinanceClient:
             return float(response['price'])
         return None
     
+    def get_all_prices(self, max_age: float = 0, priority: int = None) -> Optional[PriceSnapshot]:
+        """Get prices for every symbol in one request, reusing a snapshot up to max_age seconds old"""
+        def load():
+            response = self._make_request('GET', '/api/v3/ticker/price', priority=priority,
+                                          decoder=fast_json.decode_ticker_prices)
+            if isinstance(response, dict):
+                return None
+            return PriceSnapshot(*response)
+        
+        return get_shared_cache((self.base_url, 'ticker_price')).get(max_age, load)
+    
+    def get_24hr_snapshot(self, max_age: float = None) -> Optional[Ticker24hSnapshot]:
+        """Get the shared 24hr ticker snapshot for all symbols, refreshed when older than max_age"""
+        def load():
+            response = self._make_request('GET', '/api/v3/ticker/24hr')
+            if 'error' in response:
+                return None
+            return Ticker24hSnapshot(response)
+        
+        if max_age is None:
+            max_age = Config.TICKER_24H_MAX_AGE
+        return get_shared_cache((self.base_url, 'ticker_24hr')).get(max_age, load)
+    
     def get_24hr_ticker(self, symbol: str) -> Dict:
         """Get 24hr ticker statistics"""
         params = {'symbol': symbol}
@@ -96,11 +163,29 @@ class BinanceClient:
         }
         return self._make_request('GET', '/api/v3/klines', params)
     
+    def get_klines_array(self, symbol: str, interval: str = '1m', limit: int = 100,
+                         start_time: int = None) -> Optional[np.ndarray]:
+        """Get candlestick data as an (n, 12) float array in fast_json.KLINE_COLUMNS order"""
+        params = {
+            'symbol': symbol,
+            'interval': interval,
+            'limit': limit
+        }
+        if start_time is not None:
+            params['startTime'] = start_time
+        response = self._make_request('GET', '/api/v3/klines', params, decoder=fast_json.decode_klines)
+        return None if isinstance(response, dict) else response
+    
     def get_order_book(self, symbol: str, limit: int = 100) -> Dict:
         """Get order book for a symbol"""
         params = {'symbol': symbol, 'limit': limit}
         return self._make_request('GET', '/api/v3/depth', params)
     
+    def get_order_book_arrays(self, symbol: str, limit: int = 100) -> Dict:
+        """Get order book with bids and asks as (n, 2) [price, quantity] float arrays"""
+        params = {'symbol': symbol, 'limit': limit}
+        return self._make_request('GET', '/api/v3/depth', params, decoder=fast_json.decode_depth)
+    
     def place_market_order(self, symbol: str, side: str, quantity: float) -> Dict:
         """Place a market order"""
         params = {
@@ -123,28 +208,70 @@ class BinanceClient:
         }
         return self._make_request('POST', '/api/v3/order', params, signed=True)
     
-    def place_stop_loss_order(self, symbol: str, side: str, quantity: float, stop_price: float) -> Dict:
-        """Place a stop loss order"""
+    def place_stop_loss_order(self, symbol: str, side: str, quantity: float, stop_price: float,
+                              price: float = None) -> Dict:
+        """Place a spot stop loss order, as a limit order at price once triggered when price is given"""
         params = {
             'symbol': symbol,
             'side': side.upper(),
-            'type': 'STOP_MARKET',
+            'type': 'STOP_LOSS_LIMIT' if price is not None else 'STOP_LOSS',
             'quantity': quantity,
             'stopPrice': stop_price
         }
+        if price is not None:
+            params['price'] = price
+            params['timeInForce'] = 'GTC'
         return self._make_request('POST', '/api/v3/order', params, signed=True)
     
-    def place_take_profit_order(self, symbol: str, side: str, quantity: float, stop_price: float) -> Dict:
-        """Place a take profit order"""
+    def place_take_profit_order(self, symbol: str, side: str, quantity: float, stop_price: float,
+                                price: float = None) -> Dict:
+        """Place a spot take profit order, as a limit order at price once triggered when price is given"""
         params = {
             'symbol': symbol,
             'side': side.upper(),
-            'type': 'TAKE_PROFIT_MARKET',
+            'type': 'TAKE_PROFIT_LIMIT' if price is not None else 'TAKE_PROFIT',
             'quantity': quantity,
             'stopPrice': stop_price
         }
+        if price is not None:
+            params['price'] = price
+            params['timeInForce'] = 'GTC'
         return self._make_request('POST', '/api/v3/order', params, signed=True)
     
+    def place_oco_order(self, symbol: str, side: str, quantity: float, limit_price: float,
+                        stop_price: float, stop_limit_price: float) -> Dict:
+        """Place a one-cancels-the-other pair: a LIMIT_MAKER at limit_price and a STOP_LOSS_LIMIT"""
+        # For a SELL the take profit sits above the market and the stop below it
+        limit_side, stop_side = ('above', 'below') if side.upper() == 'SELL' else ('below', 'above')
+        params = {
+            'symbol': symbol,
+            'side': side.upper(),
+            'quantity': quantity,
+            f'{limit_side}Type': 'LIMIT_MAKER',
+            f'{limit_side}Price': limit_price,
+            f'{stop_side}Type': 'STOP_LOSS_LIMIT',
+            f'{stop_side}StopPrice': stop_price,
+            f'{stop_side}Price': stop_limit_price,
+            f'{stop_side}TimeInForce': 'GTC'
+        }
+        return self._make_request('POST', '/api/v3/orderList/oco', params, signed=True)
+    
+    def cancel_order_list(self, symbol: str, order_list_id: int) -> Dict:
+        """Cancel every order in an order list (e.g. an OCO)"""
+        params = {
+            'symbol': symbol,
+            'orderListId': order_list_id
+        }
+        return self._make_request('DELETE', '/api/v3/orderList', params, signed=True)
+    
+    def get_order_list(self, order_list_id: int) -> Dict:
+        """Get an order list's status"""
+        return self._make_request('GET', '/api/v3/orderList', {'orderListId': order_list_id}, signed=True)
+    
+    def get_open_order_lists(self) -> List:
+        """Get all open order lists"""
+        return self._make_request('GET', '/api/v3/openOrderList', signed=True)
+    
     def cancel_order(self, symbol: str, order_id: int) -> Dict:
         """Cancel an order"""
         params = {
@@ -168,6 +295,18 @@ class BinanceClient:
         }
         return self._make_request('GET', '/api/v3/order', params, signed=True)
     
+    def create_listen_key(self) -> Dict:
+        """Open a user data stream; the response holds the listenKey"""
+        return self._make_request('POST', '/api/v3/userDataStream', priority=PRIORITY_ORDER)
+    
+    def keepalive_listen_key(self, listen_key: str) -> Dict:
+        """Extend a user data stream's listenKey by 60 minutes"""
+        return self._make_request('PUT', '/api/v3/userDataStream', {'listenKey': listen_key}, priority=PRIORITY_ORDER)
+    
+    def close_listen_key(self, listen_key: str) -> Dict:
+        """Close a user data stream"""
+        return self._make_request('DELETE', '/api/v3/userDataStream', {'listenKey': listen_key}, priority=PRIORITY_ORDER)
+    
     def get_trade_history(self, symbol: str, limit: int = 100) -> List:
         """Get trade history"""
         params = {
@@ -182,43 +321,19 @@ class BinanceClient:
     
     def get_symbol_info(self, symbol: str) -> Optional[Dict]:
         """Get symbol information"""
-        exchange_info = self.get_exchange_info()
-        if 'error' in exchange_info:
-            return None
-        
-        for symbol_info in exchange_info.get('symbols', []):
-            if symbol_info['symbol'] == symbol:
-                return symbol_info
-        return None
+        rules = self.symbol_index.get(symbol)
+        return rules.raw if rules else None
     
     def get_top_gainers(self, limit: int = 20) -> List[Dict]:
         """Get top gaining symbols in last 24h"""
-        response = self._make_request('GET', '/api/v3/ticker/24hr')
-        if 'error' in response:
+        snapshot = self.get_24hr_snapshot()
+        if snapshot is None:
             return []
-        
-        # Filter USDT pairs and sort by price change
-        usdt_pairs = [
-            ticker for ticker in response 
-            if ticker['symbol'].endswith('USDT') and float(ticker['priceChangePercent']) > 0
-        ]
-        
-        # Sort by price change percentage
-        sorted_pairs = sorted(usdt_pairs, key=lambda x: float(x['priceChangePercent']), reverse=True)
-        return sorted_pairs[:limit]
+        return snapshot.top_gainers(limit, 'USDT')
     
     def get_volume_leaders(self, limit: int = 20) -> List[Dict]:
         """Get symbols with highest volume in last 24h"""
-        response = self._make_request('GET', '/api/v3/ticker/24hr')
-        if 'error' in response:
+        snapshot = self.get_24hr_snapshot()
+        if snapshot is None:
             return []
-        
-        # Filter USDT pairs and sort by volume
-        usdt_pairs = [
-            ticker for ticker in response 
-            if ticker['symbol'].endswith('USDT')
-        ]
-        
-        # Sort by volume
-        sorted_pairs = sorted(usdt_pairs, key=lambda x: float(x['volume']), reverse=True)
-        return sorted_pairs[:limit] 
\ No newline at end of file
+        return snapshot.volume_leaders(limit, 'USDT')
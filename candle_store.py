@@ -0,0 +1,193 @@
+import asyncio
+import time
+import threading
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from async_binance_client import AsyncBinanceClient, get_background_loop
+from fast_json import KLINE_WIDTH
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+INTERVAL_UNITS_MS = {'s': 1000, 'm': 60000, 'h': 3600000, 'd': 86400000, 'w': 604800000, 'M': 2592000000}
+
+def interval_ms(interval: str) -> int:
+    """Kline interval such as '1m' or '4h' in milliseconds"""
+    return int(interval[:-1]) * INTERVAL_UNITS_MS[interval[-1]]
+
+class CandleBuffer:
+    """Fixed-capacity kline ring buffer whose latest n rows are always one contiguous slice"""
+
+    def __init__(self, capacity: int):
+        # Every row is written twice, at slot and slot + capacity, so the
+        # newest n rows are data[end - n:end] without wrapping or copying
+        self.capacity = capacity
+        self.data = np.zeros((2 * capacity, KLINE_WIDTH), dtype=np.float64)
+        self.count = 0
+        self.updated_at = 0.0
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    @property
+    def last_open_time(self) -> Optional[int]:
+        if self.count == 0:
+            return None
+        return int(self.data[self._end() - 1, 0])
+
+    def _end(self) -> int:
+        return self.count % self.capacity + self.capacity
+
+    def _write(self, slot: int, row: np.ndarray):
+        self.data[slot] = row
+        self.data[slot + self.capacity] = row
+
+    def merge(self, rows: np.ndarray) -> int:
+        """Append newer candles and overwrite the still-open one; returns rows applied"""
+        applied = 0
+        for row in rows:
+            last_open = self.last_open_time
+            if last_open is not None and row[0] == last_open:
+                self._write((self.count - 1) % self.capacity, row)
+            elif last_open is None or row[0] > last_open:
+                self._write(self.count % self.capacity, row)
+                self.count += 1
+            else:
+                continue  # Older than what we hold
+            applied += 1
+        self.updated_at = time.time()
+        return applied
+
+    def reset(self, rows: np.ndarray):
+        self.count = 0
+        self.merge(rows[-self.capacity:])
+
+    def view(self, n: int = None) -> Optional[np.ndarray]:
+        """Read-only view of the newest n candles, or None if fewer are held"""
+        # Appends leave a view untouched until capacity - n newer candles arrive;
+        # only the open candle's row changes in place
+        n = len(self) if n is None else n
+        if n > len(self) or n <= 0:
+            return None
+        end = self._end()
+        view = self.data[end - n:end]
+        view.flags.writeable = False
+        return view
+
+class CandleStore:
+    """Shared (symbol, interval) candle buffers refreshed incrementally via startTime"""
+
+    def __init__(self, async_client: AsyncBinanceClient = None, capacity: int = None):
+        self.async_binance = async_client or AsyncBinanceClient()
+        self.capacity = capacity or Config.CANDLE_STORE_CAPACITY
+        self.buffers = {}
+        self.streaming = False
+
+        self.full_fetches = 0
+        self.incremental_fetches = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def _buffer(self, symbol: str, interval: str) -> CandleBuffer:
+        key = (symbol, interval)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            with self._lock:
+                buffer = self.buffers.setdefault(key, CandleBuffer(self.capacity))
+        return buffer
+
+    def attach(self, market_stream):
+        """Merge kline events from a MarketDataStream so streamed symbols need no REST refresh"""
+        self.streaming = True
+        market_stream.subscribe(self.on_stream_event)
+
+    def on_stream_event(self, kind: str, symbol: str, data: Dict):
+        if kind != 'kline':
+            return
+        k = data['k']
+        row = np.array([[k['t'], k['o'], k['h'], k['l'], k['c'], k['v'], k['T'], k['q'], k['n'], k['V'], k['Q'], 0]],
+                       dtype=np.float64)
+        buffer = self._buffer(symbol, k['i'])
+        with self._lock:
+            if buffer.count:
+                buffer.merge(row)  # History is seeded by REST first
+
+    def _plan(self, buffer: CandleBuffer, interval: str, limit: int) -> Optional[Tuple[int, Optional[int]]]:
+        """(limit, startTime) to request, or None when the buffer is already current"""
+        max_age = Config.STREAM_MAX_AGE if self.streaming else Config.CANDLE_REFRESH_MIN_AGE
+        if len(buffer) >= limit and time.time() - buffer.updated_at <= max_age:
+            return None
+        # klines costs the same weight for any limit, so full loads fill the whole buffer
+        if len(buffer) < limit or buffer.last_open_time is None:
+            return self.capacity, None
+
+        # Candles opened since our last (possibly unfinished) one, including it
+        missed = int((time.time() * 1000 - buffer.last_open_time) // interval_ms(interval)) + 1
+        if missed >= limit:
+            return self.capacity, None  # Too far behind, reload the window
+        return missed + 1, buffer.last_open_time
+
+    async def _refresh_one(self, symbol: str, interval: str, limit: int):
+        buffer = self._buffer(symbol, interval)
+        plan = self._plan(buffer, interval, limit)
+        if plan is None:
+            self.skipped += 1
+            return
+        fetch_limit, start_time = plan
+        rows = await self.async_binance.get_klines_array(symbol, interval, fetch_limit, start_time=start_time)
+        if isinstance(rows, dict):
+            logger.warning(f"Kline refresh failed for {symbol}: {rows.get('error')}")
+            return
+        with self._lock:
+            if start_time is None:
+                buffer.reset(rows)
+                self.full_fetches += 1
+            else:
+                buffer.merge(rows)
+                self.incremental_fetches += 1
+
+    async def refresh_async(self, symbols: Iterable[str], interval: str, limit: int):
+        await asyncio.gather(*(self._refresh_one(symbol, interval, limit) for symbol in symbols))
+
+    def refresh(self, symbols: Iterable[str], interval: str = '1m', limit: int = 100) -> Dict[str, np.ndarray]:
+        """Bring every symbol up to date concurrently and return views of the newest limit candles"""
+        symbols = list(symbols)
+        get_background_loop().run(self.refresh_async(symbols, interval, limit))
+        views = {}
+        for symbol in symbols:
+            view = self.view(symbol, interval, limit)
+            if view is not None:
+                views[symbol] = view
+        return views
+
+    def get(self, symbol: str, interval: str = '1m', limit: int = 100) -> Optional[np.ndarray]:
+        """Refreshed view of one symbol's newest limit candles"""
+        return self.refresh([symbol], interval, limit).get(symbol)
+
+    def view(self, symbol: str, interval: str = '1m', limit: int = 100) -> Optional[np.ndarray]:
+        """View of held candles without refreshing"""
+        buffer = self.buffers.get((symbol, interval))
+        return buffer.view(limit) if buffer is not None else None
+
+    def get_stats(self) -> Dict:
+        return {
+            'buffers': len(self.buffers),
+            'full_fetches': self.full_fetches,
+            'incremental_fetches': self.incremental_fetches,
+            'skipped': self.skipped
+        }
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+def get_shared_candle_store() -> CandleStore:
+    """Get the process-wide candle store shared by all strategies"""
+    global _shared_store
+
+    if _shared_store is None:
+        with _shared_store_lock:
+            if _shared_store is None:
+                _shared_store = CandleStore()
+    return _shared_store
@@ -8,6 +8,7 @@ class Config:
     # Binance API Configuration
     BINANCE_API_KEY = os.getenv('BINANCE_API_KEY', 'your_api_key_here')
     BINANCE_SECRET_KEY = os.getenv('BINANCE_SECRET_KEY', 'your_secret_key_here')
+    BINANCE_BASE_URL = os.getenv('BINANCE_BASE_URL', 'https://api.binance.com')  # Point at exchange_simulator.py for offline runs
     
     # Ultra Trading Configuration - OneMilX Strategy (45 USD Start)
     RISK_MODE = os.getenv('RISK_MODE', 'ultra')  # 'ultra' for 1M goal
@@ -20,12 +21,72 @@ class Config:
     # Ultra Aggressive Settings
     STOP_LOSS_PERCENTAGE = float(os.getenv('STOP_LOSS_PERCENTAGE', '0.5'))  # 0.5% stop loss
     TAKE_PROFIT_PERCENTAGE = float(os.getenv('TAKE_PROFIT_PERCENTAGE', '1.0'))  # 1% take profit
+    EXCHANGE_EXITS_ENABLED = os.getenv('EXCHANGE_EXITS_ENABLED', 'true').lower() == 'true'  # Rest SL/TP as OCO orders on the exchange
+    EXIT_STOP_LIMIT_OFFSET = 0.2  # % below the stop trigger for the stop's limit price
+    EXIT_SYNC_INTERVAL = 5.0  # Seconds between open order list checks
     
     # Market Configuration - Ultra Fast
     TOP_COINS_COUNT = 100  # Start with 100 coins
     SCAN_INTERVAL = 5  # 5 seconds between scans
+    SCAN_MIN_INTERVAL = 1.0  # Seconds between visits to a symbol that is moving or held
+    SCAN_MAX_INTERVAL = 60.0  # Seconds between visits to a quiet symbol
+    SCAN_REJECT_COOLDOWN = 120.0  # Seconds a symbol rests after a signal that did not become a trade
+    SCAN_CYCLE_DEADLINE = 0.8  # Fraction of SCAN_INTERVAL a cycle may take before it counts as an overrun
+    SCAN_VOLATILITY_REFERENCE = 0.2  # % move per candle that counts as one unit of activity
     VOLUME_SPIKE_THRESHOLD = 1.5  # 150% volume increase
     PRICE_SPIKE_THRESHOLD = 0.5   # 0.5% price increase
+    SCAN_WORKERS = int(os.getenv('SCAN_WORKERS', '1'))  # Threads analyzing symbols; analysis is GIL-bound once the scan has prefetched its data, so serial by default
+    ANALYSIS_PROCESSES = int(os.getenv('ANALYSIS_PROCESSES', '0'))  # Worker processes for indicator passes; 0 keeps them in-process
+    ANALYSIS_PROCESS_MIN_SYMBOLS = 200  # Smaller universes are scored in-process, where IPC would cost more than it saves
+    
+    # Screening Funnel (first stage over the 24hr ticker snapshot)
+    SCREENER_ENABLED = os.getenv('SCREENER_ENABLED', 'true').lower() == 'true'
+    SCREENER_TOP_K = int(os.getenv('SCREENER_TOP_K', '30'))  # Symbols passed on to full analysis per cycle
+    SCREENER_MAX_SPREAD_BPS = float(os.getenv('SCREENER_MAX_SPREAD_BPS', '25'))  # Wider books are not worth scalping
+    SCREENER_MIN_QUOTE_VOLUME = float(os.getenv('SCREENER_MIN_QUOTE_VOLUME', '100000'))  # 24h USDT volume floor
+    SCREENER_MIN_CHANGE_PCT = 0.2  # Price move since the previous snapshot that marks a symbol as moving
+    SCREENER_MIN_VOLUME_RATIO = 1.5  # Recent volume vs the 24h average rate that marks a symbol as moving
+    
+    # HTTP Connection Pooling
+    HTTP_POOL_HOSTS = 4  # Distinct hosts kept in the pool cache
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '20'))  # Keep-alive connections per host
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '3.05'))
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '10'))
+    HTTP_WARM_CONNECTIONS = int(os.getenv('HTTP_WARM_CONNECTIONS', '4'))  # Connections opened at startup
+    ASYNC_MAX_IN_FLIGHT = int(os.getenv('ASYNC_MAX_IN_FLIGHT', '20'))  # Concurrent requests during scan fan-out
+    
+    # Binance Rate Limits
+    RATE_LIMIT_WEIGHT_PER_MINUTE = int(os.getenv('RATE_LIMIT_WEIGHT_PER_MINUTE', '6000'))  # REQUEST_WEIGHT per minute
+    RATE_LIMIT_ORDERS_PER_10S = int(os.getenv('RATE_LIMIT_ORDERS_PER_10S', '100'))  # ORDERS per 10 seconds
+    RATE_LIMIT_HEADROOM = float(os.getenv('RATE_LIMIT_HEADROOM', '0.8'))  # Fraction of the published limits we use
+    RATE_LIMIT_SCAN_RESERVE = 0.3  # Budget fraction scanning leaves for orders, monitoring and web requests
+    
+    # Market Data Caching
+    SYMBOL_INDEX_TTL = int(os.getenv('SYMBOL_INDEX_TTL', '3600'))  # Seconds between exchangeInfo refreshes
+    SYMBOL_INDEX_RETRY = 60.0  # Seconds after a failed exchangeInfo download before trying again
+    PRICE_SNAPSHOT_MAX_AGE = float(os.getenv('PRICE_SNAPSHOT_MAX_AGE', '1.0'))  # Seconds an entry price may be reused
+    DEPTH_CACHE_TTL = float(os.getenv('DEPTH_CACHE_TTL', '1.0'))  # Seconds an order book is shared between strategies
+    TICKER_24H_MAX_AGE = float(os.getenv('TICKER_24H_MAX_AGE', '30'))  # Seconds between full 24hr ticker downloads
+    CANDLE_STORE_CAPACITY = 240  # Candles kept per (symbol, interval) ring buffer
+    CANDLE_REFRESH_MIN_AGE = float(os.getenv('CANDLE_REFRESH_MIN_AGE', '1.0'))  # Seconds before a buffer is refreshed again
+    
+    # WebSocket Market Data
+    MARKET_STREAM_ENABLED = os.getenv('MARKET_STREAM_ENABLED', 'false').lower() == 'true'
+    BINANCE_WS_URL = os.getenv('BINANCE_WS_URL', 'wss://stream.binance.com:9443')
+    STREAM_MAX_PER_CONNECTION = 200  # Binance allows up to 1024 streams per connection
+    STREAM_MAX_AGE = 5.0  # Seconds before streamed state is considered stale
+    LOCAL_ORDER_BOOKS = os.getenv('LOCAL_ORDER_BOOKS', 'true').lower() == 'true'  # Maintain books from depth diffs when streaming
+    ORDER_BOOK_SNAPSHOT_LIMIT = 1000  # Levels fetched when seeding or resyncing a local book
+    USER_STREAM_ENABLED = os.getenv('USER_STREAM_ENABLED', 'true').lower() == 'true'  # Balances and fills from the user data stream
+    USER_STREAM_KEEPALIVE = 1800  # Seconds between listenKey keepalives (keys expire after 60 minutes)
+    POSITION_MONITOR_ENABLED = os.getenv('POSITION_MONITOR_ENABLED', 'true').lower() == 'true'  # Check exits on their own thread, not after each scan
+    POSITION_MONITOR_INTERVAL = float(os.getenv('POSITION_MONITOR_INTERVAL', '1.0'))  # Seconds between exit checks without a stream price
+    POSITION_MONITOR_BUDGET = 0.25  # Seconds allowed from trigger detection to exit order before a warning
+    POSITION_MONITOR_RETRY_BACKOFF = 1.0  # Seconds a position waits after a failed exit, doubled on each failure in a row
+    POSITION_MONITOR_RETRY_MAX = 30.0  # Longest wait between exit retries
+    EVENT_DRIVEN = os.getenv('EVENT_DRIVEN', 'false').lower() == 'true'  # Trade on stream events instead of the scan loop (needs the market stream)
+    ENGINE_INTERVAL = '1m'  # Candle interval whose closes drive event-driven strategies
+    ENGINE_HISTORY = 100  # Candles handed to on_candle_close
     
     # Compound Reinvestment
     COMPOUND_MODE = True  # Always reinvest profits
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stand-in for the Binance REST endpoints used by BinanceClient.
+
+Record a real session:   python exchange_simulator.py record --file recordings/session.jsonl
+Replay it offline:       python exchange_simulator.py replay --file recordings/session.jsonl --latency 0.02 --jitter 0.005
+Synthetic universe:      python exchange_simulator.py synthesize --file recordings/synthetic.jsonl --symbols 100
+
+Point a client at it with BINANCE_BASE_URL=http://127.0.0.1:8080 or BinanceClient(base_url=...).
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qsl
+import requests
+from rate_limiter import endpoint_weight
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Query parameters that change on every signed call and must not affect matching
+VOLATILE_PARAMS = {'timestamp', 'signature', 'recvWindow'}
+
+# Taker fee on simulated market fills, charged in the asset received like a spot account without BNB
+COMMISSION_RATE = 0.001
+
+def request_key(method: str, path: str, params: Dict) -> str:
+    stable = sorted((k, v) for k, v in params.items() if k not in VOLATILE_PARAMS)
+    return f"{method} {path}?" + '&'.join(f"{k}={v}" for k, v in stable)
+
+class Recording:
+    """Recorded responses indexed for exact and fallback lookups"""
+
+    def __init__(self, entries: List[Dict] = None):
+        self.entries = []
+        self.exact = {}       # full key -> [entries]
+        self.by_symbol = {}   # (method, path, symbol) -> [entries]
+        self.by_path = {}     # (method, path) -> [entries]
+        self._cursors = {}
+        self._lock = threading.Lock()
+        for entry in entries or []:
+            self.add(entry)
+
+    @classmethod
+    def load(cls, path: str) -> 'Recording':
+        with open(path) as f:
+            return cls([json.loads(line) for line in f if line.strip()])
+
+    def add(self, entry: Dict):
+        method, path, params = entry['method'], entry['path'], entry.get('params', {})
+        self.entries.append(entry)
+        self.exact.setdefault(request_key(method, path, params), []).append(entry)
+        self.by_symbol.setdefault((method, path, params.get('symbol')), []).append(entry)
+        self.by_path.setdefault((method, path), []).append(entry)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as f:
+            for entry in self.entries:
+                f.write(json.dumps(entry) + '\n')
+
+    def _next(self, bucket_key, bucket: List[Dict]) -> Dict:
+        # Successive calls walk through the recorded sequence, then repeat the last response
+        with self._lock:
+            cursor = self._cursors.get(bucket_key, 0)
+            self._cursors[bucket_key] = cursor + 1
+        return bucket[min(cursor, len(bucket) - 1)]
+
+    def find(self, method: str, path: str, params: Dict) -> Tuple[Optional[Dict], bool]:
+        """Best recorded response and whether it matched the parameters exactly"""
+        key = request_key(method, path, params)
+        if key in self.exact:
+            return self._next(key, self.exact[key]), True
+        symbol_key = (method, path, params.get('symbol'))
+        if params.get('symbol') and symbol_key in self.by_symbol:
+            return self._next(symbol_key, self.by_symbol[symbol_key]), False
+        if not params.get('symbol') and (method, path) in self.by_path:
+            return self._next((method, path), self.by_path[(method, path)]), False
+        return None, False
+
+class ExchangeSimulator:
+    """Threaded HTTP server that records from or replays to BinanceClient"""
+
+    def __init__(self, mode: str = 'replay', recording: Recording = None, record_path: str = None,
+                 upstream: str = 'https://api.binance.com', latency: float = 0.0, jitter: float = 0.0,
+                 seed: int = 0, host: str = '127.0.0.1', port: int = 0):
+        self.mode = mode
+        self.recording = recording or Recording()
+        self.record_path = record_path
+        self.upstream = upstream.rstrip('/')
+        self.latency = latency
+        self.jitter = jitter
+        self.host = host
+        self.port = port
+
+        self.requests_served = 0
+        self.misses = 0
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._order_id = 1000
+        self._orders = {}       # orderId -> order placed through the simulator
+        self._order_lists = {}  # orderListId -> OCO list
+        self._weight_window = (0, 0)  # (minute, used weight)
+        self._state_lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> str:
+        """Serve in a background thread and return the base URL"""
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                simulator.handle(self, 'GET')
+
+            def do_POST(self):
+                simulator.handle(self, 'POST')
+
+            def do_PUT(self):
+                simulator.handle(self, 'PUT')
+
+            def do_DELETE(self):
+                simulator.handle(self, 'DELETE')
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='exchange-simulator', daemon=True)
+        self._thread.start()
+        logger.info(f"Exchange simulator ({self.mode}) listening on {self.base_url}")
+        return self.base_url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self.mode == 'record' and self.record_path:
+            self.recording.save(self.record_path)
+            logger.info(f"Saved {len(self.recording.entries)} responses to {self.record_path}")
+
+    # Request handling
+
+    def handle(self, handler: BaseHTTPRequestHandler, method: str):
+        parsed = urlparse(handler.path)
+        params = dict(parse_qsl(parsed.query))
+        length = int(handler.headers.get('Content-Length') or 0)
+        if length:
+            params.update(parse_qsl(handler.rfile.read(length).decode()))
+
+        if self.mode == 'record':
+            status, body = self._proxy(handler, method, parsed.path, parsed.query, params)
+        else:
+            self._sleep_latency()
+            status, body = self._replay(method, parsed.path, params)
+
+        payload = body.encode() if isinstance(body, str) else body
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(payload)))
+        handler.send_header('X-MBX-USED-WEIGHT-1M', str(self._charge(method, parsed.path, params)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+        self.requests_served += 1
+
+    def _sleep_latency(self):
+        if self.latency <= 0 and self.jitter <= 0:
+            return
+        with self._random_lock:
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+        time.sleep(max(0.0, delay))
+
+    def _charge(self, method: str, path: str, params: Dict) -> int:
+        """Track request weight per minute like the real exchange reports it"""
+        minute = int(time.time() // 60)
+        with self._state_lock:
+            window_minute, used = self._weight_window
+            if window_minute != minute:
+                used = 0
+            used += endpoint_weight(method, path, params)
+            self._weight_window = (minute, used)
+            return used
+
+    def _proxy(self, handler, method: str, path: str, query: str, params: Dict) -> Tuple[int, str]:
+        headers = {}
+        if handler.headers.get('X-MBX-APIKEY'):
+            headers['X-MBX-APIKEY'] = handler.headers['X-MBX-APIKEY']
+        url = f"{self.upstream}{path}" + (f"?{query}" if query else '')
+        try:
+            response = requests.request(method, url, headers=headers, timeout=10)
+            status, body = response.status_code, response.text
+        except requests.exceptions.RequestException as e:
+            status, body = 502, json.dumps({'code': -1000, 'msg': str(e)})
+
+        self.recording.add({'method': method, 'path': path, 'params': {
+            k: v for k, v in params.items() if k not in VOLATILE_PARAMS
+        }, 'status': status, 'body': body})
+        return status, body
+
+    def _replay(self, method: str, path: str, params: Dict) -> Tuple[int, str]:
+        entry, exact = self.recording.find(method, path, params)
+        if entry is not None:
+            body = entry['body']
+            if not exact:
+                body = self._adapt(path, params, body)
+            return entry.get('status', 200), body
+
+        synthetic = self._synthesize(method, path, params)
+        if synthetic is not None:
+            return 200, json.dumps(synthetic)
+
+        self.misses += 1
+        return 404, json.dumps({'code': -1121, 'msg': f'No recording for {request_key(method, path, params)}'})
+
+    def _adapt(self, path: str, params: Dict, body: str) -> str:
+        """Trim a recorded klines/depth response to the requested startTime and limit"""
+        if 'limit' not in params or path not in ('/api/v3/klines', '/api/v3/depth'):
+            return body
+        limit = int(params['limit'])
+        data = json.loads(body)
+        if path == '/api/v3/klines' and isinstance(data, list):
+            if 'startTime' in params:
+                start_time = int(params['startTime'])
+                data = [row for row in data if row[0] >= start_time][:limit]
+            else:
+                data = data[-limit:]
+        elif path == '/api/v3/depth' and isinstance(data, dict):
+            data['bids'] = data.get('bids', [])[:limit]
+            data['asks'] = data.get('asks', [])[:limit]
+        return json.dumps(data)
+
+    def _market_price(self, symbol: str) -> float:
+        entry, _ = self.recording.find('GET', '/api/v3/ticker/price', {'symbol': symbol})
+        return float(json.loads(entry['body'])['price']) if entry is not None else 0.0
+
+    def _market_fills(self, params: Dict) -> List[Dict]:
+        """One fill at the recorded price, with commission in the base asset on a BUY and the quote on a SELL"""
+        symbol, quantity = params.get('symbol', ''), float(params.get('quantity') or 0)
+        price = self._market_price(symbol)
+        base_asset, quote_asset = symbol[:-4], symbol[-4:]
+        if params.get('side') == 'BUY':
+            commission, asset = quantity * COMMISSION_RATE, base_asset
+        else:
+            commission, asset = quantity * price * COMMISSION_RATE, quote_asset
+        return [{'price': f"{price:.8f}", 'qty': params.get('quantity'), 'commission': f"{commission:.8f}",
+                 'commissionAsset': asset}]
+
+    def fill_order(self, order_id: int, price: float = None) -> Dict:
+        """Fill a resting order as if the market reached it; the other legs of its OCO are cancelled"""
+        with self._state_lock:
+            order = self._orders[order_id]
+            price = price if price is not None else float(order['price'])
+            order.update(status='FILLED', executedQty=order['origQty'],
+                         cummulativeQuoteQty=format(price * float(order['origQty']), '.8f'))
+            order_list = self._order_lists.get(order['orderListId'])
+            if order_list is not None:
+                order_list.update(listStatusType='ALL_DONE', listOrderStatus='ALL_DONE')
+                for leg in order_list['orders']:
+                    if self._orders[leg['orderId']]['status'] == 'NEW':
+                        self._orders[leg['orderId']]['status'] = 'CANCELED'
+            return order
+
+    def _new_order(self, params: Dict, order_type: str, status: str, price: str = None,
+                   stop_price: str = None, order_list_id: int = -1) -> Dict:
+        with self._state_lock:
+            self._order_id += 1
+            order_id = self._order_id
+        order = {
+            'symbol': params.get('symbol'),
+            'orderId': order_id,
+            'orderListId': order_list_id,
+            'clientOrderId': f'sim-{order_id}',
+            'transactTime': int(time.time() * 1000),
+            'price': price or '0',
+            'stopPrice': stop_price or '0',
+            'origQty': params.get('quantity'),
+            'executedQty': params.get('quantity') if status == 'FILLED' else '0',
+            'cummulativeQuoteQty': '0',
+            'status': status,
+            'type': order_type,
+            'side': params.get('side')
+        }
+        self._orders[order_id] = order
+        return order
+
+    def _synthesize(self, method: str, path: str, params: Dict) -> Optional[object]:
+        """Deterministic answers for account and order calls that were not recorded"""
+        if path == '/api/v3/ping':
+            return {}
+        if path == '/api/v3/order' and method == 'POST':
+            if params.get('type') == 'MARKET':
+                return dict(self._new_order(params, 'MARKET', 'FILLED'), fills=self._market_fills(params))
+            return self._new_order(params, params.get('type'), 'NEW', params.get('price'), params.get('stopPrice'))
+        if path == '/api/v3/order' and method == 'GET':
+            return self._orders.get(int(params.get('orderId', 0)))
+        if path == '/api/v3/order' and method == 'DELETE':
+            order = self._orders.get(int(params.get('orderId', 0)))
+            if order is None or order['status'] != 'NEW':
+                return None
+            order['status'] = 'CANCELED'
+            return order
+        if path == '/api/v3/orderList/oco' and method == 'POST':
+            # SELL exits put the take profit above the market; BUY OCOs mirror it
+            limit_side, stop_side = ('above', 'below') if params.get('side') == 'SELL' else ('below', 'above')
+            with self._state_lock:
+                order_list_id = len(self._order_lists) + 1
+            reports = [
+                self._new_order(params, 'LIMIT_MAKER', 'NEW', params.get(f'{limit_side}Price'), order_list_id=order_list_id),
+                self._new_order(params, 'STOP_LOSS_LIMIT', 'NEW', params.get(f'{stop_side}Price'),
+                                params.get(f'{stop_side}StopPrice'), order_list_id=order_list_id)
+            ]
+            order_list = {
+                'orderListId': order_list_id,
+                'contingencyType': 'OCO',
+                'listStatusType': 'EXEC_STARTED',
+                'listOrderStatus': 'EXECUTING',
+                'symbol': params.get('symbol'),
+                'orders': [{'symbol': r['symbol'], 'orderId': r['orderId'], 'clientOrderId': r['clientOrderId']} for r in reports]
+            }
+            self._order_lists[order_list_id] = order_list
+            return dict(order_list, orderReports=reports)
+        if path == '/api/v3/orderList' and method == 'GET':
+            return self._order_lists.get(int(params.get('orderListId', 0)))
+        if path == '/api/v3/orderList' and method == 'DELETE':
+            order_list = self._order_lists.get(int(params.get('orderListId', 0)))
+            if order_list is None or order_list['listOrderStatus'] != 'EXECUTING':
+                return None
+            order_list.update(listStatusType='ALL_DONE', listOrderStatus='ALL_DONE')
+            for leg in order_list['orders']:
+                self._orders[leg['orderId']]['status'] = 'CANCELED'
+            return order_list
+        if path == '/api/v3/openOrderList':
+            return [order_list for order_list in self._order_lists.values() if order_list['listOrderStatus'] == 'EXECUTING']
+        if path == '/api/v3/userDataStream':
+            return {'listenKey': 'simulated-listen-key'} if method == 'POST' else {}
+        if path == '/api/v3/account':
+            return {'accountType': 'SPOT', 'balances': [{'asset': 'USDT', 'free': '1000.00000000', 'locked': '0.00000000'}]}
+        if path == '/api/v3/openOrders':
+            return [order for order in self._orders.values()
+                    if order['status'] == 'NEW' and order['symbol'] == params.get('symbol', order['symbol'])]
+        return None
+
+def synthesize_recording(symbols: List[str], seed: int = 0, candles: int = 100, levels: int = 100,
+                         end_time: int = None) -> Recording:
+    """Deterministic random-walk market covering every public endpoint the strategies call"""
+    rng = random.Random(seed)
+    recording = Recording()
+    # Candles end at the current minute so incremental startTime refreshes line up with the clock
+    now = end_time if end_time is not None else int(time.time() // 60) * 60000 + 60000
+    prices, tickers, tickers_24h, exchange_symbols = {}, [], [], []
+
+    for symbol in symbols:
+        price = round(rng.uniform(0.1, 500), 4)
+        klines = []
+        for i in range(candles):
+            open_price = price
+            price = max(0.0001, price * (1 + rng.gauss(0, 0.003)))
+            high = max(open_price, price) * (1 + abs(rng.gauss(0, 0.001)))
+            low = min(open_price, price) * (1 - abs(rng.gauss(0, 0.001)))
+            volume = rng.uniform(100, 10000)
+            open_time = now - (candles - i) * 60000
+            klines.append([open_time, f"{open_price:.6f}", f"{high:.6f}", f"{low:.6f}", f"{price:.6f}",
+                           f"{volume:.4f}", open_time + 59999, f"{volume * price:.4f}", rng.randint(10, 500),
+                           f"{volume / 2:.4f}", f"{volume * price / 2:.4f}", "0"])
+        recording.add({'method': 'GET', 'path': '/api/v3/klines', 'status': 200,
+                       'params': {'symbol': symbol, 'interval': '1m', 'limit': str(candles)}, 'body': json.dumps(klines)})
+
+        tick = price * 0.0005
+        depth = {
+            'lastUpdateId': rng.randint(1, 10 ** 9),
+            'bids': [[f"{price - tick * (i + 1):.6f}", f"{rng.expovariate(0.1):.4f}"] for i in range(levels)],
+            'asks': [[f"{price + tick * (i + 1):.6f}", f"{rng.expovariate(0.1):.4f}"] for i in range(levels)]
+        }
+        recording.add({'method': 'GET', 'path': '/api/v3/depth', 'status': 200,
+                       'params': {'symbol': symbol, 'limit': str(levels)}, 'body': json.dumps(depth)})
+
+        prices[symbol] = price
+        tickers.append({'symbol': symbol, 'price': f"{price:.6f}"})
+        change = rng.uniform(-15, 15)
+        tickers_24h.append({
+            'symbol': symbol, 'priceChangePercent': f"{change:.3f}", 'lastPrice': f"{price:.6f}",
+            'bidPrice': f"{price - tick:.6f}", 'askPrice': f"{price + tick:.6f}",
+            'highPrice': f"{price * 1.05:.6f}", 'lowPrice': f"{price * 0.95:.6f}",
+            'volume': f"{rng.uniform(1e4, 1e7):.2f}", 'quoteVolume': f"{rng.uniform(1e5, 1e8):.2f}"
+        })
+        exchange_symbols.append({
+            'symbol': symbol, 'status': 'TRADING', 'isSpotTradingAllowed': True,
+            'baseAsset': symbol[:-4], 'quoteAsset': 'USDT',
+            'filters': [
+                {'filterType': 'PRICE_FILTER', 'minPrice': '0.00000100', 'maxPrice': '1000000.00000000', 'tickSize': '0.00000100'},
+                {'filterType': 'LOT_SIZE', 'minQty': '0.00100000', 'maxQty': '9000000.00000000', 'stepSize': '0.00100000'},
+                {'filterType': 'NOTIONAL', 'minNotional': '5.00000000'}
+            ]
+        })
+
+    recording.add({'method': 'GET', 'path': '/api/v3/ticker/price', 'status': 200, 'params': {}, 'body': json.dumps(tickers)})
+    recording.add({'method': 'GET', 'path': '/api/v3/ticker/24hr', 'status': 200, 'params': {}, 'body': json.dumps(tickers_24h)})
+    recording.add({'method': 'GET', 'path': '/api/v3/exchangeInfo', 'status': 200, 'params': {},
+                   'body': json.dumps({'timezone': 'UTC', 'symbols': exchange_symbols})})
+    for symbol, price in prices.items():
+        recording.add({'method': 'GET', 'path': '/api/v3/ticker/price', 'status': 200,
+                       'params': {'symbol': symbol}, 'body': json.dumps({'symbol': symbol, 'price': f"{price:.6f}"})})
+    return recording
+
+def main():
+    parser = argparse.ArgumentParser(description='Record or replay Binance REST traffic')
+    parser.add_argument('command', choices=['record', 'replay', 'synthesize'])
+    parser.add_argument('--file', required=True, help='JSONL recording path')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every replayed response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Uniform +/- seconds around the latency')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--symbols', type=int, default=100, help='Universe size for synthesize')
+    args = parser.parse_args()
+
+    if args.command == 'synthesize':
+        symbols = [f"SIM{i:03d}USDT" for i in range(args.symbols)]
+        synthesize_recording(symbols, seed=args.seed).save(args.file)
+        logger.info(f"Wrote synthetic recording for {len(symbols)} symbols to {args.file}")
+        return
+
+    if args.command == 'record':
+        simulator = ExchangeSimulator('record', record_path=args.file, port=args.port)
+    else:
+        simulator = ExchangeSimulator('replay', Recording.load(args.file), latency=args.latency,
+                                      jitter=args.jitter, seed=args.seed, port=args.port)
+    simulator.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        simulator.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+import time
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# executionReport statuses that end an order without it trading
+ENDED_WITHOUT_FILL = {'CANCELED', 'REJECTED', 'EXPIRED', 'EXPIRED_IN_MATCH'}
+
+def format_decimal(value: float) -> str:
+    """Plain decimal string Binance accepts (never scientific notation)"""
+    return np.format_float_positional(value, trim='-')
+
+def held_quantity(order: Dict, base_asset: Optional[str], quantity: float) -> float:
+    """Base asset a BUY left in the account: the filled quantity less commission charged in that asset"""
+    fills = order.get('fills') or []
+    if not fills:
+        return float(order.get('executedQty') or quantity)
+    bought = sum(float(fill['qty']) for fill in fills)
+    commission = sum(float(fill['commission']) for fill in fills if fill.get('commissionAsset') == base_asset)
+    return bought - commission
+
+class ExitOrder:
+    """Exchange-side exit for one position: an OCO pair, or a lone stop when OCO is refused"""
+
+    __slots__ = ('symbol', 'quantity', 'stop_loss', 'take_profit', 'order_list_id',
+                 'stop_order_id', 'take_profit_order_id', 'placed_at')
+
+    def __init__(self, symbol: str, quantity: float, stop_loss: float, take_profit: float,
+                 order_list_id: int = None, stop_order_id: int = None, take_profit_order_id: int = None):
+        self.symbol = symbol
+        self.quantity = quantity
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.order_list_id = order_list_id
+        self.stop_order_id = stop_order_id
+        self.take_profit_order_id = take_profit_order_id
+        self.placed_at = time.time()
+
+    @property
+    def is_oco(self) -> bool:
+        return self.order_list_id is not None
+
+    @property
+    def covers_take_profit(self) -> bool:
+        """Whether the take profit also rests on the exchange"""
+        return self.take_profit_order_id is not None
+
+class ExitOrderManager:
+    """Attaches stop-loss/take-profit exits at entry and tracks them until they fill or are cancelled"""
+
+    def __init__(self, binance_client):
+        self.binance = binance_client
+        self.exits = {}  # symbol -> ExitOrder
+        self.last_sync = 0.0
+        self.user_stream = None
+        self._fills = []  # Fills pushed by the user data stream, drained by sync()
+        self._ended = {}  # symbol -> ExitOrder the stream saw end without a fill, settled by sync()
+
+        self.placed = 0
+        self.filled = 0
+        self.cancelled = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def has(self, symbol: str) -> bool:
+        return symbol in self.exits
+
+    def get(self, symbol: str) -> Optional[ExitOrder]:
+        return self.exits.get(symbol)
+
+    def net_quantity(self, symbol: str, quantity: float, entry_order: Dict = None) -> float:
+        """What a BUY left to sell: the filled quantity less base-asset commission, floored to LOT_SIZE"""
+        rules = self.binance.symbol_index.get(symbol)
+        if entry_order is not None:
+            quantity = held_quantity(entry_order, rules.base_asset if rules else None, quantity)
+        # Floors onto the LOT_SIZE step, so a sell never asks for more than is held
+        return rules.quantize_quantity(quantity) if rules else quantity
+
+    def attach(self, symbol: str, quantity: float, stop_loss: float, take_profit: float,
+               entry_order: Dict = None) -> Optional[ExitOrder]:
+        """Place a SELL OCO (take profit LIMIT_MAKER + STOP_LOSS_LIMIT), falling back to a lone stop.
+
+        With the entry's order response the exit sells what the BUY actually left after commission.
+        """
+        rules = self.binance.symbol_index.get(symbol)
+        stop_limit = stop_loss * (1 - Config.EXIT_STOP_LIMIT_OFFSET / 100)
+        quantity = self.net_quantity(symbol, quantity, entry_order)
+        if rules:
+            stop_loss = rules.quantize_price(stop_loss)
+            stop_limit = rules.quantize_price(stop_limit)
+            take_profit = rules.quantize_price(take_profit)
+
+        response = self.binance.place_oco_order(
+            symbol, 'SELL', format_decimal(quantity), format_decimal(take_profit),
+            format_decimal(stop_loss), format_decimal(stop_limit)
+        )
+
+        if 'error' not in response:
+            exit_order = ExitOrder(symbol, quantity, stop_loss, take_profit, order_list_id=response['orderListId'])
+            for report in response.get('orderReports', []):
+                if report.get('type') == 'LIMIT_MAKER':
+                    exit_order.take_profit_order_id = report['orderId']
+                else:
+                    exit_order.stop_order_id = report['orderId']
+        else:
+            # Symbols without OCO support still get an exchange-side stop; take profit stays client side
+            logger.warning(f"OCO rejected for {symbol} ({response['error']}), placing stop only")
+            response = self.binance.place_stop_loss_order(
+                symbol, 'SELL', format_decimal(quantity), format_decimal(stop_loss), format_decimal(stop_limit)
+            )
+            if 'error' in response:
+                self.failed += 1
+                logger.error(f"Could not attach exit orders for {symbol}: {response['error']}")
+                return None
+            exit_order = ExitOrder(symbol, quantity, stop_loss, take_profit, stop_order_id=response['orderId'])
+
+        with self._lock:
+            self.exits[symbol] = exit_order
+            self.placed += 1
+        logger.info(f"Exit orders attached for {symbol}: stop {stop_loss}, take profit {take_profit}")
+        return exit_order
+
+    def cancel(self, symbol: str) -> bool:
+        """Cancel a position's exits before closing it another way; False means they may have filled"""
+        exit_order = self.exits.get(symbol)
+        if exit_order is None:
+            return True
+
+        if exit_order.is_oco:
+            response = self.binance.cancel_order_list(symbol, exit_order.order_list_id)
+        else:
+            response = self.binance.cancel_order(symbol, exit_order.stop_order_id)
+
+        if 'error' in response:
+            logger.warning(f"Could not cancel exit orders for {symbol}: {response['error']}")
+            return False
+
+        with self._lock:
+            self.exits.pop(symbol, None)
+            self.cancelled += 1
+        return True
+
+    def forget(self, symbol: str):
+        with self._lock:
+            self.exits.pop(symbol, None)
+
+    def attach_user_stream(self, user_stream):
+        """Learn about exit fills and cancellations from user data events instead of polling"""
+        self.user_stream = user_stream
+        user_stream.subscribe(self.on_user_event)
+
+    def on_user_event(self, kind: str, event: Dict):
+        if kind == 'listStatus':
+            exit_order = self.exits.get(event.get('s'))
+            if exit_order is not None and exit_order.order_list_id == event.get('g') and event.get('L') == 'ALL_DONE':
+                self._end(exit_order)
+            return
+        if kind != 'executionReport':
+            return
+        exit_order = self.exits.get(event['s'])
+        if exit_order is None or event['i'] not in (exit_order.stop_order_id, exit_order.take_profit_order_id):
+            return
+        if event.get('X') in ENDED_WITHOUT_FILL:
+            self._end(exit_order)
+            return
+        if event.get('X') != 'FILLED':
+            return
+
+        executed = float(event['z'])
+        price = float(event['Z']) / executed if executed > 0 else float(event['L'])
+        reason = 'take_profit' if event['i'] == exit_order.take_profit_order_id else 'stop_loss'
+        with self._lock:
+            self.exits.pop(exit_order.symbol, None)
+            self.filled += 1
+            self._fills.append({'symbol': exit_order.symbol, 'reason': reason, 'price': price,
+                                'quantity': exit_order.quantity})
+
+    def _end(self, exit_order: ExitOrder):
+        """Leave an exit the exchange finished to sync(): an OCO leg also expires when its partner fills"""
+        with self._lock:
+            self._ended[exit_order.symbol] = exit_order
+
+    def _fill_of(self, symbol: str, order_id: int) -> Optional[float]:
+        """Average fill price of an order, or None if it did not fill"""
+        order = self.binance.get_order_status(symbol, order_id)
+        if 'error' in order or order.get('status') != 'FILLED':
+            return None
+        executed = float(order.get('executedQty') or 0)
+        quote = float(order.get('cummulativeQuoteQty') or 0)
+        if executed > 0 and quote > 0:
+            return quote / executed
+        return float(order.get('price') or 0) or None
+
+    def _resolve(self, exit_order: ExitOrder) -> Optional[Dict]:
+        """Which leg of a finished exit filled, and at what price"""
+        for reason, order_id in (('take_profit', exit_order.take_profit_order_id),
+                                 ('stop_loss', exit_order.stop_order_id)):
+            if order_id is None:
+                continue
+            price = self._fill_of(exit_order.symbol, order_id)
+            if price is not None:
+                return {'symbol': exit_order.symbol, 'reason': reason, 'price': price, 'quantity': exit_order.quantity}
+        return None
+
+    def sync(self, force: bool = False) -> Tuple[List[Dict], List[str]]:
+        """Find exits that finished on the exchange.
+
+        Returns [{symbol, reason, price, quantity}] for fills, and the symbols whose exits ended
+        without a fill, whose levels the caller must now watch client side.
+        """
+        with self._lock:
+            fills, self._fills = self._fills, []
+            ended, self._ended = self._ended, {}
+        dropped = []
+
+        # Exits the stream saw end are settled over REST, unless a fill event already booked them
+        for symbol, exit_order in ended.items():
+            if self.exits.get(symbol) is exit_order:
+                self._settle(exit_order, self._resolve(exit_order), fills, dropped)
+
+        # A live user data stream already reported every fill and every other ending
+        if self.user_stream is not None and self.user_stream.is_live():
+            return fills, dropped
+        if not self.exits or (not force and time.time() - self.last_sync < Config.EXIT_SYNC_INTERVAL):
+            return fills, dropped
+        self.last_sync = time.time()
+
+        tracked = list(self.exits.values())
+        open_ids = None
+        if any(exit_order.is_oco for exit_order in tracked):
+            # One weight-6 call covers every OCO instead of a status query per position
+            open_lists = self.binance.get_open_order_lists()
+            if isinstance(open_lists, dict):
+                return fills, dropped
+            open_ids = {order_list['orderListId'] for order_list in open_lists}
+
+        for exit_order in tracked:
+            if exit_order.is_oco and exit_order.order_list_id in open_ids:
+                continue
+            fill = self._resolve(exit_order)
+            if fill is None and not exit_order.is_oco:
+                continue  # Lone stop still resting
+            self._settle(exit_order, fill, fills, dropped)
+        return fills, dropped
+
+    def _settle(self, exit_order: ExitOrder, fill: Optional[Dict], fills: List[Dict], dropped: List[str]):
+        """Stop tracking a finished exit, booking its fill or reporting it dropped"""
+        with self._lock:
+            self.exits.pop(exit_order.symbol, None)
+        if fill is not None:
+            self.filled += 1
+            fills.append(fill)
+        else:
+            logger.warning(f"Exit orders for {exit_order.symbol} ended without a fill, monitoring client side")
+            dropped.append(exit_order.symbol)
+
+    def get_stats(self) -> Dict:
+        return {
+            'active': len(self.exits),
+            'placed': self.placed,
+            'filled': self.filled,
+            'cancelled': self.cancelled,
+            'failed': self.failed
+        }
@@ -0,0 +1,67 @@
+import json
+import re
+from typing import Dict, List, Tuple
+import numpy as np
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    orjson = None
+    HAS_ORJSON = False
+
+# Column order of a /api/v3/klines row once decoded to floats
+KLINE_COLUMNS = ('open_time', 'open', 'high', 'low', 'close', 'volume', 'close_time',
+                 'quote_volume', 'trades', 'taker_buy_base', 'taker_buy_quote', 'ignore')
+KLINE_WIDTH = len(KLINE_COLUMNS)
+
+_STRIP_KLINES = b'"[] \n'
+_STRIP_LEVELS = b'"[] \n}'
+_TICKER_PRICE = re.compile(r'"symbol"\s*:\s*"([^"]+)"\s*,\s*"price"\s*:\s*"([^"]+)"')
+
+def loads(raw):
+    """Decode JSON bytes or text with orjson when installed, stdlib json otherwise"""
+    if HAS_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _floats(raw: bytes, width: int) -> np.ndarray:
+    """Parse comma separated numbers into rows of width, raising ValueError on any malformed token"""
+    raw = raw.strip(b', \n')
+    if not raw:
+        return np.zeros((0, width), dtype=np.float64)
+    values = np.array(raw.split(b','), dtype=np.float64)
+    if len(values) % width:
+        raise ValueError(f"expected rows of {width} numbers, got {len(values)} values")
+    return values.reshape(-1, width)
+
+def decode_klines(raw: bytes) -> np.ndarray:
+    """Klines response as an (n, 12) float array in KLINE_COLUMNS order"""
+    return _floats(raw.translate(None, _STRIP_KLINES), KLINE_WIDTH)
+
+def decode_depth(raw: bytes) -> Dict:
+    """Depth response with bids and asks as (n, 2) [price, quantity] float arrays"""
+    bids_at = raw.index(b'"bids"')
+    asks_at = raw.index(b'"asks"')
+    update_id = re.search(rb'"lastUpdateId"\s*:\s*(\d+)', raw)
+    # Payload is {"lastUpdateId":N,"bids":[...],"asks":[...]}; skip past each key's colon
+    bids = raw[raw.index(b':', bids_at) + 1:asks_at]
+    asks = raw[raw.index(b':', asks_at) + 1:]
+    return {
+        'lastUpdateId': int(update_id.group(1)) if update_id else 0,
+        'bids': _floats(bids.translate(None, _STRIP_LEVELS), 2),
+        'asks': _floats(asks.translate(None, _STRIP_LEVELS), 2)
+    }
+
+def decode_ticker_prices(raw: bytes) -> Tuple[List[str], np.ndarray]:
+    """Unparameterised ticker/price response as (symbols, prices) arrays"""
+    if HAS_ORJSON:
+        # orjson builds the small dicts in C faster than a regex can scan the payload
+        tickers = orjson.loads(raw)
+        prices = np.fromiter((float(ticker['price']) for ticker in tickers), dtype=np.float64, count=len(tickers))
+        return [ticker['symbol'] for ticker in tickers], prices
+    matches = _TICKER_PRICE.findall(raw.decode() if isinstance(raw, bytes) else raw)
+    if not matches:
+        return [], np.zeros(0, dtype=np.float64)
+    symbols, prices = zip(*matches)
+    return list(symbols), np.array(prices, dtype=np.float64)
@@ -0,0 +1,128 @@
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class PoolStats:
+    """Thread-safe connection pool hit/miss counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, reused: bool):
+        with self._lock:
+            if reused:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total > 0 else 0.0
+            }
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+def _counting_pool_class(base, stats: PoolStats):
+    """Build a connection pool class that reports reuse to stats"""
+
+    class CountingConnectionPool(base):
+        def _get_conn(self, timeout=None):
+            conn = super()._get_conn(timeout=timeout)
+            # A connection that is already connected skips the TCP/TLS handshake
+            stats.record(bool(getattr(conn, 'is_connected', False)))
+            return conn
+
+    return CountingConnectionPool
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter with per-host keep-alive pools and hit/miss accounting"""
+
+    def __init__(self, pool_connections: int, pool_maxsize: int):
+        self.stats = PoolStats()
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool_class(HTTPConnectionPool, self.stats),
+            'https': _counting_pool_class(HTTPSConnectionPool, self.stats)
+        }
+
+class PooledSession:
+    """Shared keep-alive HTTP session for all API clients in the process"""
+
+    def __init__(self, pool_maxsize: int = None, connect_timeout: float = None, read_timeout: float = None):
+        self.pool_maxsize = pool_maxsize or Config.HTTP_POOL_MAXSIZE
+        self.timeout = (
+            connect_timeout or Config.HTTP_CONNECT_TIMEOUT,
+            read_timeout or Config.HTTP_READ_TIMEOUT
+        )
+
+        self.adapter = PooledHTTPAdapter(Config.HTTP_POOL_HOSTS, self.pool_maxsize)
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self.session.headers.update({'Connection': 'keep-alive'})
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request through the pooled session"""
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def warm_up(self, url: str, connections: int = None) -> int:
+        """Open keep-alive connections ahead of the hot path"""
+        connections = min(connections or self.pool_maxsize, self.pool_maxsize)
+
+        def ping(_):
+            try:
+                self.request('GET', url).close()
+                return True
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Connection warm-up failed: {e}")
+                return False
+
+        # Concurrent requests force the pool to hold that many open sockets
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            warmed = sum(executor.map(ping, range(connections)))
+
+        logger.info(f"Warmed {warmed}/{connections} connections to {url}")
+        return warmed
+
+    def get_pool_stats(self) -> Dict:
+        """Get connection pool hit/miss counters"""
+        stats = self.adapter.stats.snapshot()
+        stats['pool_maxsize'] = self.pool_maxsize
+        return stats
+
+    def close(self):
+        self.session.close()
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+def get_shared_session() -> PooledSession:
+    """Get the process-wide pooled session"""
+    global _shared_session
+
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                _shared_session = PooledSession()
+    return _shared_session
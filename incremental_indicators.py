@@ -0,0 +1,326 @@
+import math
+import threading
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class IncrementalIndicator:
+    """Constant-time indicator update per candle; amend=True replaces the last (still open) candle instead"""
+
+    def __init__(self):
+        self.count = 0
+        self._saved = None
+
+    def update(self, *values, amend: bool = False):
+        if amend and self._saved is not None:
+            self._restore(self._saved)
+        else:
+            self._saved = self._snapshot()
+        self._apply(*values)
+        return self.value
+
+    @property
+    def value(self):
+        raise NotImplementedError
+
+    def _apply(self, *values):
+        raise NotImplementedError
+
+    def _snapshot(self) -> Tuple:
+        raise NotImplementedError
+
+    def _restore(self, state: Tuple):
+        raise NotImplementedError
+
+class EMA(IncrementalIndicator):
+    """Exponential moving average, same recursion as pandas ewm(adjust=False)"""
+
+    def __init__(self, window: int = None, alpha: float = None):
+        super().__init__()
+        self.window = window or 1
+        self.alpha = alpha if alpha is not None else 2.0 / (window + 1)
+        self.current = None
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.current if self.count >= self.window else None
+
+    def _apply(self, x: float):
+        self.current = x if self.current is None else self.current + self.alpha * (x - self.current)
+        self.count += 1
+
+    def _snapshot(self) -> Tuple:
+        return self.count, self.current
+
+    def _restore(self, state: Tuple):
+        self.count, self.current = state
+
+class RollingWindow(IncrementalIndicator):
+    """Fixed window of values with running sum and sum of squares"""
+
+    def __init__(self, window: int):
+        super().__init__()
+        self.window = window
+        self.values = [0.0] * window
+        self.pos = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.offset = None  # Sums are kept relative to the first value to limit cancellation
+
+    @property
+    def full(self) -> bool:
+        return self.count >= self.window
+
+    @property
+    def value(self) -> Optional[float]:
+        """Mean of the window"""
+        return self.offset + self.total / self.window if self.full else None
+
+    @property
+    def std(self) -> Optional[float]:
+        """Population standard deviation of the window (ddof=0, as ta uses)"""
+        if not self.full:
+            return None
+        mean = self.total / self.window
+        return math.sqrt(max(self.total_sq / self.window - mean * mean, 0.0))
+
+    def _apply(self, x: float):
+        if self.offset is None:
+            self.offset = x
+        x -= self.offset
+        old = self.values[self.pos] if self.count >= self.window else 0.0
+        self.values[self.pos] = x
+        self.total += x - old
+        self.total_sq += x * x - old * old
+        self.pos = (self.pos + 1) % self.window
+        self.count += 1
+        if self.pos == 0:
+            # Re-sum once per lap so rounding error never accumulates; amortized O(1)
+            self.total = math.fsum(self.values)
+            self.total_sq = math.fsum(v * v for v in self.values)
+
+    def _snapshot(self) -> Tuple:
+        return self.count, self.pos, self.total, self.total_sq, self.values[self.pos]
+
+    def _restore(self, state: Tuple):
+        self.count, self.pos, self.total, self.total_sq, self.values[self.pos] = state
+
+class SMA(RollingWindow):
+    """Simple moving average (also used for volume SMA)"""
+
+class BollingerBands(RollingWindow):
+    """Bollinger bands over a rolling window; value is (upper, middle, lower)"""
+
+    def __init__(self, window: int = 20, deviations: float = 2.0):
+        super().__init__(window)
+        self.deviations = deviations
+
+    @property
+    def value(self) -> Optional[Tuple[float, float, float]]:
+        middle = super().value
+        if middle is None:
+            return None
+        width = self.deviations * self.std
+        return middle + width, middle, middle - width
+
+class RSI(IncrementalIndicator):
+    """Wilder RSI, matching ta.momentum.rsi over the same candles"""
+
+    def __init__(self, window: int = 14):
+        super().__init__()
+        self.window = window
+        self.gain = EMA(alpha=1.0 / window)
+        self.loss = EMA(alpha=1.0 / window)
+        self.last_close = None
+
+    @property
+    def value(self) -> Optional[float]:
+        if self.count < self.window:
+            return None
+        if self.loss.current == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self.gain.current / self.loss.current)
+
+    def _apply(self, close: float):
+        change = 0.0 if self.last_close is None else close - self.last_close
+        self.gain._apply(max(change, 0.0))
+        self.loss._apply(max(-change, 0.0))
+        self.last_close = close
+        self.count += 1
+
+    def _snapshot(self) -> Tuple:
+        return self.count, self.last_close, self.gain._snapshot(), self.loss._snapshot()
+
+    def _restore(self, state: Tuple):
+        self.count, self.last_close, gain, loss = state
+        self.gain._restore(gain)
+        self.loss._restore(loss)
+
+class ATR(IncrementalIndicator):
+    """Wilder average true range, matching ta.volatility.average_true_range"""
+
+    def __init__(self, window: int = 14):
+        super().__init__()
+        self.window = window
+        self.seed_total = 0.0
+        self.current = None
+        self.last_close = None
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.current
+
+    def _apply(self, high: float, low: float, close: float):
+        true_range = high - low
+        if self.last_close is not None:
+            true_range = max(true_range, abs(high - self.last_close), abs(low - self.last_close))
+        self.count += 1
+        if self.count < self.window:
+            self.seed_total += true_range
+        elif self.count == self.window:
+            self.current = (self.seed_total + true_range) / self.window
+        else:
+            self.current = (self.current * (self.window - 1) + true_range) / self.window
+        self.last_close = close
+
+    def _snapshot(self) -> Tuple:
+        return self.count, self.seed_total, self.current, self.last_close
+
+    def _restore(self, state: Tuple):
+        self.count, self.seed_total, self.current, self.last_close = state
+
+class MACD(IncrementalIndicator):
+    """MACD line, signal and histogram; value is the histogram like ta.trend.macd_diff"""
+
+    def __init__(self, slow: int = 26, fast: int = 12, signal: int = 9):
+        super().__init__()
+        self.slow = EMA(slow)
+        self.fast = EMA(fast)
+        self.signal = EMA(signal)
+        self.line = None
+
+    @property
+    def value(self) -> Optional[float]:
+        signal = self.signal.value
+        return self.line - signal if signal is not None else None
+
+    def _apply(self, close: float):
+        self.fast._apply(close)
+        self.slow._apply(close)
+        self.count += 1
+        if self.slow.value is not None:
+            # The signal line starts once the slow EMA has enough history
+            self.line = self.fast.current - self.slow.current
+            self.signal._apply(self.line)
+
+    def _snapshot(self) -> Tuple:
+        return self.count, self.line, self.fast._snapshot(), self.slow._snapshot(), self.signal._snapshot()
+
+    def _restore(self, state: Tuple):
+        self.count, self.line, fast, slow, signal = state
+        self.fast._restore(fast)
+        self.slow._restore(slow)
+        self.signal._restore(signal)
+
+class CandleIndicators:
+    """Every scan indicator for one symbol, fed one candle at a time"""
+
+    def __init__(self):
+        self.price_sma = SMA(20)
+        self.price_ema = EMA(12)
+        self.volume_sma = SMA(20)
+        self.rsi = RSI(14)
+        self.macd = MACD()
+        self.bollinger = BollingerBands(20, 2.0)
+        self.atr = ATR(14)
+        self.last_open_time = None
+        self.close = None
+        self.volume = None
+
+    def update_candle(self, open_time: float, high: float, low: float, close: float, volume: float):
+        """Add a candle, or amend the last one when open_time repeats (candle still forming)"""
+        amend = open_time == self.last_open_time
+        self.price_sma.update(close, amend=amend)
+        self.price_ema.update(close, amend=amend)
+        self.volume_sma.update(volume, amend=amend)
+        self.rsi.update(close, amend=amend)
+        self.macd.update(close, amend=amend)
+        self.bollinger.update(close, amend=amend)
+        self.atr.update(high, low, close, amend=amend)
+        self.last_open_time = open_time
+        self.close = close
+        self.volume = volume
+
+    def values(self) -> Dict[str, Optional[float]]:
+        bands = self.bollinger.value or (None, None, None)
+        volume_sma = self.volume_sma.value
+        return {
+            'close': self.close,
+            'volume': self.volume,
+            'volume_sma': volume_sma,
+            'volume_ratio': self.volume / volume_sma if volume_sma else None,
+            'price_sma': self.price_sma.value,
+            'price_ema': self.price_ema.value,
+            'rsi': self.rsi.value,
+            'macd': self.macd.value,
+            'bb_upper': bands[0],
+            'bb_middle': bands[1],
+            'bb_lower': bands[2],
+            'atr': self.atr.value
+        }
+
+class IndicatorTracker:
+    """Per-symbol incremental indicators kept in step with the candle store's buffers"""
+
+    def __init__(self, candle_store, interval: str = '1m'):
+        self.candle_store = candle_store
+        self.interval = interval
+        self.states = {}
+
+        self.candles_applied = 0
+        self.reseeds = 0
+        self._lock = threading.Lock()
+
+    def sync(self, symbol: str) -> Optional[CandleIndicators]:
+        """Feed candles that arrived since the last sync; only the new rows are touched"""
+        # The whole held buffer, so indicators see up to the store's capacity of history
+        klines = self.candle_store.view(symbol, self.interval, None)
+        if klines is None:
+            return self.states.get(symbol)
+
+        with self._lock:
+            state = self.states.get(symbol)
+            if state is None or klines[0, 0] > state.last_open_time:
+                # New symbol, or a gap the buffer no longer covers: replay what is held
+                if state is not None:
+                    self.reseeds += 1
+                state = self.states[symbol] = CandleIndicators()
+                start = 0
+            else:
+                start = int(np.searchsorted(klines[:, 0], state.last_open_time))
+
+            for row in klines[start:]:
+                state.update_candle(row[0], row[2], row[3], row[4], row[5])
+            self.candles_applied += len(klines) - start
+        return state
+
+    def sync_all(self, symbols: Iterable[str]) -> Dict[str, CandleIndicators]:
+        states = {}
+        for symbol in symbols:
+            state = self.sync(symbol)
+            if state is not None:
+                states[symbol] = state
+        return states
+
+    def get(self, symbol: str) -> Optional[CandleIndicators]:
+        return self.states.get(symbol)
+
+    def get_stats(self) -> Dict:
+        return {
+            'symbols': len(self.states),
+            'candles_applied': self.candles_applied,
+            'reseeds': self.reseeds
+        }
@@ -0,0 +1,201 @@
+import time
+import logging
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Columns of a kline row as returned by fast_json.decode_klines
+HIGH, LOW, CLOSE, VOLUME = 2, 3, 4, 5
+
+# Values reported per symbol, in snapshot order
+INDICATORS = ('close', 'price_change', 'volume', 'volume_sma', 'volume_ratio', 'price_sma', 'price_ema',
+              'rsi', 'macd', 'bb_upper', 'bb_middle', 'bb_lower', 'atr')
+
+@lru_cache(maxsize=64)
+def _ema_weights(length: int, alpha: float) -> np.ndarray:
+    """(length, length) lower-triangular matrix W with W @ x equal to pandas ewm(adjust=False) of x"""
+    decay = 1.0 - alpha
+    lags = np.arange(length)[:, None] - np.arange(length)[None, :]
+    weights = np.where(lags >= 0, alpha * decay ** np.maximum(lags, 0), 0.0)
+    # The recursion starts from the first observation itself rather than alpha * x0
+    weights[:, 0] = decay ** np.arange(length)
+    weights.flags.writeable = False
+    return weights
+
+def ema_series(values: np.ndarray, alpha: float) -> np.ndarray:
+    """Exponential moving average of every row, all points"""
+    return values @ _ema_weights(values.shape[1], alpha).T
+
+def ema_last(values: np.ndarray, alpha: float) -> np.ndarray:
+    """Exponential moving average of every row, newest point only"""
+    return values @ _ema_weights(values.shape[1], alpha)[-1]
+
+def _mask_short(result: np.ndarray, length: int, required: int) -> np.ndarray:
+    # Same as the ta library's min_periods: too little history gives NaN, not a guess
+    if length < required:
+        result[:] = np.nan
+    return result
+
+def sma_last(values: np.ndarray, window: int) -> np.ndarray:
+    return _mask_short(values[:, -window:].mean(axis=1), values.shape[1], window)
+
+def rsi_last(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """Wilder RSI per row, matching ta.momentum.rsi"""
+    diff = np.diff(close, axis=1, prepend=close[:, :1])
+    up = ema_last(np.clip(diff, 0, None), 1.0 / window)
+    down = ema_last(np.clip(-diff, 0, None), 1.0 / window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(down == 0, 100.0, 100.0 - 100.0 / (1.0 + up / down))
+    return _mask_short(rsi, close.shape[1], window)
+
+def macd_diff_last(close: np.ndarray, slow: int = 26, fast: int = 12, signal: int = 9) -> np.ndarray:
+    """MACD histogram per row, matching ta.trend.macd_diff"""
+    length = close.shape[1]
+    if length < slow + signal - 1:
+        return np.full(close.shape[0], np.nan)
+    macd = ema_series(close, 2.0 / (fast + 1)) - ema_series(close, 2.0 / (slow + 1))
+    # The signal line starts where the slow EMA first has enough history
+    macd = macd[:, slow - 1:]
+    return macd[:, -1] - ema_last(macd, 2.0 / (signal + 1))
+
+def atr_last(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """Wilder average true range per row, matching ta.volatility.average_true_range"""
+    length = close.shape[1]
+    if length < window:
+        return np.full(close.shape[0], np.nan)
+    prev_close = close[:, :-1]
+    true_range = high - low
+    true_range[:, 1:] = np.maximum(true_range[:, 1:],
+                                   np.maximum(np.abs(high[:, 1:] - prev_close), np.abs(low[:, 1:] - prev_close)))
+    # Seeded with the simple mean of the first window, then smoothed by (window - 1) / window
+    seed = true_range[:, :window].mean(axis=1)
+    rest = true_range[:, window:]
+    decay = (window - 1) / window
+    powers = decay ** np.arange(rest.shape[1] - 1, -1, -1)
+    return seed * decay ** rest.shape[1] + rest @ powers / window
+
+class IndicatorSnapshot:
+    """Latest indicator values for a universe of symbols, one array per indicator"""
+
+    def __init__(self, symbols: List[str], values: Dict[str, np.ndarray]):
+        self.symbols = symbols
+        self.values = values
+        self.index = {symbol: i for i, symbol in enumerate(symbols)}
+        self.computed_at = time.time()
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.index
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.values[name]
+
+    def row(self, symbol: str) -> Optional[Dict[str, float]]:
+        """All indicators of one symbol as plain floats"""
+        i = self.index.get(symbol)
+        if i is None:
+            return None
+        return {name: float(values[i]) for name, values in self.values.items()}
+
+class IndicatorEngine:
+    """Computes every scan indicator for the whole universe in one vectorized pass over a symbols x candles matrix"""
+
+    def __init__(self, sma_window: int = 20, ema_window: int = 12, rsi_window: int = 14,
+                 bb_window: int = 20, bb_deviations: float = 2.0, atr_window: int = 14, volume_window: int = 20):
+        self.sma_window = sma_window
+        self.ema_window = ema_window
+        self.rsi_window = rsi_window
+        self.bb_window = bb_window
+        self.bb_deviations = bb_deviations
+        self.atr_window = atr_window
+        self.volume_window = volume_window
+
+        self.latest = None
+        self.passes = 0
+        self.symbols_scored = 0
+        self.total_time = 0.0
+
+    def compute(self, klines_by_symbol: Mapping[str, Optional[np.ndarray]]) -> IndicatorSnapshot:
+        """Score every symbol's (n, 12) kline array; symbols without candles are left out"""
+        start = time.perf_counter()
+
+        # Stack equal-length histories into one (symbols, candles, 12) matrix per length;
+        # candle store views all share the scan limit, so this is normally a single group
+        groups = {}
+        for symbol, klines in klines_by_symbol.items():
+            if klines is not None and len(klines) > 1:
+                groups.setdefault(len(klines), []).append(symbol)
+
+        symbols = []
+        parts = []
+        for length, group in groups.items():
+            symbols.extend(group)
+            parts.append(self._compute_group([klines_by_symbol[symbol] for symbol in group]))
+
+        if parts:
+            values = {name: np.concatenate([part[name] for part in parts]) for name in INDICATORS}
+        else:
+            values = {name: np.empty(0) for name in INDICATORS}
+
+        snapshot = IndicatorSnapshot(symbols, values)
+        self.latest = snapshot
+        self.passes += 1
+        self.symbols_scored += len(symbols)
+        self.total_time += time.perf_counter() - start
+        return snapshot
+
+    def settings(self) -> Dict:
+        """Constructor arguments, so another process can build an identical engine"""
+        return {
+            'sma_window': self.sma_window, 'ema_window': self.ema_window, 'rsi_window': self.rsi_window,
+            'bb_window': self.bb_window, 'bb_deviations': self.bb_deviations, 'atr_window': self.atr_window,
+            'volume_window': self.volume_window
+        }
+
+    def _compute_group(self, arrays: List[np.ndarray]) -> Dict[str, np.ndarray]:
+        """Indicators for equal-length kline arrays stacked into one matrix"""
+        matrix = np.stack(arrays)
+        return self.compute_columns(matrix[:, :, HIGH], matrix[:, :, LOW], matrix[:, :, CLOSE], matrix[:, :, VOLUME])
+
+    def compute_columns(self, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                        volume: np.ndarray) -> Dict[str, np.ndarray]:
+        """Indicators from (symbols, candles) matrices of the four columns they read"""
+        length = close.shape[1]
+
+        volume_sma = sma_last(volume, self.volume_window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = np.where(volume_sma > 0, volume[:, -1] / volume_sma, 0.0)
+        volume_ratio[np.isnan(volume_sma)] = np.nan
+
+        bb_window = close[:, -self.bb_window:]
+        bb_middle = sma_last(close, self.bb_window)
+        bb_width = self.bb_deviations * _mask_short(bb_window.std(axis=1), length, self.bb_window)
+
+        return {
+            'close': close[:, -1].copy(),
+            'price_change': close[:, -1] / close[:, -2] - 1.0,
+            'volume': volume[:, -1].copy(),
+            'volume_sma': volume_sma,
+            'volume_ratio': volume_ratio,
+            'price_sma': sma_last(close, self.sma_window),
+            'price_ema': _mask_short(ema_last(close, 2.0 / (self.ema_window + 1)), length, self.ema_window),
+            'rsi': rsi_last(close, self.rsi_window),
+            'macd': macd_diff_last(close),
+            'bb_upper': bb_middle + bb_width,
+            'bb_middle': bb_middle,
+            'bb_lower': bb_middle - bb_width,
+            'atr': atr_last(high, low, close, self.atr_window),
+        }
+
+    def get_stats(self) -> Dict:
+        return {
+            'passes': self.passes,
+            'symbols_scored': self.symbols_scored,
+            'last_universe': len(self.latest) if self.latest is not None else 0,
+            'total_time': round(self.total_time, 4)
+        }
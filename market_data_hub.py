@@ -0,0 +1,198 @@
+import time
+import asyncio
+import threading
+import logging
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, Optional
+import numpy as np
+from binance_client import BinanceClient
+from async_binance_client import AsyncBinanceClient, get_background_loop
+from candle_store import CandleStore, get_shared_candle_store
+from market_stream import MarketDataStream
+from order_book import OrderBookManager
+from market_snapshot import PriceSnapshot, Ticker24hSnapshot
+from database import TradingDatabase
+from rate_limiter import endpoint_weight
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class MarketDataHub:
+    """Process-wide market data for every strategy and web handler.
+
+    Concurrent requests for the same key share one in-flight call (single-flight), and results are
+    served from per-type TTL caches, so N strategies watching the same symbols cost the API weight of one.
+    All loads run on the shared background loop, so a single dict of pending futures covers every caller.
+    Likewise one market stream and one set of local order books serve every strategy's universe.
+    """
+
+    def __init__(self, binance_client: BinanceClient = None, candle_store: CandleStore = None,
+                 async_client: AsyncBinanceClient = None, db: TradingDatabase = None):
+        self.binance = binance_client or BinanceClient()
+        self.candle_store = candle_store or get_shared_candle_store()
+        # The candle store's client is reused so the process keeps a single aiohttp session
+        self.async_binance = async_client or self.candle_store.async_binance
+        self.db = db or TradingDatabase()
+        self.ttls = {
+            'klines': Config.CANDLE_REFRESH_MIN_AGE,  # Enforced by the candle store's own refresh plan
+            'depth': Config.DEPTH_CACHE_TTL,
+            'prices': Config.PRICE_SNAPSHOT_MAX_AGE,
+            'ticker_24hr': Config.TICKER_24H_MAX_AGE
+        }
+
+        self._cache = {}     # key -> (value, stored_at)
+        self._flights = {}   # key -> asyncio.Future of the load in progress
+
+        self.market_stream = None
+        self.order_books = None
+        self._stream_symbols = {}  # owner -> symbols it asked to stream
+        self._stream_lock = threading.Lock()
+
+        self.hits = 0
+        self.loads = 0
+        self.joined = 0
+        self.weight_saved = 0
+
+    async def _load(self, key: Hashable, ttl: float, fetch: Callable[[], Awaitable], weight: int = 0):
+        """Cached value of key if younger than ttl, else the result of one shared fetch()"""
+        entry = self._cache.get(key)
+        if entry is not None and ttl > 0 and time.time() - entry[1] <= ttl:
+            self.hits += 1
+            self.weight_saved += weight
+            return entry[0]
+
+        future = self._flights.get(key)
+        if future is not None:
+            self.joined += 1
+            self.weight_saved += weight
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._flights[key] = future
+        self.loads += 1
+        try:
+            value = await fetch()
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Retrieved here so waiter-less failures are not reported again
+            raise
+        finally:
+            del self._flights[key]
+        if ttl > 0 and value is not None and not (isinstance(value, dict) and 'error' in value):
+            self._cache[key] = (value, time.time())
+        future.set_result(value)
+        return value
+
+    # Klines
+
+    async def refresh_klines_async(self, symbols: Iterable[str], interval: str = '1m', limit: int = 100):
+        """Bring the shared candle store up to date, one refresh per symbol however many callers ask"""
+        weight = endpoint_weight('GET', '/api/v3/klines')
+        await asyncio.gather(*(
+            self._load(('klines', symbol, interval), 0,
+                       lambda symbol=symbol: self.candle_store.refresh_async([symbol], interval, limit), weight)
+            for symbol in symbols
+        ))
+
+    def get_klines(self, symbols: Iterable[str], interval: str = '1m', limit: int = 100) -> Dict[str, np.ndarray]:
+        """Refreshed views of the newest limit candles per symbol"""
+        symbols = list(symbols)
+        get_background_loop().run(self.refresh_klines_async(symbols, interval, limit))
+        views = {}
+        for symbol in symbols:
+            view = self.candle_store.view(symbol, interval, limit)
+            if view is not None:
+                views[symbol] = view
+        return views
+
+    # Depth
+
+    async def get_order_books_async(self, symbols: Iterable[str], limit: int = 100) -> Dict[str, Dict]:
+        """Order books as (n, 2) arrays, cached for the depth TTL"""
+        symbols = list(symbols)
+        weight = endpoint_weight('GET', '/api/v3/depth', {'limit': limit})
+        books = await asyncio.gather(*(
+            self._load(('depth', symbol, limit), self.ttls['depth'],
+                       lambda symbol=symbol: self.async_binance.get_order_book_arrays(symbol, limit), weight)
+            for symbol in symbols
+        ))
+        return dict(zip(symbols, books))
+
+    def get_order_book(self, symbol: str, limit: int = 100) -> Dict:
+        return get_background_loop().run(self.get_order_books_async([symbol], limit))[symbol]
+
+    # Streams
+
+    def start_market_stream(self, owner: Hashable, symbols: Iterable[str]) -> Optional[MarketDataStream]:
+        """Stream owner's symbols on the process-wide market stream, which carries every owner's universe.
+
+        The first caller starts the stream, attaches the candle store and seeds the local order books;
+        later callers only widen or narrow the subscription, so N strategies share one socket.
+        """
+        if not Config.MARKET_STREAM_ENABLED:
+            return None
+        with self._stream_lock:
+            self._stream_symbols[owner] = list(symbols)
+            universe = self.stream_universe()
+            if self.market_stream is None:
+                extra_streams = ['depth@100ms'] if Config.LOCAL_ORDER_BOOKS else []
+                self.market_stream = MarketDataStream(universe, extra_streams=extra_streams)
+                self.candle_store.attach(self.market_stream)
+                if Config.LOCAL_ORDER_BOOKS:
+                    self.order_books = OrderBookManager(self.binance)
+                    self.order_books.attach(self.market_stream)
+                self.market_stream.start()
+            else:
+                self.market_stream.set_symbols(universe)
+            return self.market_stream
+
+    def release_market_stream(self, owner: Hashable):
+        """Stop streaming owner's symbols; the stream itself stops once no owner is left"""
+        with self._stream_lock:
+            if self._stream_symbols.pop(owner, None) is None or self.market_stream is None:
+                return
+            universe = self.stream_universe()
+            if universe:
+                self.market_stream.set_symbols(universe)
+                return
+            self.market_stream.stop()
+            self.market_stream = None
+            self.order_books = None
+            # Without the stream the candle store goes back to refreshing over REST
+            self.candle_store.streaming = False
+
+    def stream_universe(self) -> List[str]:
+        """Union of every owner's streamed symbols, in first-requested order"""
+        return list(dict.fromkeys(symbol for symbols in self._stream_symbols.values() for symbol in symbols))
+
+    # Tickers (the bulk snapshots are already single-flight, process-wide caches)
+
+    def get_all_prices(self, max_age: float = None, priority: int = None) -> Optional[PriceSnapshot]:
+        return self.binance.get_all_prices(self.ttls['prices'] if max_age is None else max_age, priority=priority)
+
+    def get_24hr_snapshot(self, max_age: float = None) -> Optional[Ticker24hSnapshot]:
+        return self.binance.get_24hr_snapshot(self.ttls['ticker_24hr'] if max_age is None else max_age)
+
+    def get_stats(self) -> Dict:
+        requests = self.hits + self.loads + self.joined
+        return {
+            'loads': self.loads,
+            'cache_hits': self.hits,
+            'joined_in_flight': self.joined,
+            'dedup_rate': round((self.hits + self.joined) / requests, 3) if requests else 0.0,
+            'weight_saved': self.weight_saved,
+            'cached_keys': len(self._cache)
+        }
+
+_shared_hub = None
+_shared_hub_lock = threading.Lock()
+
+def get_market_data_hub() -> MarketDataHub:
+    """Get the process-wide market data hub shared by all strategies and the web app"""
+    global _shared_hub
+
+    if _shared_hub is None:
+        with _shared_hub_lock:
+            if _shared_hub is None:
+                _shared_hub = MarketDataHub()
+    return _shared_hub
@@ -0,0 +1,159 @@
+import time
+import threading
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+class PriceSnapshot:
+    """All symbol prices from one /api/v3/ticker/price call, held as a float array"""
+
+    __slots__ = ('index', 'symbols', 'prices', 'timestamp')
+
+    def __init__(self, symbols: List[str], prices: np.ndarray, timestamp: float = None):
+        self.symbols = symbols
+        self.prices = prices
+        self.index = {symbol: i for i, symbol in enumerate(symbols)}
+        self.timestamp = timestamp if timestamp is not None else time.time()
+
+    @classmethod
+    def from_tickers(cls, tickers: List[Dict], timestamp: float = None) -> 'PriceSnapshot':
+        """Build a snapshot from the unparameterised ticker/price response"""
+        symbols = [ticker['symbol'] for ticker in tickers]
+        prices = np.fromiter((float(ticker['price']) for ticker in tickers), dtype=np.float64, count=len(tickers))
+        return cls(symbols, prices, timestamp)
+
+    def get(self, symbol: str) -> Optional[float]:
+        """Get the price for a symbol, or None if it is not in the snapshot"""
+        i = self.index.get(symbol)
+        return float(self.prices[i]) if i is not None else None
+
+    def age(self) -> float:
+        """Seconds since the snapshot was taken"""
+        return time.time() - self.timestamp
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.index
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+class Ticker24hSnapshot:
+    """Full /api/v3/ticker/24hr response held as columnar float arrays"""
+
+    def __init__(self, tickers: List[Dict], timestamp: float = None):
+        count = len(tickers)
+
+        def column(field: str) -> np.ndarray:
+            return np.fromiter((float(ticker.get(field) or 0) for ticker in tickers), dtype=np.float64, count=count)
+
+        self.tickers = tickers
+        self.symbols = np.array([ticker['symbol'] for ticker in tickers])
+        self.index = {ticker['symbol']: i for i, ticker in enumerate(tickers)}
+        self.timestamp = timestamp if timestamp is not None else time.time()
+
+        self.last_price = column('lastPrice')
+        self.price_change_pct = column('priceChangePercent')
+        self.volume = column('volume')
+        self.quote_volume = column('quoteVolume')
+        self.high = column('highPrice')
+        self.low = column('lowPrice')
+        self.bid = column('bidPrice')
+        self.ask = column('askPrice')
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.volatility = np.where(self.low > 0, (self.high - self.low) / self.low, 0.0)
+
+        self._quote_masks = {}
+
+    def get(self, symbol: str) -> Optional[Dict]:
+        """Get the raw ticker for a symbol"""
+        i = self.index.get(symbol)
+        return self.tickers[i] if i is not None else None
+
+    def age(self) -> float:
+        """Seconds since the snapshot was taken"""
+        return time.time() - self.timestamp
+
+    def quote_mask(self, quote_asset: str) -> np.ndarray:
+        """Boolean mask of symbols quoted in the given asset"""
+        mask = self._quote_masks.get(quote_asset)
+        if mask is None:
+            mask = np.char.endswith(self.symbols, quote_asset) if len(self.symbols) else np.zeros(0, dtype=bool)
+            self._quote_masks[quote_asset] = mask
+        return mask
+
+    def top_k_indices(self, values: np.ndarray, k: int, mask: np.ndarray = None) -> np.ndarray:
+        """Indices of the k largest values, descending, via partial selection"""
+        candidates = np.flatnonzero(mask) if mask is not None else np.arange(len(values))
+        if k <= 0 or len(candidates) == 0:
+            return np.zeros(0, dtype=np.intp)
+
+        selected = values[candidates]
+        if k < len(candidates):
+            # argpartition is linear; only the k winners get sorted
+            partition = np.argpartition(-selected, k - 1)[:k]
+            candidates = candidates[partition]
+            selected = selected[partition]
+
+        return candidates[np.argsort(-selected, kind='stable')]
+
+    def _rank(self, values: np.ndarray, k: int, quote_asset: str, mask: np.ndarray = None) -> List[Dict]:
+        quote_mask = self.quote_mask(quote_asset)
+        mask = quote_mask if mask is None else quote_mask & mask
+        return [self.tickers[i] for i in self.top_k_indices(values, k, mask)]
+
+    def top_gainers(self, k: int = 20, quote_asset: str = 'USDT') -> List[Dict]:
+        """Symbols with the largest positive 24h price change"""
+        return self._rank(self.price_change_pct, k, quote_asset, self.price_change_pct > 0)
+
+    def volume_leaders(self, k: int = 20, quote_asset: str = 'USDT') -> List[Dict]:
+        """Symbols with the highest 24h base-asset volume"""
+        return self._rank(self.volume, k, quote_asset)
+
+    def quote_volume_leaders(self, k: int = 20, quote_asset: str = 'USDT') -> List[Dict]:
+        """Symbols with the highest 24h quote-asset volume"""
+        return self._rank(self.quote_volume, k, quote_asset)
+
+    def most_volatile(self, k: int = 20, quote_asset: str = 'USDT') -> List[Dict]:
+        """Symbols with the widest 24h high/low range"""
+        return self._rank(self.volatility, k, quote_asset)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.index
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+class SnapshotCache:
+    """Holds the latest snapshot of one kind and refreshes it at most once per max_age"""
+
+    def __init__(self):
+        self.value = None
+        self._lock = threading.Lock()
+
+    def get(self, max_age: float, loader: Callable[[], Optional[object]]):
+        """Return the cached snapshot if fresh enough, otherwise load a new one"""
+        value = self.value
+        if value is not None and max_age > 0 and value.age() <= max_age:
+            return value
+
+        with self._lock:
+            # Another thread may have refreshed while we waited
+            value = self.value
+            if value is not None and max_age > 0 and value.age() <= max_age:
+                return value
+
+            value = loader()
+            if value is not None:
+                self.value = value
+            return value
+
+_shared_caches = {}
+_shared_caches_lock = threading.Lock()
+
+def get_shared_cache(key) -> SnapshotCache:
+    """Get the process-wide cache for a snapshot kind, e.g. (base_url, 'ticker_24hr')"""
+    cache = _shared_caches.get(key)
+    if cache is None:
+        with _shared_caches_lock:
+            cache = _shared_caches.setdefault(key, SnapshotCache())
+    return cache
@@ -0,0 +1,199 @@
+import asyncio
+import json
+import time
+import logging
+from typing import Callable, Dict, List, Optional, Iterable
+import websockets
+from async_binance_client import BackgroundLoop
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class MarketDataStream:
+    """Combined kline/bookTicker/miniTicker WebSocket ingestion with in-memory latest state.
+
+    Klines are not held here: CandleStore.attach merges them into the shared candle buffers.
+    """
+
+    def __init__(self, symbols: Iterable[str], interval: str = '1m', ws_url: str = None,
+                 extra_streams: Iterable[str] = (), record_path: str = None):
+        self.interval = interval
+        self.ws_url = (ws_url or Config.BINANCE_WS_URL).rstrip('/')
+        self.extra_streams = list(extra_streams)
+        self.record_path = record_path
+
+        self.book_tickers = {}  # symbol -> best bid/ask
+        self.mini_tickers = {}  # symbol -> rolling 24h stats
+        self.last_update = {}   # symbol -> local receive time
+
+        self.messages = 0
+        self.reconnects = 0
+        self.running = False
+
+        self._symbols = list(dict.fromkeys(symbols))
+        self._listeners = []
+        self._loop = None
+        self._supervisor = None
+        self._tasks = []
+        self._recorder = None
+        self._record_start = None
+
+    # Lifecycle
+
+    def start(self):
+        """Connect in a background thread"""
+        if self.running:
+            return
+        self.running = True
+        if self.record_path:
+            self._recorder = open(self.record_path, 'a')
+            self._record_start = time.time()
+        self._loop = BackgroundLoop()
+        self._supervisor = asyncio.run_coroutine_threadsafe(self._run(), self._loop.loop)
+        logger.info(f"Market stream started for {len(self._symbols)} symbols")
+
+    def stop(self):
+        """Disconnect and stop the background thread"""
+        self.running = False
+        if self._loop is not None:
+            self._loop.loop.call_soon_threadsafe(self._cancel_tasks)
+            try:
+                self._supervisor.result(timeout=5)
+            except Exception:
+                pass
+            self._loop.loop.call_soon_threadsafe(self._loop.loop.stop)
+        if self._recorder is not None:
+            self._recorder.close()
+            self._recorder = None
+
+    def set_symbols(self, symbols: Iterable[str]):
+        """Change the subscribed universe, reconnecting only if it changed"""
+        symbols = list(dict.fromkeys(symbols))
+        if set(symbols) == set(self._symbols):
+            return
+        self._symbols = symbols
+        if self.running and self._loop is not None:
+            self._loop.loop.call_soon_threadsafe(self._cancel_tasks)
+
+    def subscribe(self, listener: Callable[[str, str, Dict], None]):
+        """Register listener(kind, symbol, data) for every parsed event"""
+        self._listeners.append(listener)
+
+    # Connection handling
+
+    def stream_names(self) -> List[str]:
+        """Combined stream names for the current universe"""
+        kinds = [f'kline_{self.interval}', 'bookTicker', 'miniTicker'] + self.extra_streams
+        return [f"{symbol.lower()}@{kind}" for symbol in self._symbols for kind in kinds]
+
+    def _cancel_tasks(self):
+        for task in self._tasks:
+            task.cancel()
+
+    async def _run(self):
+        while self.running:
+            names = self.stream_names()
+            size = Config.STREAM_MAX_PER_CONNECTION
+            chunks = [names[i:i + size] for i in range(0, len(names), size)]
+            self._tasks = [asyncio.create_task(self._consume(chunk)) for chunk in chunks]
+            # Returns when the universe changes or the stream stops
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _consume(self, names: List[str]):
+        url = f"{self.ws_url}/stream?streams={'/'.join(names)}"
+        delay = 1.0
+        while self.running:
+            try:
+                async with websockets.connect(url, max_size=None) as ws:
+                    delay = 1.0
+                    async for raw in ws:
+                        self._record(raw)
+                        self.handle_message(json.loads(raw))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Market stream connection lost: {e}")
+
+            if not self.running:
+                break
+            self.reconnects += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def _record(self, raw: str):
+        if self._recorder is not None:
+            self._recorder.write(json.dumps({'t': round(time.time() - self._record_start, 6), 'frame': raw}) + '\n')
+
+    # Message handling
+
+    def handle_message(self, message: Dict):
+        """Apply one combined-stream message to the in-memory state"""
+        stream = message.get('stream', '')
+        data = message.get('data', message)
+        kind = stream.split('@', 1)[1] if '@' in stream else data.get('e', '')
+        symbol = data.get('s')
+        if not symbol:
+            return
+
+        self.messages += 1
+        now = time.time()
+
+        # Every connection is consumed on the one stream loop, so state is written without a lock
+        if kind.startswith('kline'):
+            kind = 'kline'  # Merged into candle buffers by CandleStore listeners
+        elif kind == 'bookTicker':
+            self.book_tickers[symbol] = {
+                'bid': float(data['b']),
+                'bid_qty': float(data['B']),
+                'ask': float(data['a']),
+                'ask_qty': float(data['A']),
+                'update_id': data.get('u')
+            }
+        elif kind in ('miniTicker', '24hrMiniTicker'):
+            self.mini_tickers[symbol] = {
+                'close': float(data['c']),
+                'open': float(data['o']),
+                'high': float(data['h']),
+                'low': float(data['l']),
+                'volume': float(data['v']),
+                'quote_volume': float(data['q']),
+                'event_time': data.get('E')
+            }
+            kind = 'miniTicker'
+        elif kind.startswith('depth'):
+            kind = 'depth'  # Diffs are applied by OrderBookManager listeners
+        self.last_update[symbol] = now
+
+        for listener in self._listeners:
+            try:
+                listener(kind, symbol, data)
+            except Exception as e:
+                logger.error(f"Market stream listener error: {e}")
+
+    # Readers
+
+    def get_book_ticker(self, symbol: str) -> Optional[Dict]:
+        return self.book_tickers.get(symbol)
+
+    def get_mini_ticker(self, symbol: str) -> Optional[Dict]:
+        return self.mini_tickers.get(symbol)
+
+    def get_price(self, symbol: str, max_age: float = None) -> Optional[float]:
+        """Latest traded price from the stream, or None if missing or stale"""
+        if max_age is not None and not self.is_fresh(symbol, max_age):
+            return None
+        ticker = self.mini_tickers.get(symbol)
+        return ticker['close'] if ticker is not None else None
+
+    def is_fresh(self, symbol: str, max_age: float) -> bool:
+        updated = self.last_update.get(symbol)
+        return updated is not None and time.time() - updated <= max_age
+
+    def get_stats(self) -> Dict:
+        return {
+            'running': self.running,
+            'symbols': len(self._symbols),
+            'messages': self.messages,
+            'reconnects': self.reconnects
+        }
@@ -0,0 +1,290 @@
+import time
+import threading
+import logging
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _quantile(values: np.ndarray, q: float) -> float:
+    """Linear-interpolated quantile (numpy/pandas default) via partial partition"""
+    position = q * (len(values) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    part = np.partition(values, (lower, upper))
+    return part[lower] + (part[upper] - part[lower]) * (position - lower)
+
+class BookSide:
+    """One side of the book as a sorted key array with parallel quantities, best level first"""
+
+    __slots__ = ('descending', 'keys', 'quantities')
+
+    def __init__(self, descending: bool):
+        # Bids sort high to low, so they are stored under negated prices
+        self.descending = descending
+        self.keys = []
+        self.quantities = []
+
+    def clear(self):
+        self.keys = []
+        self.quantities = []
+
+    def set(self, price: float, quantity: float):
+        """Insert, update or (quantity 0) remove a price level"""
+        key = -price if self.descending else price
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            if quantity == 0:
+                del self.keys[i]
+                del self.quantities[i]
+            else:
+                self.quantities[i] = quantity
+        elif quantity != 0:
+            self.keys.insert(i, key)
+            self.quantities.insert(i, quantity)
+
+    def best(self) -> Optional[Tuple[float, float]]:
+        if not self.keys:
+            return None
+        key = self.keys[0]
+        return (-key if self.descending else key, self.quantities[0])
+
+    def top(self, n: int = None) -> List[Tuple[float, float]]:
+        keys = self.keys[:n] if n else self.keys
+        sign = -1 if self.descending else 1
+        return [(sign * key, quantity) for key, quantity in zip(keys, self.quantities)]
+
+    def to_arrays(self, n: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Prices and quantities of the best n levels as float arrays"""
+        keys = np.asarray(self.keys[:n] if n else self.keys, dtype=np.float64)
+        quantities = np.asarray(self.quantities[:len(keys)], dtype=np.float64)
+        return (-keys if self.descending else keys), quantities
+
+    def total_quantity(self, n: int = None) -> float:
+        return float(sum(self.quantities[:n] if n else self.quantities))
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+class LocalOrderBook:
+    """Order book seeded from a REST snapshot and kept current from @depth diff events"""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide(descending=False)
+        self.last_update_id = 0
+        self.synced = False
+        self.updated_at = 0.0
+        self._buffer = []
+        self._first_after_snapshot = True
+
+    def load_snapshot(self, snapshot: Dict) -> bool:
+        """Reset from a /api/v3/depth snapshot and replay buffered diffs; False means resync again"""
+        self.bids.clear()
+        self.asks.clear()
+        for price, quantity in snapshot['bids']:
+            self.bids.set(float(price), float(quantity))
+        for price, quantity in snapshot['asks']:
+            self.asks.set(float(price), float(quantity))
+
+        self.last_update_id = snapshot['lastUpdateId']
+        self.synced = True
+        self._first_after_snapshot = True
+        self.updated_at = time.time()
+
+        buffered, self._buffer = self._buffer, []
+        for event in buffered:
+            if not self.apply_diff(event):
+                return False
+        return True
+
+    def apply_diff(self, event: Dict) -> bool:
+        """Apply one depthUpdate event; returns False when a sequence gap requires a resync"""
+        if not self.synced:
+            self._buffer.append(event)
+            return True
+
+        first_id, final_id = event['U'], event['u']
+        if final_id <= self.last_update_id:
+            return True  # Already covered by the snapshot
+
+        if self._first_after_snapshot:
+            # The first applied event must straddle the snapshot id
+            if first_id > self.last_update_id + 1:
+                self.synced = False
+                return False
+            self._first_after_snapshot = False
+        elif first_id != self.last_update_id + 1:
+            self.synced = False
+            return False
+
+        for price, quantity in event['b']:
+            self.bids.set(float(price), float(quantity))
+        for price, quantity in event['a']:
+            self.asks.set(float(price), float(quantity))
+
+        self.last_update_id = final_id
+        self.updated_at = time.time()
+        return True
+
+    # Queries
+
+    def mid_price(self) -> Optional[float]:
+        best_bid, best_ask = self.bids.best(), self.asks.best()
+        if best_bid is None or best_ask is None:
+            return None
+        return (best_bid[0] + best_ask[0]) / 2
+
+    def spread(self) -> Optional[float]:
+        best_bid, best_ask = self.bids.best(), self.asks.best()
+        if best_bid is None or best_ask is None:
+            return None
+        return best_ask[0] - best_bid[0]
+
+    def imbalance(self, levels: int = None) -> float:
+        """(bid qty - ask qty) / (bid qty + ask qty) over the best levels"""
+        bid_quantity = self.bids.total_quantity(levels)
+        ask_quantity = self.asks.total_quantity(levels)
+        total = bid_quantity + ask_quantity
+        return (bid_quantity - ask_quantity) / total if total > 0 else 0.0
+
+    def liquidity(self, levels: int) -> Dict:
+        """Quantity and quote notional resting on the best n levels of each side"""
+        bid_prices, bid_quantities = self.bids.to_arrays(levels)
+        ask_prices, ask_quantities = self.asks.to_arrays(levels)
+        return {
+            'bid_quantity': float(bid_quantities.sum()),
+            'ask_quantity': float(ask_quantities.sum()),
+            'bid_notional': float(bid_prices @ bid_quantities),
+            'ask_notional': float(ask_prices @ ask_quantities)
+        }
+
+    def large_orders(self, levels: int = None, quantile: float = 0.9) -> Tuple[int, int]:
+        """Count levels on each side whose quantity exceeds that side's quantile"""
+        _, bid_quantities = self.bids.to_arrays(levels)
+        _, ask_quantities = self.asks.to_arrays(levels)
+        return self._count_large(bid_quantities, quantile), self._count_large(ask_quantities, quantile)
+
+    @staticmethod
+    def _count_large(quantities: np.ndarray, quantile: float) -> int:
+        if len(quantities) == 0:
+            return 0
+        return int(np.count_nonzero(quantities > _quantile(quantities, quantile)))
+
+    def whale_metrics(self, levels: int = 100) -> Dict:
+        """Inputs for WhaleTrapStrategy.detect_whale_activity taken from the best n levels"""
+        bid_prices, bid_quantities = self.bids.to_arrays(levels)
+        ask_prices, ask_quantities = self.asks.to_arrays(levels)
+        bid_total = float(bid_quantities.sum())
+        ask_total = float(ask_quantities.sum())
+        total = bid_total + ask_total
+        return {
+            'imbalance': (bid_total - ask_total) / total if total > 0 else 0.0,
+            'large_bids': self._count_large(bid_quantities, 0.9),
+            'large_asks': self._count_large(ask_quantities, 0.9),
+            # Sides are sorted best first, so the extremes are the last levels
+            'lowest_bid': float(bid_prices[-1]) if len(bid_prices) else None,
+            'highest_ask': float(ask_prices[-1]) if len(ask_prices) else None,
+            'mid_price': self.mid_price()
+        }
+
+    def to_depth(self, levels: int = None) -> Dict:
+        """Book in the REST /api/v3/depth layout"""
+        return {
+            'lastUpdateId': self.last_update_id,
+            'bids': [[price, quantity] for price, quantity in self.bids.top(levels)],
+            'asks': [[price, quantity] for price, quantity in self.asks.top(levels)]
+        }
+
+class OrderBookManager:
+    """Keeps local order books for the stream universe, resyncing on sequence gaps"""
+
+    def __init__(self, binance_client, snapshot_limit: int = None):
+        self.binance = binance_client
+        self.snapshot_limit = snapshot_limit or Config.ORDER_BOOK_SNAPSHOT_LIMIT
+        self.books = {}
+        self.resyncs = 0
+        self.gaps = 0
+
+        self._pending = set()
+        self._listeners = []
+        self._lock = threading.Lock()
+        # Snapshots are fetched off the WebSocket thread so streaming never blocks on REST
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='order-book-sync')
+
+    def attach(self, market_stream):
+        """Consume depth diffs from a MarketDataStream subscribed to <symbol>@depth"""
+        market_stream.subscribe(self.on_stream_event)
+
+    def subscribe(self, listener: Callable[[str, LocalOrderBook], None]):
+        """Register listener(symbol, book) called after every applied update"""
+        self._listeners.append(listener)
+
+    def on_stream_event(self, kind: str, symbol: str, data: Dict):
+        if kind == 'depth':
+            self.apply_event(symbol, data)
+
+    def apply_event(self, symbol: str, event: Dict):
+        with self._lock:
+            book = self.books.get(symbol)
+            if book is None:
+                book = self.books[symbol] = LocalOrderBook(symbol)
+
+            if not book.apply_diff(event):
+                self.gaps += 1
+                logger.warning(f"Order book gap for {symbol}, resyncing")
+                book.apply_diff(event)  # Buffer it for the next snapshot
+
+            if not book.synced:
+                self._request_snapshot(symbol)
+                return
+
+        for listener in self._listeners:
+            try:
+                listener(symbol, book)
+            except Exception as e:
+                logger.error(f"Order book listener error: {e}")
+
+    def _request_snapshot(self, symbol: str):
+        if symbol not in self._pending:
+            self._pending.add(symbol)
+            self._executor.submit(self._resync, symbol)
+
+    def _resync(self, symbol: str):
+        try:
+            snapshot = self.binance.get_order_book(symbol, limit=self.snapshot_limit)
+            with self._lock:
+                self._pending.discard(symbol)
+                if 'error' in snapshot:
+                    return
+                book = self.books[symbol]
+                self.resyncs += 1
+                if not book.load_snapshot(snapshot):
+                    self.gaps += 1
+                    self._request_snapshot(symbol)
+        except Exception as e:
+            logger.error(f"Order book resync failed for {symbol}: {e}")
+            with self._lock:
+                self._pending.discard(symbol)
+
+    def get_book(self, symbol: str, max_age: float = None) -> Optional[LocalOrderBook]:
+        """Synced local book for a symbol, or None if unavailable or stale"""
+        book = self.books.get(symbol)
+        if book is None or not book.synced:
+            return None
+        if max_age is not None and time.time() - book.updated_at > max_age:
+            return None
+        return book
+
+    def get_stats(self) -> Dict:
+        return {
+            'books': len(self.books),
+            'synced': sum(1 for book in self.books.values() if book.synced),
+            'resyncs': self.resyncs,
+            'gaps': self.gaps
+        }
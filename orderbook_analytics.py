@@ -0,0 +1,133 @@
+import logging
+import warnings
+from typing import Dict, List, Mapping, Optional, Tuple
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LARGE_ORDER_QUANTILE = 0.9  # Levels above this quantile of their side count as large orders
+PRESSURE_DISTANCE_SCALE = 0.01  # A level this fraction of the mid price away weighs half as much in pressure
+
+def book_arrays(order_book: Dict) -> Tuple[np.ndarray, np.ndarray]:
+    """(n, 2) [price, quantity] float arrays for both sides of a depth response, decoded or raw"""
+    # Raw REST levels are strings; float conversion of the whole side happens in C
+    return tuple(
+        np.asarray(order_book.get(side, ()), dtype=np.float64).reshape(-1, 2) for side in ('bids', 'asks')
+    )
+
+def _pad(sides: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Stack variable-depth sides into (books, levels) price and quantity matrices padded with NaN"""
+    depth = max((len(side) for side in sides), default=0)
+    prices = np.full((len(sides), depth), np.nan)
+    quantities = np.full((len(sides), depth), np.nan)
+    for i, side in enumerate(sides):
+        prices[i, :len(side)] = side[:, 0]
+        quantities[i, :len(side)] = side[:, 1]
+    return prices, quantities
+
+def _large_counts(quantities: np.ndarray) -> np.ndarray:
+    """Levels per book above the LARGE_ORDER_QUANTILE of that book's side"""
+    if quantities.shape[1] == 0:
+        return np.zeros(len(quantities), dtype=np.int64)
+    # Linear-interpolated quantile (the pandas default) from one row-wise sort; NaN padding sorts last.
+    # Much cheaper than np.quantile's generic machinery on small books
+    ordered = np.sort(quantities, axis=1)
+    counts = np.count_nonzero(~np.isnan(quantities), axis=1)
+    position = LARGE_ORDER_QUANTILE * np.maximum(counts - 1, 0)
+    lower = position.astype(np.int64)
+    upper = np.minimum(lower + 1, np.maximum(counts - 1, 0))
+    low = np.take_along_axis(ordered, lower[:, None], axis=1)[:, 0]
+    high = np.take_along_axis(ordered, upper[:, None], axis=1)[:, 0]
+    thresholds = low + (high - low) * (position - lower)
+    return np.count_nonzero(quantities > thresholds[:, None], axis=1)
+
+class BookMetrics:
+    """Whale detection inputs for a batch of order books, one array per metric"""
+
+    def __init__(self, symbols: List[str], values: Dict[str, np.ndarray]):
+        self.symbols = symbols
+        self.values = values
+        self.index = {symbol: i for i, symbol in enumerate(symbols)}
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.index
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.values[name]
+
+    def row(self, symbol: str) -> Optional[Dict]:
+        """Metrics of one book in the layout WhaleTrapStrategy.score_whale_activity takes"""
+        i = self.index.get(symbol)
+        if i is None:
+            return None
+        row = {}
+        for name, values in self.values.items():
+            value = values[i]
+            if values.dtype.kind == 'i':
+                row[name] = int(value)
+            else:
+                row[name] = float(value) if not np.isnan(value) else None
+        if row['imbalance'] is None:
+            row['imbalance'] = 0.0
+        return row
+
+def analyze_books(books_by_symbol: Mapping[str, Dict]) -> BookMetrics:
+    """Imbalance, large-order counts, price position and depth-weighted pressure for many books in one pass"""
+    symbols = []
+    bid_sides = []
+    ask_sides = []
+    for symbol, order_book in books_by_symbol.items():
+        if order_book is None or 'error' in order_book:
+            continue
+        bids, asks = book_arrays(order_book)
+        symbols.append(symbol)
+        bid_sides.append(bids)
+        ask_sides.append(asks)
+
+    bid_prices, bid_quantities = _pad(bid_sides)
+    ask_prices, ask_quantities = _pad(ask_sides)
+
+    with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+        # A book with an empty side is all-NaN there, which is the answer we want
+        warnings.simplefilter('ignore', RuntimeWarning)
+        bid_total = np.nansum(bid_quantities, axis=1)
+        ask_total = np.nansum(ask_quantities, axis=1)
+        total = bid_total + ask_total
+        imbalance = np.where(total > 0, (bid_total - ask_total) / total, 0.0)
+
+        lowest_bid = np.nanmin(bid_prices, axis=1) if bid_prices.shape[1] else np.full(len(symbols), np.nan)
+        best_bid = np.nanmax(bid_prices, axis=1) if bid_prices.shape[1] else np.full(len(symbols), np.nan)
+        best_ask = np.nanmin(ask_prices, axis=1) if ask_prices.shape[1] else np.full(len(symbols), np.nan)
+        highest_ask = np.nanmax(ask_prices, axis=1) if ask_prices.shape[1] else np.full(len(symbols), np.nan)
+        mid_price = (best_bid + best_ask) / 2
+        price_position = (mid_price - lowest_bid) / (highest_ask - lowest_bid)
+
+        # Resting size weighted by closeness to the mid: 1 at the touch, 1/2 at PRESSURE_DISTANCE_SCALE away
+        mid = mid_price[:, None]
+        bid_weight = 1.0 / (1.0 + np.abs(mid - bid_prices) / (mid * PRESSURE_DISTANCE_SCALE))
+        ask_weight = 1.0 / (1.0 + np.abs(ask_prices - mid) / (mid * PRESSURE_DISTANCE_SCALE))
+        bid_pressure = np.nansum(bid_quantities * bid_weight, axis=1)
+        ask_pressure = np.nansum(ask_quantities * ask_weight, axis=1)
+        weighted = bid_pressure + ask_pressure
+        pressure = np.where(weighted > 0, (bid_pressure - ask_pressure) / weighted, 0.0)
+        large_bids = _large_counts(bid_quantities)
+        large_asks = _large_counts(ask_quantities)
+
+    return BookMetrics(symbols, {
+        'imbalance': imbalance,
+        'large_bids': large_bids,
+        'large_asks': large_asks,
+        'lowest_bid': lowest_bid,
+        'highest_ask': highest_ask,
+        'mid_price': mid_price,
+        'price_position': price_position,
+        'pressure': pressure
+    })
+
+def analyze_book(order_book: Dict) -> Optional[Dict]:
+    """Metrics for a single book"""
+    return analyze_books({'book': order_book}).row('book')
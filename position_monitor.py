@@ -0,0 +1,196 @@
+import time
+import threading
+import logging
+from collections import deque
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+from trigger_index import TriggerIndex
+from rate_limiter import PRIORITY_MONITOR
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def stream_event_price(kind: str, data: Dict) -> Optional[float]:
+    """Price a market stream event carries: the bid we would sell at, else the last trade"""
+    if kind == 'bookTicker':
+        return float(data['b'])
+    if kind == 'miniTicker':
+        return float(data['c'])
+    if kind == 'kline':
+        return float(data['k']['c'])
+    return None
+
+class PositionMonitor:
+    """Checks open positions' exit triggers on its own thread, at its own rate, independent of market scans.
+
+    Streamed prices are checked as they arrive and wake the monitor at once; between them a bulk price
+    snapshot covers symbols without a fresh stream price. on_trigger(key, reason, price) places the exit,
+    returns whether the position closed, and is called under trade_lock, the lock the entry path holds,
+    so the two never interleave. A position whose exit failed is retried after a growing backoff.
+    """
+
+    def __init__(self, triggers: TriggerIndex, on_trigger: Callable[[Hashable, str, float], bool], binance_client,
+                 trade_lock: threading.RLock, market_stream=None, interval: float = None, latency_budget: float = None,
+                 retry_backoff: float = None, retry_max: float = None):
+        self.triggers = triggers
+        self.on_trigger = on_trigger
+        self.binance = binance_client
+        self.trade_lock = trade_lock
+        self.market_stream = market_stream
+        self.interval = interval or Config.POSITION_MONITOR_INTERVAL
+        self.latency_budget = latency_budget or Config.POSITION_MONITOR_BUDGET
+        self.retry_backoff = retry_backoff or Config.POSITION_MONITOR_RETRY_BACKOFF
+        self.retry_max = retry_max or Config.POSITION_MONITOR_RETRY_MAX
+
+        self._fired = {}  # key -> (reason, price, detected_at) waiting for the monitor thread
+        self._retry_at = {}  # key -> monotonic time before which a failed exit is not retried
+        self._failures = {}  # key -> failed exits in a row
+        self._condition = threading.Condition()
+        self._thread = None
+        self.running = False
+
+        self.polls = 0
+        self.stream_checks = 0
+        self.snapshot_requests = 0
+        self.exits = 0
+        self.failed_exits = 0
+        self.over_budget = 0
+        self.latencies = deque(maxlen=1000)  # detection to exit order returned, seconds
+
+    def attach(self, market_stream):
+        """Check triggers on every streamed price instead of waiting for the next poll"""
+        self.market_stream = market_stream
+        market_stream.subscribe(self.on_stream_event)
+
+    def on_stream_event(self, kind: str, symbol: str, data: Dict):
+        price = stream_event_price(kind, data)
+        if not price:
+            return
+        self.stream_checks += 1
+        fired = self.triggers.check(symbol, price)
+        if fired:
+            detected_at = time.monotonic()
+            self._queue([(key, reason, price) for key, reason in fired], detected_at)
+
+    def _queue(self, fired: List[Tuple[Hashable, str, float]], detected_at: float):
+        with self._condition:
+            for key, reason, price in fired:
+                # A position whose exit just failed sits out its backoff instead of retrying every tick
+                if self._retry_at.get(key, 0.0) > detected_at:
+                    continue
+                # Keep the first detection time of a trigger still waiting for its exit
+                if key not in self._fired:
+                    self._fired[key] = (reason, price, detected_at)
+            self._condition.notify()
+
+    def _prices(self) -> Dict[str, float]:
+        """Fresh stream prices for symbols with triggers, topped up from one bulk snapshot"""
+        symbols = self.triggers.symbols()
+        prices = {}
+        if self.market_stream is not None:
+            for symbol in symbols:
+                price = self.market_stream.get_price(symbol, Config.STREAM_MAX_AGE)
+                if price:
+                    prices[symbol] = price
+        if len(prices) < len(symbols):
+            # One request prices every position the stream does not cover; reused within the interval
+            snapshot = self.binance.get_all_prices(self.interval / 2, priority=PRIORITY_MONITOR)
+            self.snapshot_requests += 1
+            if snapshot is not None:
+                for symbol in symbols:
+                    if symbol not in prices and symbol in snapshot:
+                        prices[symbol] = snapshot.get(symbol)
+        return prices
+
+    def poll(self):
+        """One pass: check every trigger against current prices and queue what fired"""
+        self.polls += 1
+        if not self.triggers.needs_prices():
+            return
+        fired = self.triggers.check_snapshot(self._prices())
+        if fired:
+            self._queue(fired, time.monotonic())
+
+    def _back_off(self, key: Hashable):
+        """Hold back a position whose exit failed, doubling the wait on each failure in a row"""
+        with self._condition:
+            failures = self._failures.get(key, 0) + 1
+            self._failures[key] = failures
+            delay = min(self.retry_backoff * 2 ** (failures - 1), self.retry_max)
+            self._retry_at[key] = time.monotonic() + delay
+        self.failed_exits += 1
+        logger.warning(f"Exit for {key} did not close the position, retrying in {delay:.1f}s")
+
+    def run_exits(self) -> int:
+        """Place exits for everything queued; returns how many were handled"""
+        with self._condition:
+            fired, self._fired = self._fired, {}
+        for key, (reason, price, detected_at) in fired.items():
+            try:
+                with self.trade_lock:
+                    closed = self.on_trigger(key, reason, price)
+            except Exception as e:
+                logger.error(f"Exit for {key} failed: {e}")
+                closed = False
+            if not closed:
+                self._back_off(key)
+                continue
+            with self._condition:
+                self._retry_at.pop(key, None)
+                self._failures.pop(key, None)
+            latency = time.monotonic() - detected_at
+            self.latencies.append(latency)
+            self.exits += 1
+            if latency > self.latency_budget:
+                self.over_budget += 1
+                logger.warning(f"Exit for {key} ({reason}) took {latency * 1000:.0f}ms from detection, "
+                               f"budget {self.latency_budget * 1000:.0f}ms")
+        return len(fired)
+
+    def _run(self):
+        next_poll = time.monotonic()
+        while self.running:
+            with self._condition:
+                timeout = max(0.0, next_poll - time.monotonic())
+                if not self._fired and self.running:
+                    self._condition.wait(timeout)
+            try:
+                if time.monotonic() >= next_poll:
+                    next_poll = time.monotonic() + self.interval
+                    self.poll()
+                self.run_exits()
+            except Exception as e:
+                logger.error(f"Position monitor error: {e}")
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self._run, name='position-monitor', daemon=True)
+        self._thread.start()
+        logger.info(f"Position monitor started: every {self.interval}s, exit budget {self.latency_budget * 1000:.0f}ms")
+
+    def stop(self):
+        with self._condition:
+            self.running = False
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def get_stats(self) -> Dict:
+        latencies = np.array(self.latencies) * 1000
+        return {
+            'running': self.running,
+            'polls': self.polls,
+            'stream_checks': self.stream_checks,
+            'snapshot_requests': self.snapshot_requests,
+            'exits': self.exits,
+            'failed_exits': self.failed_exits,
+            'retrying': len(self._failures),
+            'over_budget': self.over_budget,
+            'latency_p50_ms': round(float(np.percentile(latencies, 50)), 2) if len(latencies) else None,
+            'latency_p95_ms': round(float(np.percentile(latencies, 95)), 2) if len(latencies) else None,
+            'latency_max_ms': round(float(latencies.max()), 2) if len(latencies) else None
+        }
@@ -0,0 +1,217 @@
+import asyncio
+import time
+import threading
+import logging
+from typing import Dict, Mapping
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Request priorities - lower value wins when the budget is tight
+PRIORITY_ORDER = 0     # Order placement and cancellation
+PRIORITY_MONITOR = 1   # Stop/take-profit monitoring of open positions
+PRIORITY_WEB = 2       # Dashboard and API handlers
+PRIORITY_SCAN = 3      # Background market scanning
+
+# Order placement and cancellation calls, charged to the order bucket and sent at PRIORITY_ORDER
+ORDER_ENDPOINTS = {
+    ('POST', '/api/v3/order'),
+    ('POST', '/api/v3/order/oco'),
+    ('POST', '/api/v3/orderList/oco'),
+    ('DELETE', '/api/v3/order'),
+    ('DELETE', '/api/v3/orderList'),
+}
+
+# Static request weights, see https://developers.binance.com/docs/binance-spot-api-docs/rest-api
+ENDPOINT_WEIGHTS = {
+    '/api/v3/ping': 1,
+    '/api/v3/time': 1,
+    '/api/v3/exchangeInfo': 20,
+    '/api/v3/klines': 2,
+    '/api/v3/account': 20,
+    '/api/v3/myTrades': 20,
+    '/api/v3/openOrderList': 6,
+    '/api/v3/orderList': 4,
+    '/api/v3/userDataStream': 2,
+}
+
+def endpoint_weight(method: str, endpoint: str, params: Mapping = None) -> int:
+    """Request weight Binance charges for a call"""
+    params = params or {}
+    has_symbol = 'symbol' in params or 'symbols' in params
+
+    if endpoint == '/api/v3/depth':
+        limit = int(params.get('limit', 100))
+        if limit <= 100:
+            return 5
+        if limit <= 500:
+            return 25
+        if limit <= 1000:
+            return 50
+        return 250
+    if endpoint in ('/api/v3/ticker/price', '/api/v3/ticker/bookTicker'):
+        return 2 if has_symbol else 4
+    if endpoint == '/api/v3/ticker/24hr':
+        return 2 if has_symbol else 80
+    if endpoint == '/api/v3/openOrders':
+        return 6 if has_symbol else 80
+    if endpoint in ('/api/v3/order', '/api/v3/orderList'):
+        return 4 if method == 'GET' else 1
+    return ENDPOINT_WEIGHTS.get(endpoint, 1)
+
+def is_order_request(method: str, endpoint: str) -> bool:
+    return (method, endpoint) in ORDER_ENDPOINTS
+
+class RequestWeightLimiter:
+    """Process-wide token bucket over Binance request weight and order count"""
+
+    def __init__(self, weight_per_minute: int = None, orders_per_10s: int = None, headroom: float = None):
+        headroom = headroom if headroom is not None else Config.RATE_LIMIT_HEADROOM
+        self.weight_capacity = (weight_per_minute or Config.RATE_LIMIT_WEIGHT_PER_MINUTE) * headroom
+        self.order_capacity = (orders_per_10s or Config.RATE_LIMIT_ORDERS_PER_10S) * headroom
+        self.weight_refill = self.weight_capacity / 60.0
+        self.order_refill = self.order_capacity / 10.0
+
+        # Budget kept back from each priority so more urgent callers always find tokens
+        self.reserve = {
+            PRIORITY_ORDER: 0.0,
+            PRIORITY_MONITOR: 0.05 * self.weight_capacity,
+            PRIORITY_WEB: 0.15 * self.weight_capacity,
+            PRIORITY_SCAN: Config.RATE_LIMIT_SCAN_RESERVE * self.weight_capacity,
+        }
+
+        self.weight_tokens = self.weight_capacity
+        self.order_tokens = self.order_capacity
+        self.banned_until = 0.0
+        self.last_refill = time.monotonic()
+        self.waiting = {priority: 0 for priority in self.reserve}
+
+        self.used_weight = 0
+        self.order_count = 0
+        self.total_wait = 0.0
+        self.throttled_requests = 0
+
+        self._condition = threading.Condition()
+
+    def _refill(self, now: float):
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.weight_tokens = min(self.weight_capacity, self.weight_tokens + elapsed * self.weight_refill)
+            self.order_tokens = min(self.order_capacity, self.order_tokens + elapsed * self.order_refill)
+            self.last_refill = now
+
+    def _try_take(self, weight: int, priority: int, is_order: bool) -> float:
+        """Take tokens if allowed; otherwise return seconds until a retry makes sense"""
+        now = time.monotonic()
+        self._refill(now)
+
+        if now < self.banned_until:
+            return self.banned_until - now
+
+        # Yield to anyone more urgent who is already queued
+        if any(count > 0 for p, count in self.waiting.items() if p < priority):
+            return 0.05
+
+        floor = self.reserve.get(priority, self.reserve[PRIORITY_SCAN])
+        weight_short = weight + floor - self.weight_tokens
+        order_short = 1 - self.order_tokens if is_order else 0
+
+        if weight_short <= 0 and order_short <= 0:
+            self.weight_tokens -= weight
+            if is_order:
+                self.order_tokens -= 1
+            return 0.0
+
+        return max(weight_short / self.weight_refill, order_short / self.order_refill, 0.001)
+
+    def acquire(self, weight: int, priority: int = PRIORITY_SCAN, is_order: bool = False):
+        """Block until the request fits in the budget"""
+        start = time.monotonic()
+        with self._condition:
+            wait = self._try_take(weight, priority, is_order)
+            if wait <= 0:
+                return
+
+            self.waiting[priority] = self.waiting.get(priority, 0) + 1
+            try:
+                while wait > 0:
+                    self._condition.wait(min(wait, 0.5))
+                    wait = self._try_take(weight, priority, is_order)
+            finally:
+                self.waiting[priority] -= 1
+                self.throttled_requests += 1
+                self.total_wait += time.monotonic() - start
+                self._condition.notify_all()
+
+    async def acquire_async(self, weight: int, priority: int = PRIORITY_SCAN, is_order: bool = False):
+        """Await until the request fits in the budget without blocking the event loop"""
+        start = time.monotonic()
+        with self._condition:
+            wait = self._try_take(weight, priority, is_order)
+            if wait <= 0:
+                return
+            self.waiting[priority] = self.waiting.get(priority, 0) + 1
+
+        try:
+            while wait > 0:
+                await asyncio.sleep(min(wait, 0.5))
+                with self._condition:
+                    wait = self._try_take(weight, priority, is_order)
+        finally:
+            with self._condition:
+                self.waiting[priority] -= 1
+                self.throttled_requests += 1
+                self.total_wait += time.monotonic() - start
+                self._condition.notify_all()
+
+    def update_from_headers(self, headers: Mapping):
+        """Sync the bucket with the usage Binance reports in response headers"""
+        used_weight = headers.get('X-MBX-USED-WEIGHT-1M') or headers.get('x-mbx-used-weight-1m')
+        order_count = headers.get('X-MBX-ORDER-COUNT-10S') or headers.get('x-mbx-order-count-10s')
+
+        with self._condition:
+            # Other processes sharing the IP also consume weight, so only ever tighten
+            if used_weight is not None:
+                self.used_weight = int(used_weight)
+                self.weight_tokens = min(self.weight_tokens, self.weight_capacity - self.used_weight)
+            if order_count is not None:
+                self.order_count = int(order_count)
+                self.order_tokens = min(self.order_tokens, self.order_capacity - self.order_count)
+
+    def on_rate_limited(self, status_code: int, retry_after: str = None):
+        """Stop all traffic after a 429 (rate limit) or 418 (IP ban) response"""
+        backoff = float(retry_after) if retry_after else (60.0 if status_code == 429 else 120.0)
+        with self._condition:
+            self.banned_until = max(self.banned_until, time.monotonic() + backoff)
+            self.weight_tokens = 0.0
+
+        logger.warning(f"Binance returned {status_code}, pausing requests for {backoff:.0f}s")
+
+    def get_status(self) -> Dict:
+        """Get current budget and throttling counters"""
+        with self._condition:
+            self._refill(time.monotonic())
+            return {
+                'weight_tokens': round(self.weight_tokens, 1),
+                'weight_capacity': self.weight_capacity,
+                'order_tokens': round(self.order_tokens, 1),
+                'used_weight_1m': self.used_weight,
+                'order_count_10s': self.order_count,
+                'banned_for': max(0.0, self.banned_until - time.monotonic()),
+                'throttled_requests': self.throttled_requests,
+                'total_wait': round(self.total_wait, 3)
+            }
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+def get_shared_limiter() -> RequestWeightLimiter:
+    """Get the limiter shared by every client in the process"""
+    global _shared_limiter
+
+    if _shared_limiter is None:
+        with _shared_limiter_lock:
+            if _shared_limiter is None:
+                _shared_limiter = RequestWeightLimiter()
+    return _shared_limiter
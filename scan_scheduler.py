@@ -0,0 +1,126 @@
+import time
+import threading
+import logging
+from typing import Dict, Iterable, List
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class ScanScheduler:
+    """Per-symbol revisit intervals on a fixed-rate cycle clock with deadlines and overrun accounting"""
+
+    def __init__(self, period: float = None, min_interval: float = None, max_interval: float = None,
+                 reject_cooldown: float = None, deadline_fraction: float = None):
+        self.period = period or Config.SCAN_INTERVAL
+        self.min_interval = min_interval or Config.SCAN_MIN_INTERVAL
+        self.max_interval = max_interval or Config.SCAN_MAX_INTERVAL
+        self.reject_cooldown = reject_cooldown if reject_cooldown is not None else Config.SCAN_REJECT_COOLDOWN
+        self.deadline_fraction = deadline_fraction or Config.SCAN_CYCLE_DEADLINE
+
+        self.next_due = {}    # symbol -> monotonic time of the next visit
+        self.intervals = {}   # symbol -> last interval assigned
+        self._next_tick = None
+        self.cycle_start = None
+        self.deadline = None
+
+        self.cycles = 0
+        self.overruns = 0
+        self.overrun_time = 0.0
+        self.skipped_ticks = 0
+        self.visits = 0
+        self.deferred = 0
+        self.cooldowns = 0
+        self._lock = threading.Lock()
+
+    def begin_cycle(self) -> float:
+        """Start a cycle; returns its monotonic deadline"""
+        self.cycle_start = time.monotonic()
+        self.deadline = self.cycle_start + self.period * self.deadline_fraction
+        if self._next_tick is None:
+            self._next_tick = self.cycle_start
+        return self.deadline
+
+    def past_deadline(self) -> bool:
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+    def end_cycle(self) -> float:
+        """Close the cycle and account for any overrun; returns its duration"""
+        now = time.monotonic()
+        duration = now - self.cycle_start
+        self.cycles += 1
+        if now > self.deadline:
+            self.overruns += 1
+            self.overrun_time += now - self.deadline
+            logger.warning(f"Scan cycle overran its deadline by {now - self.deadline:.2f}s")
+        return duration
+
+    def wait_next(self):
+        """Sleep until the next tick of the fixed-rate clock; ticks already missed are skipped, not replayed"""
+        now = time.monotonic()
+        if self._next_tick is None:
+            self._next_tick = now
+        self._next_tick += self.period
+        if self._next_tick < now:
+            missed = int((now - self._next_tick) // self.period) + 1
+            self.skipped_ticks += missed
+            self._next_tick += missed * self.period
+        time.sleep(max(0.0, self._next_tick - now))
+
+    def select(self, symbols: Iterable[str], limit: int = None) -> List[str]:
+        """Symbols due for a visit, most overdue first; never-seen symbols are due at once"""
+        now = time.monotonic()
+        symbols = list(symbols)
+        due = [symbol for symbol in symbols if self.next_due.get(symbol, 0.0) <= now]
+        due.sort(key=lambda symbol: self.next_due.get(symbol, 0.0))
+        if limit is not None:
+            due = due[:limit]
+        self.deferred += len(symbols) - len(due)
+        return due
+
+    def interval_for(self, volatility: float = None, volume_ratio: float = None, signal: float = None,
+                     held: bool = False) -> float:
+        """Revisit interval: the more a symbol moves, trades and signals, the sooner we look again"""
+        if held:
+            return self.min_interval
+        activity = 0.0
+        if volatility is not None and volatility == volatility:
+            activity += abs(volatility) / Config.SCAN_VOLATILITY_REFERENCE
+        if volume_ratio is not None and volume_ratio == volume_ratio:
+            activity += max(volume_ratio - 1.0, 0.0)
+        if signal:
+            activity += 2.0 * abs(signal)
+        interval = self.max_interval / (1.0 + activity)
+        return float(min(max(interval, self.min_interval), self.max_interval))
+
+    def schedule(self, symbol: str, volatility: float = None, volume_ratio: float = None, signal: float = None,
+                 held: bool = False, rejected: bool = False) -> float:
+        """Record a visit and set when the symbol is next due; rejected symbols wait out the cooldown"""
+        interval = self.interval_for(volatility, volume_ratio, signal, held)
+        if rejected and not held:
+            interval = max(interval, self.reject_cooldown)
+            self.cooldowns += 1
+        with self._lock:
+            self.next_due[symbol] = time.monotonic() + interval
+            self.intervals[symbol] = interval
+            self.visits += 1
+        return interval
+
+    def wake(self, symbol: str):
+        """Make a symbol due on the next cycle, e.g. after its position closed"""
+        with self._lock:
+            self.next_due.pop(symbol, None)
+
+    def get_stats(self) -> Dict:
+        intervals = list(self.intervals.values())
+        return {
+            'cycles': self.cycles,
+            'overruns': self.overruns,
+            'overrun_time': round(self.overrun_time, 3),
+            'skipped_ticks': self.skipped_ticks,
+            'visits': self.visits,
+            'deferred': self.deferred,
+            'cooldowns': self.cooldowns,
+            'tracked': len(self.next_due),
+            'mean_interval': round(sum(intervals) / len(intervals), 2) if intervals else None
+        }
@@ -0,0 +1,119 @@
+import time
+import logging
+from typing import Dict, List, Optional
+import numpy as np
+from market_snapshot import Ticker24hSnapshot
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 86400.0
+
+class Screener:
+    """First funnel stage: one vectorized pass over the 24hr ticker snapshot picks the symbols worth full analysis"""
+
+    def __init__(self, top_k: int = None, max_spread_bps: float = None, min_quote_volume: float = None,
+                 min_change_pct: float = None, min_volume_ratio: float = None):
+        self.top_k = top_k or Config.SCREENER_TOP_K
+        self.max_spread_bps = max_spread_bps if max_spread_bps is not None else Config.SCREENER_MAX_SPREAD_BPS
+        self.min_quote_volume = min_quote_volume if min_quote_volume is not None else Config.SCREENER_MIN_QUOTE_VOLUME
+        self.min_change_pct = min_change_pct if min_change_pct is not None else Config.SCREENER_MIN_CHANGE_PCT
+        self.min_volume_ratio = min_volume_ratio if min_volume_ratio is not None else Config.SCREENER_MIN_VOLUME_RATIO
+
+        # Recent moves are measured between the two newest distinct snapshots
+        self._current = None
+        self._previous = None
+
+        self.last_funnel = {}
+        self.screens = 0
+        self.symbols_screened = 0
+        self.symbols_selected = 0
+        self.weight_saved = 0
+        self.total_time = 0.0
+
+    def _advance(self, snapshot: Ticker24hSnapshot):
+        if self._current is None or snapshot.timestamp > self._current.timestamp:
+            self._previous, self._current = self._current, snapshot
+
+    def _recent(self, snapshot: Ticker24hSnapshot, rows: np.ndarray):
+        """(price change %, volume vs 24h average rate) per row since the previous snapshot"""
+        previous = self._previous
+        price = snapshot.last_price[rows]
+        if previous is None or snapshot is not self._current:
+            # Nothing to compare with yet: fall back to the 24h move at an average volume rate
+            return snapshot.price_change_pct[rows], np.ones(len(rows))
+
+        previous_rows = np.array([previous.index.get(symbol, -1) for symbol in snapshot.symbols[rows]], dtype=np.intp)
+        known = previous_rows >= 0
+        elapsed = snapshot.timestamp - previous.timestamp
+        previous_price = np.where(known, previous.last_price[previous_rows], price)
+        previous_volume = np.where(known, previous.quote_volume[previous_rows], np.nan)
+        quote_volume = snapshot.quote_volume[rows]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change_pct = np.where(previous_price > 0, (price / previous_price - 1.0) * 100, 0.0)
+            # The rolling 24h total grows by roughly what traded since the last snapshot
+            traded = np.maximum(quote_volume - previous_volume, 0.0)
+            average_rate = quote_volume * elapsed / SECONDS_PER_DAY
+            volume_ratio = np.where(known & (average_rate > 0), traded / average_rate, 1.0)
+        return change_pct, volume_ratio
+
+    def screen(self, snapshot: Optional[Ticker24hSnapshot], symbols: List[str], weight_per_symbol: int = 0) -> List[str]:
+        """Top candidates among symbols, best first; weight_per_symbol is the request weight full analysis costs"""
+        start = time.perf_counter()
+        if snapshot is None or len(snapshot) == 0:
+            # Without a snapshot the funnel cannot judge anything, so everything goes through
+            self.last_funnel = {'universe': len(symbols), 'selected': len(symbols), 'snapshot': False}
+            return list(symbols)
+        self._advance(snapshot)
+
+        rows = np.array([snapshot.index.get(symbol, -1) for symbol in symbols], dtype=np.intp)
+        listed = rows >= 0
+        rows = rows[listed]
+
+        bid = snapshot.bid[rows]
+        ask = snapshot.ask[rows]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            spread_bps = np.where((bid > 0) & (ask > 0), (ask - bid) / ((ask + bid) / 2) * 10000, np.inf)
+        liquid = (spread_bps <= self.max_spread_bps) & (snapshot.quote_volume[rows] >= self.min_quote_volume)
+
+        change_pct, volume_ratio = self._recent(snapshot, rows)
+        moving = (np.abs(change_pct) >= self.min_change_pct) | (volume_ratio >= self.min_volume_ratio)
+        eligible = np.flatnonzero(liquid & moving)
+
+        # Size of the move plus excess volume, in comparable units
+        score = np.abs(change_pct) / max(self.min_change_pct, 1e-9) + np.maximum(volume_ratio - 1.0, 0.0)
+        if len(eligible) > self.top_k:
+            eligible = eligible[np.argpartition(-score[eligible], self.top_k - 1)[:self.top_k]]
+        eligible = eligible[np.argsort(-score[eligible], kind='stable')]
+        selected = [str(symbol) for symbol in snapshot.symbols[rows[eligible]]]
+
+        skipped = len(symbols) - len(selected)
+        elapsed = time.perf_counter() - start
+        self.last_funnel = {
+            'universe': len(symbols),
+            'listed': int(listed.sum()),
+            'liquid': int(liquid.sum()),
+            'moving': int((liquid & moving).sum()),
+            'selected': len(selected),
+            'weight_saved': skipped * weight_per_symbol,
+            'screen_time': round(elapsed, 5)
+        }
+        self.screens += 1
+        self.symbols_screened += len(symbols)
+        self.symbols_selected += len(selected)
+        self.weight_saved += skipped * weight_per_symbol
+        self.total_time += elapsed
+        return selected
+
+    def get_stats(self) -> Dict:
+        return {
+            'screens': self.screens,
+            'symbols_screened': self.symbols_screened,
+            'symbols_selected': self.symbols_selected,
+            'pass_rate': round(self.symbols_selected / self.symbols_screened, 3) if self.symbols_screened else 0.0,
+            'weight_saved': self.weight_saved,
+            'total_time': round(self.total_time, 4),
+            'last_funnel': self.last_funnel
+        }
@@ -0,0 +1,207 @@
+import time
+import heapq
+import itertools
+import threading
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, List
+import numpy as np
+from candle_store import CandleStore, get_shared_candle_store
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class EventStrategy:
+    """Handlers a strategy may override to be driven by StrategyEngine; the defaults ignore the event"""
+
+    def on_candle_close(self, symbol: str, bars):
+        """A candle closed; bars are candles from the shared candle store ending with the closed one"""
+
+    def on_book_update(self, symbol: str, book):
+        """The local order book changed; bursts are coalesced so only the latest book is seen"""
+
+    def on_fill(self, order: Dict):
+        """One of our orders traded"""
+
+class StrategyEngine:
+    """Feeds stream events to registered strategies from a single dispatcher thread, so handlers never race"""
+
+    def __init__(self, candle_store: CandleStore = None, interval: str = None, history: int = None):
+        self.candle_store = candle_store or get_shared_candle_store()
+        self.interval = interval or Config.ENGINE_INTERVAL
+        self.history = history or Config.ENGINE_HISTORY
+        self.strategies = []
+
+        # (kind, symbol) -> (payload, received_at); a newer event replaces a pending one in place
+        self._pending = OrderedDict()
+        self._timers = []  # heap of (due, seq, period, callback)
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self.running = False
+
+        self.received = 0
+        self.coalesced = 0
+        self.dispatched = 0
+        self.errors = 0
+        self.handler_time = 0.0
+        self.max_lag = 0.0
+
+    def register(self, strategy: EventStrategy):
+        self.strategies.append(strategy)
+
+    # Event sources
+
+    def attach(self, market_stream):
+        """Turn closed klines of a MarketDataStream into candle-close events.
+
+        Attach after the candle store, so the closed candle is merged before the event is queued.
+        """
+        market_stream.subscribe(self.on_stream_event)
+
+    def attach_order_books(self, order_books):
+        """Turn OrderBookManager updates into book events"""
+        order_books.subscribe(lambda symbol, book: self.publish('book', symbol, book))
+
+    def attach_user_stream(self, user_stream):
+        """Turn execution reports that traded into fill events"""
+        user_stream.subscribe(self.on_user_event)
+
+    def on_stream_event(self, kind: str, symbol: str, data: Dict):
+        if kind != 'kline':
+            return
+        k = data['k']
+        if k.get('x') and k.get('i') == self.interval:
+            self.publish('candle', symbol, k['t'])
+
+    def on_user_event(self, kind: str, event: Dict):
+        if kind != 'executionReport' or event.get('x') != 'TRADE':
+            return
+        order = {
+            'symbol': event['s'], 'order_id': event['i'], 'client_order_id': event.get('c'),
+            'side': event['S'], 'type': event['o'], 'status': event['X'],
+            'price': float(event['L']), 'quantity': float(event['l']), 'executed': float(event['z'])
+        }
+        # Every fill matters, so fills get a key of their own and are never coalesced
+        self.publish('fill', next(self._sequence), order)
+
+    def publish(self, kind: str, key, payload=None):
+        """Queue an event for the dispatcher; thread-safe and cheap enough for stream callbacks"""
+        with self._condition:
+            self.received += 1
+            slot = (kind, key)
+            if slot in self._pending:
+                self.coalesced += 1
+                self._pending[slot] = (payload, self._pending[slot][1])
+            else:
+                self._pending[slot] = (payload, time.monotonic())
+            self._condition.notify()
+
+    def every(self, period: float, callback: Callable[[], None]):
+        """Run callback every period seconds on the dispatcher thread, between events"""
+        with self._condition:
+            heapq.heappush(self._timers, (time.monotonic() + period, next(self._sequence), period, callback))
+            self._condition.notify()
+
+    # Dispatch
+
+    def _dispatch(self, kind: str, key, payload, received_at: float):
+        if kind == 'candle':
+            # A REST refresh only happens for symbols the store has not seeded yet
+            bars = self.candle_store.get(key, self.interval, self.history + 1)
+            if bars is None:
+                return
+            # The next candle may have opened since the close was queued; end at the one that closed
+            end = int(np.searchsorted(bars[:, 0], payload, side='right'))
+            bars = bars[:end][-self.history:]
+            if len(bars) < 2 or bars[-1, 0] != payload:
+                return
+            args = ('on_candle_close', key, bars)
+        elif kind == 'book':
+            args = ('on_book_update', key, payload)
+        else:
+            args = ('on_fill', payload)
+
+        self.max_lag = max(self.max_lag, time.monotonic() - received_at)
+        start = time.perf_counter()
+        for strategy in self.strategies:
+            try:
+                getattr(strategy, args[0])(*args[1:])
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"{type(strategy).__name__}.{args[0]} failed: {e}")
+        self.handler_time += time.perf_counter() - start
+        self.dispatched += 1
+
+    def _take_pending(self) -> List:
+        with self._condition:
+            events = [(kind, key, payload, received_at)
+                      for (kind, key), (payload, received_at) in self._pending.items()]
+            self._pending.clear()
+        return events
+
+    def _run_timers(self):
+        now = time.monotonic()
+        due = []
+        with self._condition:
+            while self._timers and self._timers[0][0] <= now:
+                _, sequence, period, callback = heapq.heappop(self._timers)
+                heapq.heappush(self._timers, (now + period, sequence, period, callback))
+                due.append(callback)
+        for callback in due:
+            try:
+                callback()
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Strategy engine timer failed: {e}")
+
+    def run_pending(self) -> int:
+        """Dispatch everything queued so far on the calling thread; returns the number of events"""
+        events = self._take_pending()
+        for event in events:
+            self._dispatch(*event)
+        self._run_timers()
+        return len(events)
+
+    def _wait(self):
+        with self._condition:
+            if self._pending or not self.running:
+                return
+            timeout = max(0.0, self._timers[0][0] - time.monotonic()) if self._timers else None
+            self._condition.wait(timeout)
+
+    def run(self):
+        """Dispatch events on the calling thread until stop()"""
+        self.running = True
+        while self.running:
+            self._wait()
+            self.run_pending()
+
+    def start(self):
+        """Dispatch events on a background thread"""
+        if self._thread is not None:
+            return
+        self.running = True
+        self._thread = threading.Thread(target=self.run, name='strategy-engine', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self.running = False
+            self._condition.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self._thread = None
+
+    def get_stats(self) -> Dict:
+        return {
+            'strategies': len(self.strategies),
+            'received': self.received,
+            'coalesced': self.coalesced,
+            'dispatched': self.dispatched,
+            'pending': len(self._pending),
+            'errors': self.errors,
+            'handler_time': round(self.handler_time, 4),
+            'max_lag': round(self.max_lag, 4)
+        }
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Local WebSocket stand-in that replays recorded Binance stream frames.
+
+Record:  python stream_replay.py record --symbols BTCUSDT,ETHUSDT --seconds 60 --out frames.jsonl
+Replay:  python stream_replay.py replay --file frames.jsonl --speed 10 --port 8765
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import logging
+from typing import Dict, List, Optional
+from urllib.parse import urlparse, parse_qs
+import websockets
+from async_binance_client import BackgroundLoop
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def load_frames(path: str) -> List[Dict]:
+    """Load recorded frames: one {"t": seconds, "frame": raw_text} object per line"""
+    frames = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                frames.append(json.loads(line))
+    return frames
+
+class ReplayServer:
+    """Serves recorded frames to every client at a configurable speed"""
+
+    def __init__(self, frames: List[Dict], speed: float = 1.0, loop_forever: bool = False,
+                 host: str = '127.0.0.1', port: int = 0):
+        self.frames = frames
+        self.speed = speed  # 0 replays as fast as the socket allows
+        self.loop_forever = loop_forever
+        self.host = host
+        self.port = port
+        self.frames_sent = 0
+        self._loop = None
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def _stream_filter(self, path: str) -> Optional[set]:
+        """Streams requested via /stream?streams=a/b, or None for a raw /ws connection"""
+        query = parse_qs(urlparse(path).query)
+        if 'streams' not in query:
+            return None
+        return set(query['streams'][0].split('/'))
+
+    async def _handler(self, connection):
+        wanted = self._stream_filter(connection.request.path)
+        while True:
+            previous = None
+            for frame in self.frames:
+                if self.speed > 0 and previous is not None:
+                    await asyncio.sleep(max(0.0, frame['t'] - previous) / self.speed)
+                previous = frame['t']
+
+                raw = frame['frame']
+                if wanted is not None:
+                    stream = json.loads(raw).get('stream')
+                    if stream is not None and stream not in wanted:
+                        continue
+                await connection.send(raw)
+                self.frames_sent += 1
+            if not self.loop_forever:
+                break
+        await connection.wait_closed()
+
+    async def _serve(self):
+        self._server = await websockets.serve(self._handler, self.host, self.port, max_size=None)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    def start(self) -> str:
+        """Start serving in a background thread and return the ws:// URL"""
+        self._loop = BackgroundLoop()
+        self._loop.run(self._serve())
+        logger.info(f"Replaying {len(self.frames)} frames on {self.url} at {self.speed}x")
+        return self.url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.close()
+            self._loop.run(self._server.wait_closed(), timeout=5)
+            self._loop.loop.call_soon_threadsafe(self._loop.loop.stop)
+
+def record(symbols: List[str], seconds: float, out: str, interval: str = '1m', ws_url: str = None):
+    """Record live combined-stream frames to a JSONL file"""
+    from market_stream import MarketDataStream
+
+    stream = MarketDataStream(symbols, interval=interval, ws_url=ws_url, record_path=out)
+    stream.start()
+    time.sleep(seconds)
+    stream.stop()
+    logger.info(f"Recorded {stream.messages} frames to {out}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Record or replay Binance WebSocket streams')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    rec = sub.add_parser('record')
+    rec.add_argument('--symbols', required=True, help='Comma separated, e.g. BTCUSDT,ETHUSDT')
+    rec.add_argument('--seconds', type=float, default=60)
+    rec.add_argument('--interval', default='1m')
+    rec.add_argument('--out', default='stream_frames.jsonl')
+
+    rep = sub.add_parser('replay')
+    rep.add_argument('--file', required=True)
+    rep.add_argument('--speed', type=float, default=1.0)
+    rep.add_argument('--loop', action='store_true')
+    rep.add_argument('--port', type=int, default=8765)
+
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record(args.symbols.split(','), args.seconds, args.out, args.interval)
+    else:
+        server = ReplayServer(load_frames(args.file), args.speed, args.loop, port=args.port)
+        server.start()
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.stop()
+
+if __name__ == "__main__":
+    main()
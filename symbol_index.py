@@ -0,0 +1,151 @@
+import math
+import time
+import threading
+import logging
+from typing import Callable, Dict, List, Optional
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _step_decimals(step: str) -> int:
+    """Number of decimals implied by a Binance step string such as '0.00100000'"""
+    if '.' not in step:
+        return 0
+    return len(step.rstrip('0').split('.')[1])
+
+def compile_quantizer(step: str) -> Callable[[float], float]:
+    """Build a function that floors a value onto the given step grid"""
+    step_value = float(step)
+    if step_value <= 0:
+        return lambda value: value
+
+    decimals = _step_decimals(step)
+
+    def quantize(value: float) -> float:
+        # Small epsilon keeps exact multiples from flooring one step down
+        return round(math.floor(value / step_value + 1e-9) * step_value, decimals)
+
+    return quantize
+
+class SymbolRules:
+    """Trading rules for one symbol with precompiled quantizers"""
+
+    __slots__ = (
+        'symbol', 'status', 'base_asset', 'quote_asset', 'is_spot_trading_allowed',
+        'min_qty', 'max_qty', 'step_size', 'min_price', 'max_price', 'tick_size',
+        'min_notional', 'quantize_quantity', 'quantize_price', 'raw'
+    )
+
+    def __init__(self, symbol_info: Dict):
+        filters = {f['filterType']: f for f in symbol_info.get('filters', [])}
+        lot_size = filters.get('LOT_SIZE', {})
+        price_filter = filters.get('PRICE_FILTER', {})
+        # Newer exchangeInfo payloads replace MIN_NOTIONAL with NOTIONAL
+        notional = filters.get('MIN_NOTIONAL') or filters.get('NOTIONAL') or {}
+
+        self.symbol = symbol_info['symbol']
+        self.status = symbol_info.get('status')
+        self.base_asset = symbol_info.get('baseAsset')
+        self.quote_asset = symbol_info.get('quoteAsset')
+        self.is_spot_trading_allowed = symbol_info.get('isSpotTradingAllowed', False)
+
+        self.min_qty = float(lot_size.get('minQty', 0))
+        self.max_qty = float(lot_size.get('maxQty', 0))
+        self.step_size = float(lot_size.get('stepSize', 0))
+        self.min_price = float(price_filter.get('minPrice', 0))
+        self.max_price = float(price_filter.get('maxPrice', 0))
+        self.tick_size = float(price_filter.get('tickSize', 0))
+        self.min_notional = float(notional.get('minNotional', 0))
+
+        self.quantize_quantity = compile_quantizer(lot_size.get('stepSize', '0'))
+        self.quantize_price = compile_quantizer(price_filter.get('tickSize', '0'))
+        self.raw = symbol_info
+
+    def is_tradeable(self) -> bool:
+        return self.status == 'TRADING' and self.is_spot_trading_allowed
+
+    def meets_minimums(self, quantity: float, price: float) -> bool:
+        """Check LOT_SIZE minimum and MIN_NOTIONAL for an order"""
+        if quantity < self.min_qty or quantity <= 0:
+            return False
+        if self.max_qty > 0 and quantity > self.max_qty:
+            return False
+        return quantity * price >= self.min_notional
+
+class SymbolIndex:
+    """TTL-refreshed in-memory index of exchangeInfo trading rules"""
+
+    def __init__(self, fetch_exchange_info: Callable[[], Dict], ttl: float = None, retry_after: float = None):
+        self.fetch_exchange_info = fetch_exchange_info
+        self.ttl = ttl if ttl is not None else Config.SYMBOL_INDEX_TTL
+        self.retry_after = retry_after if retry_after is not None else Config.SYMBOL_INDEX_RETRY
+        self._rules = {}
+        self._symbols = []
+        self._loaded_at = 0.0
+        self._failed_at = 0.0
+        self._lock = threading.Lock()
+
+    def _is_current(self) -> bool:
+        now = time.time()
+        if self._rules and now - self._loaded_at < self.ttl:
+            return True
+        # After a failure, every caller serves what we have until the retry window passes,
+        # instead of downloading exchangeInfo (weight 20) again and deepening a 429/418 ban
+        return now - self._failed_at < self.retry_after
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rebuild the index from a single exchangeInfo download when stale"""
+        if not force and self._is_current():
+            return bool(self._rules)
+
+        with self._lock:
+            # Another thread may have refreshed, or failed to, while we waited
+            if not force and self._is_current():
+                return bool(self._rules)
+
+            exchange_info = self.fetch_exchange_info()
+            if 'error' in exchange_info:
+                self._failed_at = time.time()
+                logger.error(f"Symbol index refresh failed, retrying in {self.retry_after:g}s: {exchange_info['error']}")
+                return bool(self._rules)  # Keep serving stale rules
+
+            rules = {}
+            symbols = []
+            for symbol_info in exchange_info.get('symbols', []):
+                entry = SymbolRules(symbol_info)
+                rules[entry.symbol] = entry
+                symbols.append(entry.symbol)
+
+            # Swap references so readers never see a half-built index
+            self._rules = rules
+            self._symbols = symbols
+            self._loaded_at = time.time()
+            self._failed_at = 0.0
+
+            logger.info(f"Symbol index loaded: {len(rules)} symbols")
+            return True
+
+    def get(self, symbol: str) -> Optional[SymbolRules]:
+        """Get trading rules for a symbol"""
+        self.refresh()
+        return self._rules.get(symbol)
+
+    def tradeable_symbols(self, quote_asset: str = 'USDT') -> List[str]:
+        """Get symbols currently trading on spot for a quote asset"""
+        self.refresh()
+        rules = self._rules
+        return [
+            symbol for symbol in self._symbols
+            if symbol.endswith(quote_asset) and rules[symbol].is_tradeable()
+        ]
+
+    def quantize_quantity(self, symbol: str, quantity: float) -> float:
+        """Round a quantity down to the symbol's LOT_SIZE step"""
+        rules = self.get(symbol)
+        return rules.quantize_quantity(quantity) if rules else quantity
+
+    def quantize_price(self, symbol: str, price: float) -> float:
+        """Round a price down to the symbol's PRICE_FILTER tick"""
+        rules = self.get(symbol)
+        return rules.quantize_price(price) if rules else price
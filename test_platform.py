@@ -155,6 +155,1235 @@ def test_binance_client():
         print(f"❌ Binance client test failed: {e}")
         return False
 
+def test_connection_pool():
+    """Test keep-alive connection reuse against the exchange simulator"""
+    print("\n🔌 Testing connection pool...")
+    
+    try:
+        from exchange_simulator import ExchangeSimulator
+        from http_session import PooledSession
+        from binance_client import BinanceClient
+        
+        simulator = ExchangeSimulator('replay')
+        base_url = simulator.start()
+        session = PooledSession(pool_maxsize=2)
+        try:
+            for _ in range(5):
+                assert session.request('GET', f"{base_url}/api/v3/ping").status_code == 200
+        finally:
+            session.close()
+            simulator.stop()
+        
+        stats = session.get_pool_stats()
+        assert (stats['misses'], stats['hits']) == (1, 4), stats
+        assert BinanceClient(base_url=base_url).http is BinanceClient(base_url=base_url).http
+        print(f"✅ 5 requests over {stats['misses']} connection, hit rate {stats['hit_rate']:.0%}, one session per process")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Connection pool test failed: {e}")
+        return False
+
+def test_async_client():
+    """Test concurrent kline and depth fan-out against the exchange simulator"""
+    print("\n⚡ Testing async client...")
+    
+    try:
+        import asyncio
+        from exchange_simulator import ExchangeSimulator, synthesize_recording
+        from async_binance_client import AsyncBinanceClient
+        
+        symbols = [f"SIM{i}USDT" for i in range(6)]
+        simulator = ExchangeSimulator('replay', synthesize_recording(symbols, levels=20), latency=0.1)
+        
+        async def fan_out(base_url):
+            async with AsyncBinanceClient(base_url=base_url, max_in_flight=len(symbols)) as client:
+                start = time.perf_counter()
+                klines = await client.gather_klines(symbols, limit=50)
+                books = await client.gather_order_books(symbols, limit=20, arrays=True)
+                return klines, books, time.perf_counter() - start
+        
+        try:
+            klines, books, elapsed = asyncio.run(fan_out(simulator.start()))
+        finally:
+            simulator.stop()
+        
+        assert all(len(klines[symbol]) == 50 for symbol in symbols)
+        assert all(books[symbol]['bids'].shape == (20, 2) for symbol in symbols)
+        # Serially 12 requests at 100ms each would take 1.2s
+        assert elapsed < 0.6, elapsed
+        print(f"✅ {2 * len(symbols)} requests in {elapsed:.2f}s over two concurrent fan-outs")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Async client test failed: {e}")
+        return False
+
+def test_fast_json():
+    """Test NumPy-direct decoders against stdlib json, with and without orjson (offline)"""
+    print("\n🧾 Testing fast JSON decoding...")
+    
+    try:
+        import json
+        import numpy as np
+        import fast_json
+        
+        klines = [[i * 60000, "100.5", "101", "99.25", "100.75", "12.5", i * 60000 + 59999, "1259.4", 42, "6", "604.5", "0"]
+                  for i in range(3)]
+        depth = {'lastUpdateId': 77, 'bids': [["100.0", "1.5"], ["99.5", "2"]], 'asks': [["100.5", "0.25"]]}
+        tickers = [{'symbol': 'BTCUSDT', 'price': '50000.10'}, {'symbol': 'ETHUSDT', 'price': '3000.5'}]
+        
+        has_orjson = fast_json.HAS_ORJSON
+        try:
+            for fast_json.HAS_ORJSON in (has_orjson, False):
+                assert np.array_equal(fast_json.decode_klines(json.dumps(klines).encode()), np.array(klines, dtype=float))
+                book = fast_json.decode_depth(json.dumps(depth).encode())
+                assert book['lastUpdateId'] == 77 and book['bids'].tolist() == [[100.0, 1.5], [99.5, 2.0]]
+                assert book['asks'].shape == (1, 2) and fast_json.decode_depth(b'{"lastUpdateId":1,"bids":[],"asks":[]}')['bids'].shape == (0, 2)
+                symbols, prices = fast_json.decode_ticker_prices(json.dumps(tickers).encode())
+                assert symbols == ['BTCUSDT', 'ETHUSDT'] and prices.tolist() == [50000.1, 3000.5]
+                assert fast_json.loads(b'{"a": [1, 2]}') == {'a': [1, 2]}
+        finally:
+            fast_json.HAS_ORJSON = has_orjson
+        print(f"✅ Decoders match json (orjson available: {has_orjson}, stdlib fallback checked)")
+        
+        # Malformed payloads must fail loudly rather than come back short or shifted
+        malformed = [
+            json.dumps(klines).replace('"99.25"', '"n/a"').encode(),
+            json.dumps(klines)[:-30].encode(),
+            json.dumps([klines[0][:11]]).encode(),
+        ]
+        for raw in malformed:
+            try:
+                fast_json.decode_klines(raw)
+                raise AssertionError(f"decoded malformed klines {raw[-40:]!r}")
+            except ValueError:
+                pass
+        try:
+            fast_json.decode_depth(b'{"lastUpdateId":1,"bids":[["1.0","2"],["1.5"]],"asks":[]}')
+            raise AssertionError("decoded a depth level without a quantity")
+        except ValueError:
+            pass
+        print("✅ Malformed klines and depth raise ValueError")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Fast JSON test failed: {e}")
+        return False
+
+def test_symbol_index():
+    """Test symbol index lookups and quantizers (offline)"""
+    print("\n📐 Testing symbol index...")
+    
+    try:
+        from symbol_index import SymbolIndex
+        
+        exchange_info = {'symbols': [{
+            'symbol': 'BTCUSDT', 'status': 'TRADING', 'isSpotTradingAllowed': True,
+            'baseAsset': 'BTC', 'quoteAsset': 'USDT',
+            'filters': [
+                {'filterType': 'PRICE_FILTER', 'minPrice': '0.01', 'maxPrice': '1000000', 'tickSize': '0.01'},
+                {'filterType': 'LOT_SIZE', 'minQty': '0.00001', 'maxQty': '9000', 'stepSize': '0.00001'},
+                {'filterType': 'NOTIONAL', 'minNotional': '5.0'}
+            ]
+        }, {
+            'symbol': 'OLDUSDT', 'status': 'BREAK', 'isSpotTradingAllowed': True, 'filters': []
+        }]}
+        fetches = []
+        
+        def fetch():
+            fetches.append(1)
+            return exchange_info
+        
+        index = SymbolIndex(fetch, ttl=60)
+        rules = index.get('BTCUSDT')
+        assert rules.quantize_quantity(0.123456789) == 0.12345
+        assert rules.quantize_price(50000.129) == 50000.12
+        assert rules.meets_minimums(0.0002, 50000)
+        assert not rules.meets_minimums(0.00005, 50000)
+        assert index.tradeable_symbols('USDT') == ['BTCUSDT']
+        assert len(fetches) == 1
+        print("✅ Symbol index lookups and quantizers work without refetching")
+        
+        # A failed refresh keeps the stale rules and is not retried by every lookup
+        responses = [exchange_info, {'error': '429 Too Many Requests'}, exchange_info]
+        
+        def flaky_fetch():
+            fetches.append(1)
+            return responses.pop(0)
+        
+        fetches.clear()
+        index = SymbolIndex(flaky_fetch, ttl=0.1, retry_after=0.3)
+        stale = index.get('BTCUSDT')
+        time.sleep(0.15)
+        for _ in range(20):
+            assert index.get('BTCUSDT') is stale
+        assert index.tradeable_symbols('USDT') == ['BTCUSDT'] and len(fetches) == 2, len(fetches)
+        
+        # Once the retry window passes the next lookup downloads again
+        time.sleep(0.35)
+        assert index.get('BTCUSDT') is not stale and len(fetches) == 3
+        assert index.get('BTCUSDT') is not None and len(fetches) == 3
+        print("✅ Stale rules served through the retry window after a failed refresh")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Symbol index test failed: {e}")
+        return False
+
+def test_price_snapshot():
+    """Test that symbol rules and position prices come from cached bulk requests (simulator)"""
+    print("\n💲 Testing price snapshot...")
+    
+    try:
+        from exchange_simulator import ExchangeSimulator, synthesize_recording
+        from binance_client import BinanceClient
+        
+        symbols = [f"SIM{i}USDT" for i in range(5)]
+        simulator = ExchangeSimulator('replay', synthesize_recording(symbols))
+        try:
+            client = BinanceClient(base_url=simulator.start())
+            for symbol in symbols:
+                assert client.get_symbol_info(symbol)['symbol'] == symbol
+                assert client.symbol_index.quantize_quantity(symbol, 1.23456) == 1.234
+            snapshot = client.get_all_prices(max_age=60)
+            assert client.get_all_prices(max_age=60) is snapshot
+            bulk_requests = simulator.requests_served
+            assert all(snapshot.get(symbol) == client.get_ticker_price(symbol) for symbol in symbols)
+        finally:
+            simulator.stop()
+        
+        # One exchangeInfo and one ticker/price call, however many lookups
+        assert bulk_requests == 2, bulk_requests
+        assert 'MISSINGUSDT' not in snapshot and snapshot.get('MISSINGUSDT') is None
+        print(f"✅ {len(symbols)} symbols ruled and priced from {bulk_requests} requests")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Price snapshot test failed: {e}")
+        return False
+
+def test_ticker_snapshot():
+    """Test that every 24hr ranking reads one shared snapshot (simulator)"""
+    print("\n📊 Testing 24hr ticker snapshot...")
+    
+    try:
+        from exchange_simulator import ExchangeSimulator, synthesize_recording
+        from binance_client import BinanceClient
+        
+        symbols = [f"SIM{i}USDT" for i in range(40)]
+        simulator = ExchangeSimulator('replay', synthesize_recording(symbols, candles=2, levels=2, seed=6))
+        try:
+            base_url = simulator.start()
+            snapshot = BinanceClient(base_url=base_url).get_24hr_snapshot(max_age=60)
+            # A second client in the process reuses the same snapshot for every ranking
+            client = BinanceClient(base_url=base_url)
+            gainers = client.get_top_gainers(10)
+            leaders = client.get_volume_leaders(5)
+            assert client.get_24hr_snapshot(max_age=60) is snapshot
+            requests_served = simulator.requests_served
+        finally:
+            simulator.stop()
+        
+        assert requests_served == 1, requests_served
+        by_change = sorted((t for t in snapshot.tickers if float(t['priceChangePercent']) > 0),
+                           key=lambda t: -float(t['priceChangePercent']))
+        assert [t['symbol'] for t in gainers] == [t['symbol'] for t in by_change[:10]]
+        by_volume = sorted(snapshot.tickers, key=lambda t: -float(t['volume']))
+        assert [t['symbol'] for t in leaders] == [t['symbol'] for t in by_volume[:5]]
+        print(f"✅ Gainers and volume leaders ranked from {requests_served} download of {len(snapshot)} tickers")
+        
+        return True
+    except Exception as e:
+        print(f"❌ 24hr ticker snapshot test failed: {e}")
+        return False
+
+def test_rate_limiter():
+    """Test request weight budget and priorities (offline)"""
+    print("\n🚦 Testing rate limiter...")
+    
+    try:
+        from rate_limiter import RequestWeightLimiter, endpoint_weight, is_order_request, PRIORITY_ORDER, PRIORITY_SCAN
+        
+        assert endpoint_weight('GET', '/api/v3/ticker/24hr') == 80
+        assert endpoint_weight('GET', '/api/v3/ticker/24hr', {'symbol': 'BTCUSDT'}) == 2
+        assert endpoint_weight('GET', '/api/v3/depth', {'limit': 500}) == 25
+        assert is_order_request('DELETE', '/api/v3/orderList') and not is_order_request('GET', '/api/v3/order')
+        
+        limiter = RequestWeightLimiter(weight_per_minute=600, orders_per_10s=10, headroom=1.0)
+        start = time.monotonic()
+        
+        # Scanning stops at its reserve, orders may still use the rest
+        while limiter.weight_tokens - 10 >= limiter.reserve[PRIORITY_SCAN]:
+            limiter.acquire(10, PRIORITY_SCAN)
+        limiter.acquire(10, PRIORITY_ORDER, is_order=True)
+        assert time.monotonic() - start < 0.5
+        print("✅ Order placement bypasses the scan reserve")
+        
+        limiter.update_from_headers({'X-MBX-USED-WEIGHT-1M': '600'})
+        assert limiter.get_status()['weight_tokens'] < 10
+        print("✅ Used-weight headers tighten the bucket")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Rate limiter test failed: {e}")
+        return False
+
+def test_market_stream_replay():
+    """Test WebSocket ingestion against the local replay server"""
+    print("\n📡 Testing market stream replay...")
+    
+    try:
+        import json
+        import numpy as np
+        from stream_replay import ReplayServer
+        from market_stream import MarketDataStream
+        from candle_store import CandleStore
+        
+        frames = []
+        for i in range(20):
+            kline = {'t': i * 60000, 'T': i * 60000 + 59999, 's': 'BTCUSDT', 'i': '1m', 'o': '100', 'c': str(100 + i),
+                     'h': '120', 'l': '90', 'v': '5', 'n': 10, 'x': True, 'q': '500', 'V': '2', 'Q': '200'}
+            frames.append({'t': i * 0.001, 'frame': json.dumps({'stream': 'btcusdt@kline_1m', 'data': {'e': 'kline', 's': 'BTCUSDT', 'k': kline}})})
+        frames.append({'t': 0.02, 'frame': json.dumps({'stream': 'btcusdt@bookTicker', 'data': {'u': 1, 's': 'BTCUSDT', 'b': '118.9', 'B': '1', 'a': '119.1', 'A': '2'}})})
+        
+        server = ReplayServer(frames, speed=1.0)
+        stream = MarketDataStream(['BTCUSDT'], ws_url=server.start())
+        # Streamed candles extend history the store already holds from REST
+        store = CandleStore(capacity=50)
+        seed = np.zeros((1, 12))
+        seed[0, 4] = 100.0
+        store._buffer('BTCUSDT', '1m').reset(seed)
+        store.attach(stream)
+        stream.start()
+        
+        deadline = time.time() + 5
+        while stream.messages < len(frames) and time.time() < deadline:
+            time.sleep(0.05)
+        stream.stop()
+        server.stop()
+        
+        klines = store.view('BTCUSDT', '1m', 10)
+        assert klines is not None and klines[-1, 4] == 119.0 and list(klines[:, 0]) == [i * 60000 for i in range(10, 20)]
+        assert stream.get_book_ticker('BTCUSDT')['ask'] == 119.1
+        print(f"✅ Replayed {stream.messages} frames into the market stream")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Market stream replay test failed: {e}")
+        return False
+
+def test_book_metrics():
+    """Test batched order book metrics against per-book results and pandas (offline)"""
+    print("\n🐋 Testing batched book metrics...")
+    
+    try:
+        import numpy as np
+        import pandas as pd
+        from orderbook_analytics import analyze_books, analyze_book, LARGE_ORDER_QUANTILE
+        
+        rng = np.random.default_rng(5)
+        
+        def side(start, step, depth):
+            return [[str(start + step * i), str(q)] for i, q in enumerate(rng.uniform(0.1, 50, depth).round(3))]
+        
+        books = {
+            'DEEPUSDT': {'bids': side(99.9, -0.1, 100), 'asks': side(100.1, 0.1, 100)},
+            'THINUSDT': {'bids': side(9.9, -0.1, 3), 'asks': side(10.1, 0.1, 7)},
+            'BIDSUSDT': {'bids': side(4.9, -0.1, 5), 'asks': []},
+            'ASKSUSDT': {'bids': [], 'asks': side(2.1, 0.1, 4)},
+            'EMPTYUSDT': {'bids': [], 'asks': []},
+            'FAILUSDT': {'error': 'timeout'}
+        }
+        batch = analyze_books(books)
+        assert 'FAILUSDT' not in batch and len(batch) == 5
+        
+        # Padding a book to the deepest one in the batch must not change its numbers
+        for symbol, order_book in books.items():
+            if symbol == 'FAILUSDT':
+                continue
+            single = analyze_book(order_book)
+            batched = batch.row(symbol)
+            assert single.keys() == batched.keys()
+            for name, value in single.items():
+                if value is None or batched[name] is None:
+                    assert value is None and batched[name] is None, (symbol, name)
+                else:
+                    assert abs(value - batched[name]) < 1e-12 * max(1.0, abs(value)), (symbol, name)
+        
+        # One-sided and empty books measure what they have and leave the rest undefined
+        bids_only = batch.row('BIDSUSDT')
+        assert bids_only['imbalance'] == 1.0 and bids_only['large_asks'] == 0 and bids_only['mid_price'] is None
+        assert batch.row('ASKSUSDT')['imbalance'] == -1.0
+        empty = batch.row('EMPTYUSDT')
+        assert empty['imbalance'] == 0.0 and empty['large_bids'] == 0 and empty['pressure'] == 0.0
+        
+        # The deep book against the pandas formulation the batch replaced
+        bids = pd.DataFrame(books['DEEPUSDT']['bids'], columns=['price', 'quantity'], dtype=float)
+        asks = pd.DataFrame(books['DEEPUSDT']['asks'], columns=['price', 'quantity'], dtype=float)
+        deep = batch.row('DEEPUSDT')
+        bid_total, ask_total = bids['quantity'].sum(), asks['quantity'].sum()
+        assert abs(deep['imbalance'] - (bid_total - ask_total) / (bid_total + ask_total)) < 1e-12
+        assert deep['large_bids'] == (bids['quantity'] > bids['quantity'].quantile(LARGE_ORDER_QUANTILE)).sum()
+        assert deep['large_asks'] == (asks['quantity'] > asks['quantity'].quantile(LARGE_ORDER_QUANTILE)).sum()
+        assert abs(deep['mid_price'] - (bids['price'].max() + asks['price'].min()) / 2) < 1e-12
+        print(f"✅ {len(batch)} books match their per-book metrics, including one-sided and empty books")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Batched book metrics test failed: {e}")
+        return False
+
+def test_local_order_book():
+    """Test depth diff sequencing and gap detection (offline)"""
+    print("\n📚 Testing local order book...")
+    
+    try:
+        from order_book import LocalOrderBook
+        
+        book = LocalOrderBook('BTCUSDT')
+        book.apply_diff({'U': 8, 'u': 9, 'b': [], 'a': []})  # Buffered, older than snapshot
+        book.apply_diff({'U': 10, 'u': 12, 'b': [['99.5', '4']], 'a': [['100.5', '0']]})
+        assert book.load_snapshot({
+            'lastUpdateId': 10,
+            'bids': [['99.5', '1'], ['99.0', '2']],
+            'asks': [['100.5', '3'], ['101.0', '1']]
+        })
+        assert book.bids.best() == (99.5, 4.0) and book.asks.best() == (101.0, 1.0)
+        print("✅ Buffered diffs replayed over the snapshot")
+        
+        assert book.apply_diff({'U': 13, 'u': 13, 'b': [['99.8', '1']], 'a': []})
+        assert book.bids.best() == (99.8, 1.0)
+        assert not book.apply_diff({'U': 20, 'u': 21, 'b': [], 'a': []})
+        assert not book.synced
+        print("✅ Sequence gap forces a resync")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Local order book test failed: {e}")
+        return False
+
+def test_order_book_manager():
+    """Test snapshot seeding and gap resyncs of local books against the exchange simulator"""
+    print("\n📗 Testing order book manager...")
+    
+    try:
+        import json
+        from exchange_simulator import ExchangeSimulator, synthesize_recording
+        from binance_client import BinanceClient
+        from order_book import OrderBookManager
+        
+        recording = synthesize_recording(['BTCUSDT'], candles=2, levels=10)
+        depth = json.loads(recording.by_path[('GET', '/api/v3/depth')][0]['body'])
+        snapshot_id = depth['lastUpdateId']
+        best_bid = float(depth['bids'][0][0])
+        # The exchange has moved on by the time a resync asks again
+        recording.add({'method': 'GET', 'path': '/api/v3/depth', 'status': 200, 'params': {'symbol': 'BTCUSDT', 'limit': '10'},
+                       'body': json.dumps(dict(depth, lastUpdateId=snapshot_id + 20))})
+        
+        simulator = ExchangeSimulator('replay', recording)
+        manager = OrderBookManager(BinanceClient(base_url=simulator.start()))
+        
+        def wait_synced():
+            deadline = time.time() + 5
+            while manager.get_book('BTCUSDT') is None and time.time() < deadline:
+                time.sleep(0.01)
+            return manager.get_book('BTCUSDT')
+        
+        try:
+            # The first diff is buffered while the snapshot loads, then replayed over it
+            manager.apply_event('BTCUSDT', {'U': snapshot_id - 1, 'u': snapshot_id + 1,
+                                            'b': [[str(best_bid + 0.5), '3']], 'a': []})
+            book = wait_synced()
+            assert book is not None and book.bids.best() == (best_bid + 0.5, 3.0)
+            assert book.last_update_id == snapshot_id + 1
+            
+            manager.apply_event('BTCUSDT', {'U': snapshot_id + 2, 'u': snapshot_id + 2,
+                                            'b': [[str(best_bid + 0.5), '0']], 'a': []})
+            assert book.bids.best()[0] == best_bid
+            
+            # A skipped update id drops the book until a fresh snapshot arrives
+            manager.apply_event('BTCUSDT', {'U': snapshot_id + 9, 'u': snapshot_id + 9, 'b': [], 'a': []})
+            assert manager.get_book('BTCUSDT') is None
+            assert wait_synced().last_update_id == snapshot_id + 20
+        finally:
+            simulator.stop()
+        
+        stats = manager.get_stats()
+        assert (stats['resyncs'], stats['gaps'], stats['synced']) == (2, 1, 1), stats
+        assert simulator.requests_served == 2
+        print(f"✅ {stats['resyncs']} snapshots: one to seed, one after a sequence gap")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Order book manager test failed: {e}")
+        return False
+
+def test_exchange_simulator():
+    """Test that a recorded session replays offline with the same answers"""
+    print("\n🎞️ Testing exchange simulator...")
+    
+    try:
+        import tempfile
+        from exchange_simulator import ExchangeSimulator, Recording, synthesize_recording
+        from binance_client import BinanceClient
+        
+        path = os.path.join(tempfile.mkdtemp(), 'session.jsonl')
+        upstream = ExchangeSimulator('replay', synthesize_recording(['BTCUSDT'], levels=20))
+        recorder = ExchangeSimulator('record', record_path=path, upstream=upstream.start())
+        try:
+            client = BinanceClient(base_url=recorder.start())
+            live_klines = client.get_klines('BTCUSDT', limit=100)
+            live_book = client.get_order_book('BTCUSDT', limit=20)
+        finally:
+            recorder.stop()
+            upstream.stop()
+        
+        replay = ExchangeSimulator('replay', Recording.load(path))
+        try:
+            client = BinanceClient(base_url=replay.start())
+            assert client.get_klines('BTCUSDT', limit=100) == live_klines
+            assert client.get_order_book('BTCUSDT', limit=20) == live_book
+            # Near misses are adapted from the recording instead of failing
+            start_time = live_klines[90][0]
+            open_times = client.get_klines_array('BTCUSDT', limit=5, start_time=start_time)[:, 0]
+            assert list(open_times) == [row[0] for row in live_klines[90:95]]
+            assert 'error' in client.get_24hr_ticker('ETHUSDT')
+        finally:
+            replay.stop()
+        
+        assert len(Recording.load(path).entries) == 2 and replay.misses == 1
+        print(f"✅ Recorded {len(Recording.load(path).entries)} responses and replayed them offline")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Exchange simulator test failed: {e}")
+        return False
+
+def test_market_data_hub():
+    """Test single-flight loads, shared failures, TTL expiry and the shared stream (simulator)"""
+    print("\n🛰️ Testing market data hub...")
+    
+    try:
+        import asyncio
+        from exchange_simulator import ExchangeSimulator, synthesize_recording
+        from async_binance_client import AsyncBinanceClient, get_background_loop
+        from binance_client import BinanceClient
+        from candle_store import CandleStore
+        from market_data_hub import MarketDataHub, get_market_data_hub
+        from market_stream import MarketDataStream
+        from whale_trap_strategy import WhaleTrapStrategy
+        from config import Config
+        
+        symbols = ['AAAUSDT', 'BBBUSDT', 'CCCUSDT']
+        simulator = ExchangeSimulator('replay', synthesize_recording(symbols, levels=5), latency=0.05)
+        try:
+            base_url = simulator.start()
+            async_client = AsyncBinanceClient(base_url=base_url)
+            hub = MarketDataHub(BinanceClient(base_url=base_url), CandleStore(async_client), async_client)
+            
+            # Two strategies asking for the same books and candles at once cost one request per key
+            async def two_strategies():
+                return await asyncio.gather(hub.get_order_books_async(symbols, 5), hub.get_order_books_async(symbols, 5),
+                                            hub.refresh_klines_async(symbols), hub.refresh_klines_async(symbols))
+            
+            first, second, _, _ = get_background_loop().run(two_strategies())
+            assert simulator.requests_served == 2 * len(symbols), simulator.requests_served
+            assert all(first[symbol] is second[symbol] for symbol in symbols)
+            assert (hub.loads, hub.joined) == (2 * len(symbols), 2 * len(symbols)), hub.get_stats()
+            print(f"✅ {hub.loads + hub.joined} concurrent requests served by {simulator.requests_served} fetches")
+            
+            # Within the TTL a book comes from the cache; once it expires it is fetched again
+            hub.ttls['depth'] = 0.2
+            served = simulator.requests_served
+            cached = hub.get_order_book('AAAUSDT', 5)
+            assert cached is first['AAAUSDT'] and simulator.requests_served == served
+            time.sleep(0.25)
+            refreshed = hub.get_order_book('AAAUSDT', 5)
+            assert refreshed is not cached and simulator.requests_served == served + 1
+            print("✅ Cached book served within its TTL and fetched again after it")
+            
+            # A failed load reaches every caller waiting on it, and the next call tries again
+            calls = []
+            
+            async def failing_fetch():
+                calls.append(1)
+                await asyncio.sleep(0.05)
+                raise ConnectionError('exchange unreachable')
+            
+            async def waiters():
+                return await asyncio.gather(*(hub._load('failing', 60, failing_fetch) for _ in range(3)),
+                                            return_exceptions=True)
+            
+            errors = get_background_loop().run(waiters())
+            assert len(calls) == 1 and all(isinstance(error, ConnectionError) for error in errors), errors
+            get_background_loop().run(waiters())
+            assert len(calls) == 2 and 'failing' not in hub._cache and not hub._flights
+            print("✅ One failed fetch raised in all 3 waiters and was not cached")
+        finally:
+            get_background_loop().run(async_client.close())
+            simulator.stop()
+        
+        # Strategies share the hub's one market stream, subscribed to the union of their universes
+        enabled = Config.MARKET_STREAM_ENABLED
+        Config.MARKET_STREAM_ENABLED = True
+        try:
+            hub.market_stream = MarketDataStream([])  # Not started, so no socket is opened
+            whale, other = WhaleTrapStrategy(), WhaleTrapStrategy()
+            whale.hub = other.hub = hub
+            whale.start_market_stream(['AAAUSDT', 'BBBUSDT'])
+            other.start_market_stream(['BBBUSDT', 'CCCUSDT'])
+            assert whale.market_stream is other.market_stream is hub.market_stream
+            assert hub.market_stream._symbols == symbols, hub.market_stream._symbols
+            whale.start_market_stream(['AAAUSDT'])
+            assert hub.market_stream._symbols == ['AAAUSDT', 'BBBUSDT', 'CCCUSDT']
+            other.start_market_stream(['CCCUSDT'])
+            assert hub.market_stream._symbols == ['AAAUSDT', 'CCCUSDT'], hub.market_stream._symbols
+            
+            # A stopped strategy leaves the stream; the last one out stops it
+            whale.stop()
+            assert hub.market_stream._symbols == ['CCCUSDT'], hub.market_stream._symbols
+            other.stop()
+            assert hub.market_stream is None and not hub.candle_store.streaming
+        finally:
+            Config.MARKET_STREAM_ENABLED = enabled
+        print("✅ Two strategies share one market stream over the union of their symbols")
+        
+        # Both web apps analyze through one strategy backed by the shared hub
+        import app, app_with_auth
+        from whale_trap_strategy import get_analysis_strategy
+        assert app.get_analysis_strategy is app_with_auth.get_analysis_strategy
+        assert get_analysis_strategy() is get_analysis_strategy()
+        assert get_analysis_strategy().hub is get_market_data_hub()
+        print("✅ Both web apps reuse one hub-backed analysis strategy")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Market data hub test failed: {e}")
+        return False
+
+def test_candle_store():
+    """Test candle ring buffer merging and wrap-around (offline)"""
+    print("\n🕯️ Testing candle store...")
+    
+    try:
+        import numpy as np
+        from candle_store import CandleBuffer
+        
+        def candle(minute, close):
+            return [minute * 60000, close, close, close, close, 1, minute * 60000 + 59999, close, 1, 0, 0, 0]
+        
+        buffer = CandleBuffer(capacity=5)
+        buffer.merge(np.array([candle(m, 100 + m) for m in range(4)], dtype=float))
+        window = buffer.view(3)
+        buffer.merge(np.array([candle(3, 200), candle(4, 104), candle(5, 105)], dtype=float))
+        
+        assert len(buffer) == 5 and buffer.count == 6
+        assert list(buffer.view(5)[:, 4]) == [101, 102, 200, 104, 105]
+        assert list(window[:, 4]) == [101, 102, 200]  # Open candle replaced in place, history untouched
+        assert not buffer.view(2).flags.writeable and buffer.view(6) is None
+        print("✅ Open candle replaced and newest candles stay contiguous after wrap-around")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Candle store test failed: {e}")
+        return False
+
+def test_indicator_engine():
+    """Test vectorized indicators against the ta library (offline)"""
+    print("\n📐 Testing indicator engine...")
+    
+    try:
+        import numpy as np
+        import pandas as pd
+        import ta
+        from indicator_engine import IndicatorEngine
+        
+        rng = np.random.default_rng(3)
+        klines = np.zeros((3, 100, 12))
+        klines[:, :, 4] = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (3, 100)), axis=1))
+        klines[:, :, 2] = klines[:, :, 4] * 1.005
+        klines[:, :, 3] = klines[:, :, 4] * 0.995
+        klines[:, :, 5] = rng.uniform(1, 100, (3, 100))
+        
+        snapshot = IndicatorEngine().compute({'AUSDT': klines[0], 'BUSDT': klines[1], 'CUSDT': klines[2], 'DUSDT': None})
+        assert len(snapshot) == 3 and 'DUSDT' not in snapshot
+        
+        close = pd.Series(klines[2, :, 4])
+        row = snapshot.row('CUSDT')
+        expected = {
+            'rsi': ta.momentum.rsi(close, window=14).iloc[-1],
+            'macd': ta.trend.macd_diff(close).iloc[-1],
+            'price_ema': ta.trend.ema_indicator(close, window=12).iloc[-1],
+            'bb_upper': ta.volatility.bollinger_hband(close).iloc[-1],
+            'atr': ta.volatility.average_true_range(pd.Series(klines[2, :, 2]), pd.Series(klines[2, :, 3]), close).iloc[-1],
+        }
+        for name, value in expected.items():
+            assert abs(row[name] - value) < 1e-9 * max(1.0, abs(value)), name
+        print("✅ RSI, MACD, EMA, Bollinger and ATR match ta for every symbol in one pass")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Indicator engine test failed: {e}")
+        return False
+
+def test_analysis_pool():
+    """Test sharded indicator passes in worker processes against the in-process engine (offline)"""
+    print("\n🧮 Testing analysis pool...")
+    
+    pool = None
+    try:
+        import numpy as np
+        from indicator_engine import IndicatorEngine, INDICATORS
+        from analysis_pool import AnalysisPool, ProcessIndicatorEngine
+        
+        rng = np.random.default_rng(11)
+        
+        def universe(count):
+            klines = np.zeros((count, 100, 12))
+            klines[:, :, 4] = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (count, 100)), axis=1))
+            klines[:, :, 2] = klines[:, :, 4] * 1.005
+            klines[:, :, 3] = klines[:, :, 4] * 0.995
+            klines[:, :, 5] = rng.uniform(1, 100, (count, 100))
+            return {f"SIM{i}USDT": klines[i] for i in range(count)}
+        
+        def matches(snapshot, expected):
+            assert snapshot.symbols == expected.symbols
+            for name in INDICATORS:
+                assert np.allclose(snapshot[name], expected[name], rtol=1e-12, equal_nan=True), name
+        
+        pool = AnalysisPool(processes=2)
+        engine = ProcessIndicatorEngine(pool=pool, min_symbols=1)
+        
+        # Shared-memory path: both workers score a shard of the same block
+        small = universe(6)
+        matches(engine.compute(small), IndicatorEngine().compute(small))
+        first_block = pool.block.size
+        assert pool.passes == 1 and pool.shards == 2, pool.get_stats()
+        
+        # A larger universe outgrows the block, which is replaced rather than overrun
+        large = universe(40)
+        matches(engine.compute(large), IndicatorEngine().compute(large))
+        assert pool.block.size > first_block, (first_block, pool.block.size)
+        
+        # A dead worker breaks the pass; the engine scores in-process and the pool restarts
+        for process in list(pool._executor._processes.values()):
+            process.kill()
+            process.join()
+        matches(engine.compute(small), IndicatorEngine().compute(small))
+        assert pool.failures == 1 and pool._executor is None, pool.get_stats()
+        matches(engine.compute(small), IndicatorEngine().compute(small))
+        assert pool.passes == 3, pool.get_stats()
+        print(f"✅ Worker shards match the in-process engine; block grew to {pool.block.size} bytes and a dead worker fell back in-process")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Analysis pool test failed: {e}")
+        return False
+    finally:
+        if pool is not None:
+            pool.close()
+
+def test_incremental_indicators():
+    """Test O(1) incremental indicators against the ta library, including amended candles (offline)"""
+    print("\n🧮 Testing incremental indicators...")
+    
+    try:
+        import numpy as np
+        import pandas as pd
+        import ta
+        from incremental_indicators import CandleIndicators
+        
+        rng = np.random.default_rng(2)
+        close = 30000 * np.exp(np.cumsum(rng.normal(0, 0.002, 240)))
+        high, low = close * 1.002, close * 0.998
+        volume = rng.uniform(1, 100, 240)
+        
+        indicators = CandleIndicators()
+        for i in range(240):
+            # Every candle is first seen while forming, then amended to its final values
+            indicators.update_candle(i, high[i] * 1.01, low[i] * 0.99, close[i] * 1.003, volume[i] * 2)
+            indicators.update_candle(i, high[i], low[i], close[i], volume[i])
+        
+        series = pd.Series(close)
+        expected = {
+            'rsi': ta.momentum.rsi(series, window=14).iloc[-1],
+            'macd': ta.trend.macd_diff(series).iloc[-1],
+            'price_ema': ta.trend.ema_indicator(series, window=12).iloc[-1],
+            'price_sma': ta.trend.sma_indicator(series, window=20).iloc[-1],
+            'bb_upper': ta.volatility.bollinger_hband(series).iloc[-1],
+            'bb_middle': ta.volatility.bollinger_mavg(series).iloc[-1],
+            'bb_lower': ta.volatility.bollinger_lband(series).iloc[-1],
+            'atr': ta.volatility.average_true_range(pd.Series(high), pd.Series(low), series).iloc[-1],
+            'volume_sma': pd.Series(volume).rolling(20).mean().iloc[-1],
+        }
+        values = indicators.values()
+        for name, value in expected.items():
+            assert abs(values[name] - value) < 1e-9 * max(1.0, abs(value)), (name, values[name], value)
+        print("✅ RSI, MACD, EMA, SMA, Bollinger and ATR match ta after amended candles")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Incremental indicators test failed: {e}")
+        return False
+
+def test_screener():
+    """Test the first-stage screening funnel over 24hr ticker snapshots (offline)"""
+    print("\n🔎 Testing screener...")
+    
+    try:
+        from market_snapshot import Ticker24hSnapshot
+        from screener import Screener
+        
+        def ticker(symbol, price, quote_volume, spread=0.0001):
+            return {'symbol': symbol, 'lastPrice': str(price), 'priceChangePercent': '0', 'quoteVolume': str(quote_volume),
+                    'bidPrice': str(price * (1 - spread / 2)), 'askPrice': str(price * (1 + spread / 2))}
+        
+        before = Ticker24hSnapshot([ticker('MOVEUSDT', 100, 1e6), ticker('DEADUSDT', 100, 1e6),
+                                    ticker('WIDEUSDT', 100, 1e6), ticker('THINUSDT', 100, 10)], timestamp=1000)
+        after = Ticker24hSnapshot([ticker('MOVEUSDT', 101, 1e6 + 5e3), ticker('DEADUSDT', 100, 1e6),
+                                   ticker('WIDEUSDT', 103, 1e6, spread=0.01), ticker('THINUSDT', 103, 20)], timestamp=1060)
+        
+        screener = Screener(top_k=10)
+        universe = ['MOVEUSDT', 'DEADUSDT', 'WIDEUSDT', 'THINUSDT', 'NEWUSDT']
+        screener.screen(before, universe, weight_per_symbol=7)
+        selected = screener.screen(after, universe, weight_per_symbol=7)
+        
+        assert selected == ['MOVEUSDT'], selected
+        funnel = screener.last_funnel
+        assert (funnel['listed'], funnel['liquid'], funnel['selected'], funnel['weight_saved']) == (4, 2, 1, 28)
+        print(f"✅ Funnel {funnel['universe']} → {funnel['liquid']} liquid → {funnel['selected']} selected")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Screener test failed: {e}")
+        return False
+
+def test_scan_scheduler():
+    """Test revisit interval clamps, reject cooldowns and cycle overrun accounting (offline)"""
+    print("\n⏱️ Testing scan scheduler...")
+    
+    try:
+        from scan_scheduler import ScanScheduler
+        
+        scheduler = ScanScheduler(period=0.1, min_interval=1.0, max_interval=60.0, reject_cooldown=120.0,
+                                  deadline_fraction=0.5)
+        
+        # Quiet symbols sit at the max interval, wild or held ones at the min, everything else in between
+        assert scheduler.interval_for() == 60.0
+        assert scheduler.interval_for(volatility=float('nan'), volume_ratio=float('nan')) == 60.0
+        assert scheduler.interval_for(volatility=1000.0) == 1.0
+        assert scheduler.interval_for(held=True) == 1.0
+        assert 1.0 < scheduler.interval_for(volatility=0.2) < 60.0
+        
+        # A rejected signal rests for the cooldown even if it moves fast, unless we hold it
+        assert scheduler.schedule('HOTUSDT', volatility=1000.0, rejected=True) == 120.0
+        assert scheduler.schedule('HELDUSDT', rejected=True, held=True) == 1.0
+        assert scheduler.select(['HOTUSDT', 'HELDUSDT', 'NEWUSDT']) == ['NEWUSDT']
+        scheduler.wake('HOTUSDT')
+        assert scheduler.select(['HOTUSDT', 'HELDUSDT']) == ['HOTUSDT']
+        
+        # Only the cycle that outlives its deadline counts as an overrun
+        scheduler.begin_cycle()
+        scheduler.end_cycle()
+        scheduler.begin_cycle()
+        time.sleep(0.08)
+        scheduler.end_cycle()
+        
+        # A cycle that ran past several ticks skips them instead of running back to back
+        time.sleep(0.25)
+        start = time.monotonic()
+        scheduler.wait_next()
+        waited = time.monotonic() - start
+        
+        stats = scheduler.get_stats()
+        assert stats['cycles'] == 2 and stats['overruns'] == 1, stats
+        assert 0.01 < stats['overrun_time'] < 0.1, stats
+        assert stats['cooldowns'] == 1 and stats['visits'] == 2 and stats['deferred'] == 3, stats
+        assert stats['skipped_ticks'] >= 2 and waited < 0.1, (stats, waited)
+        print(f"✅ Intervals clamped to [1, 60]s, cooldown held, {stats['overruns']} overrun and {stats['skipped_ticks']} skipped ticks recorded")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Scan scheduler test failed: {e}")
+        return False
+
+def test_strategy_engine():
+    """Test event dispatch to strategy handlers from stream callbacks (offline)"""
+    print("\n🧭 Testing strategy engine...")
+    
+    try:
+        import numpy as np
+        from candle_store import CandleStore
+        from strategy_engine import EventStrategy, StrategyEngine
+        
+        # A seeded, streaming store answers from memory without REST
+        store = CandleStore(capacity=120)
+        rows = np.zeros((100, 12))
+        rows[:, 0] = np.arange(100) * 60000
+        rows[:, 4] = 100 + np.arange(100)
+        store._buffer('TESTUSDT', '1m').reset(rows)
+        store.streaming = True
+        
+        class Recorder(EventStrategy):
+            def __init__(self):
+                self.calls = []
+            
+            def on_candle_close(self, symbol, bars):
+                self.calls.append(('candle', symbol, len(bars), int(bars[-1, 0])))
+            
+            def on_book_update(self, symbol, book):
+                self.calls.append(('book', symbol, book))
+            
+            def on_fill(self, order):
+                self.calls.append(('fill', order['symbol'], order['quantity']))
+        
+        recorder = Recorder()
+        engine = StrategyEngine(store, interval='1m', history=50)
+        engine.register(recorder)
+        
+        closed = {'k': {'t': 99 * 60000, 'i': '1m', 'x': True}}
+        engine.on_stream_event('kline', 'TESTUSDT', closed)
+        engine.on_stream_event('kline', 'TESTUSDT', {'k': {'t': 99 * 60000, 'i': '1m', 'x': False}})
+        engine.publish('book', 'TESTUSDT', 'first')
+        engine.publish('book', 'TESTUSDT', 'latest')
+        fill = {'s': 'TESTUSDT', 'i': 1, 'S': 'SELL', 'o': 'LIMIT', 'X': 'FILLED', 'x': 'TRADE',
+                'L': '101.0', 'l': '0.5', 'z': '0.5'}
+        engine.on_user_event('executionReport', fill)
+        engine.on_user_event('executionReport', dict(fill, x='NEW'))
+        
+        assert engine.run_pending() == 3
+        assert recorder.calls == [('candle', 'TESTUSDT', 50, 99 * 60000), ('book', 'TESTUSDT', 'latest'),
+                                  ('fill', 'TESTUSDT', 0.5)], recorder.calls
+        
+        # The next candle opens before the close is dispatched; the bars still end at the closed one
+        engine.on_stream_event('kline', 'TESTUSDT', {'k': {'t': 100 * 60000, 'i': '1m', 'x': True}})
+        newer = np.zeros((2, 12))
+        newer[:, 0] = [100 * 60000, 101 * 60000]
+        newer[:, 4] = [200, 201]
+        store._buffer('TESTUSDT', '1m').merge(newer)
+        assert engine.run_pending() == 1
+        assert recorder.calls[-1] == ('candle', 'TESTUSDT', 50, 100 * 60000), recorder.calls[-1]
+        stats = engine.get_stats()
+        assert (stats['received'], stats['coalesced'], stats['dispatched']) == (5, 1, 4), stats
+        print(f"✅ {stats['received']} events → {stats['dispatched']} dispatched, {stats['coalesced']} coalesced")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Strategy engine test failed: {e}")
+        return False
+
+def test_position_monitor():
+    """Test exit triggers and the position monitor thread against stand-in prices (offline)"""
+    print("\n🛑 Testing position monitor...")
+    
+    try:
+        import threading
+        from trigger_index import TriggerIndex
+        from position_monitor import PositionMonitor
+        
+        class Prices:
+            def __init__(self):
+                self.prices = {'AUSDT': 100.0, 'BUSDT': 50.0, 'CUSDT': 10.0}
+            
+            def get_all_prices(self, max_age=0, priority=None):
+                return dict(self.prices)
+        
+        triggers = TriggerIndex()
+        triggers.add('AUSDT', 'AUSDT', stop_loss=99.5, take_profit=100.5)
+        triggers.add('BUSDT', 'BUSDT', stop_loss=49.0, take_profit=None)
+        triggers.add('CUSDT', 'CUSDT', deadline=time.time() - 1)
+        assert triggers.check('AUSDT', 100.0, now=0) == []
+        assert triggers.check('AUSDT', 100.6, now=0) == [('AUSDT', 'take_profit')]
+        
+        exits = []
+        failing = set()
+        exited = threading.Event()
+        
+        def on_trigger(key, reason, price):
+            # A refused cancel or sell leaves the position open
+            if key in failing:
+                return False
+            exits.append((key, reason, price))
+            triggers.remove(key)
+            exited.set()
+            return True
+        
+        prices = Prices()
+        monitor = PositionMonitor(triggers, on_trigger, prices, threading.RLock(), interval=60, latency_budget=1.0,
+                                  retry_backoff=0.2)
+        
+        # The time exit fires from the bulk snapshot on the first poll
+        monitor.poll()
+        assert monitor.run_exits() == 1 and exits == [('CUSDT', 'time_exit', 10.0)], exits
+        
+        # A streamed bid through the stop wakes the running monitor without waiting for the next poll
+        monitor.start()
+        exited.clear()
+        monitor.on_stream_event('bookTicker', 'BUSDT', {'b': '48.9', 'a': '49.1'})
+        assert exited.wait(2.0), "stream trigger not handled"
+        monitor.stop()
+        assert exits[-1] == ('BUSDT', 'stop_loss', 48.9), exits
+        
+        # A failed exit is not counted, and its trigger sits out the backoff instead of firing every tick
+        triggers.add('DUSDT', 'DUSDT', stop_loss=20.0)
+        prices.prices['DUSDT'] = 19.5
+        failing.add('DUSDT')
+        monitor.poll()
+        assert monitor.run_exits() == 1 and monitor.exits == 2 and monitor.failed_exits == 1
+        monitor.poll()
+        monitor.on_stream_event('bookTicker', 'DUSDT', {'b': '19.4', 'a': '19.6'})
+        assert monitor.run_exits() == 0 and 'DUSDT' in triggers
+        
+        # Once the backoff has passed the exit is retried and counted
+        time.sleep(0.25)
+        failing.clear()
+        monitor.poll()
+        assert monitor.run_exits() == 1 and exits[-1] == ('DUSDT', 'stop_loss', 19.5), exits
+        
+        stats = monitor.get_stats()
+        assert stats['exits'] == 3 and stats['failed_exits'] == 1 and stats['retrying'] == 0, stats
+        assert stats['over_budget'] == 0 and len(triggers) == 1
+        print(f"✅ {stats['exits']} exits, {stats['failed_exits']} failed and retried, detection to order max {stats['latency_max_ms']}ms")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Position monitor test failed: {e}")
+        return False
+
+def test_exit_orders():
+    """Test the exchange-side exit lifecycle against the exchange simulator"""
+    print("\n🎯 Testing exchange exit orders...")
+    
+    try:
+        from exchange_simulator import ExchangeSimulator, synthesize_recording
+        from binance_client import BinanceClient
+        from exit_orders import ExitOrderManager
+        from whale_trap_strategy import WhaleTrapStrategy
+        
+        symbols = ['AAAUSDT', 'BBBUSDT', 'CCCUSDT']
+        simulator = ExchangeSimulator('replay', synthesize_recording(symbols))
+        try:
+            client = BinanceClient(base_url=simulator.start())
+            manager = ExitOrderManager(client)
+            exits = {}
+            for symbol in symbols:
+                price = client.get_ticker_price(symbol)
+                entry = client.place_market_order(symbol, 'BUY', 1.5)
+                exits[symbol] = manager.attach(symbol, 1.5, price * 0.99, price * 1.01, entry_order=entry)
+            
+            # 1.5 bought less 0.1% commission in the base asset, floored to the 0.001 step
+            assert all(exit_order.is_oco and exit_order.quantity == 1.498 for exit_order in exits.values())
+            oco = simulator._order_lists[exits['AAAUSDT'].order_list_id]
+            assert {simulator._orders[leg['orderId']]['origQty'] for leg in oco['orders']} == {'1.498'}
+            print("✅ OCO attached for the quantity held after commission")
+            
+            # Take profit fills on the exchange
+            simulator.fill_order(exits['AAAUSDT'].take_profit_order_id)
+            fills, dropped = manager.sync(force=True)
+            assert [(fill['symbol'], fill['reason']) for fill in fills] == [('AAAUSDT', 'take_profit')] and dropped == []
+            assert abs(fills[0]['price'] - exits['AAAUSDT'].take_profit) < 1e-9 and not manager.has('AAAUSDT')
+            print("✅ Filled leg found and booked by sync")
+            
+            # A manual close cancels the resting pair first
+            assert manager.cancel('BBBUSDT') and not manager.has('BBBUSDT')
+            assert simulator._order_lists[exits['BBBUSDT'].order_list_id]['listOrderStatus'] == 'ALL_DONE'
+            print("✅ Cancel before a manual close releases the OCO")
+            
+            # While the OCO rests, the strategy leaves the stop to the exchange
+            strategy = WhaleTrapStrategy(risk_mode="pro")
+            strategy.binance = client
+            strategy.exit_orders = manager
+            stop_loss = exits['CCCUSDT'].stop_loss
+            strategy.active_trades['CCCUSDT'] = {
+                'trade_id': 0, 'order_id': None, 'entry_price': stop_loss / 0.99, 'quantity': 1.5,
+                'stop_loss': stop_loss, 'take_profit': exits['CCCUSDT'].take_profit, 'entry_time': datetime.now()
+            }
+            strategy.index_triggers('CCCUSDT')
+            assert strategy.triggers.check_snapshot({'CCCUSDT': stop_loss * 0.99}) == []
+            
+            # An OCO that ends on the exchange without a fill is dropped, and its stop comes back client side
+            client.cancel_order_list('CCCUSDT', exits['CCCUSDT'].order_list_id)
+            manager.last_sync = 0.0
+            strategy.book_exit_fills()
+            assert not manager.has('CCCUSDT') and 'CCCUSDT' in strategy.active_trades
+            fired = strategy.triggers.check_snapshot({'CCCUSDT': stop_loss * 0.99})
+            assert fired == [('CCCUSDT', 'stop_loss', stop_loss * 0.99)], fired
+            assert strategy.on_exit_trigger('CCCUSDT', 'stop_loss', stop_loss * 0.99)
+            assert 'CCCUSDT' not in strategy.active_trades and 'CCCUSDT' not in strategy.triggers
+            
+            # An exit whose OCO cannot be cancelled reports the position still open
+            strategy.active_trades['BBBUSDT'] = {'trade_id': 0, 'entry_price': stop_loss, 'quantity': 1.5}
+            manager.exits['BBBUSDT'] = exits['BBBUSDT']
+            assert not strategy.on_exit_trigger('BBBUSDT', 'stop_loss', stop_loss)
+            assert 'BBBUSDT' in strategy.active_trades
+            manager.forget('BBBUSDT')
+        finally:
+            simulator.stop()
+        
+        stats = manager.get_stats()
+        assert (stats['placed'], stats['filled'], stats['cancelled'], stats['active']) == (3, 1, 1, 0), stats
+        print("✅ OCO ended without a fill is dropped and its stop fires client side")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Exit orders test failed: {e}")
+        return False
+
+def test_held_quantity_close():
+    """Test that a trade books, protects and sells only what the BUY left after commission (simulator)"""
+    print("\n🧾 Testing held quantity through entry and close...")
+    
+    try:
+        from exchange_simulator import ExchangeSimulator, synthesize_recording
+        from binance_client import BinanceClient
+        from exit_orders import ExitOrderManager, format_decimal
+        from whale_trap_strategy import WhaleTrapStrategy
+        
+        simulator = ExchangeSimulator('replay', synthesize_recording(['EEEUSDT']))
+        try:
+            client = BinanceClient(base_url=simulator.start())
+            strategy = WhaleTrapStrategy(risk_mode="pro")
+            strategy.binance = client
+            strategy.exit_orders = ExitOrderManager(client)
+            strategy.position_size = 50.0
+            
+            assert strategy.execute_trade('EEEUSDT', {'symbol': 'EEEUSDT', 'signal': 'whale_activity', 'confidence': 0.9})
+            buy = next(order for order in simulator._orders.values() if order['side'] == 'BUY')
+            trade = strategy.active_trades['EEEUSDT']
+            
+            # The simulator charges 0.1% of a BUY in the base asset
+            step = 0.001
+            held = float(buy['origQty']) * (1 - 0.001)
+            assert held - step < trade['quantity'] <= held and trade['quantity'] < float(buy['origQty']), trade
+            assert strategy.exit_orders.get('EEEUSDT').quantity == trade['quantity']
+            
+            # A manual close cancels the OCO and sells exactly the held quantity
+            price = client.get_ticker_price('EEEUSDT')
+            assert strategy.close_trade('EEEUSDT', 'manual', price)
+            sell = [order for order in simulator._orders.values() if order['side'] == 'SELL' and order['type'] == 'MARKET']
+        finally:
+            simulator.stop()
+        
+        assert len(sell) == 1 and sell[0]['origQty'] == format_decimal(trade['quantity']), (sell, trade['quantity'])
+        assert 'EEEUSDT' not in strategy.active_trades
+        print(f"✅ Bought {buy['origQty']}, booked and sold {sell[0]['origQty']} after base-asset commission")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Held quantity test failed: {e}")
+        return False
+
+def test_exit_order_stream():
+    """Test exits that end on the exchange while the user data stream is live (simulator)"""
+    print("\n📡 Testing exit orders over the user data stream...")
+    
+    try:
+        import json
+        from stream_replay import ReplayServer
+        from exchange_simulator import ExchangeSimulator, synthesize_recording
+        from binance_client import BinanceClient
+        from exit_orders import ExitOrderManager
+        from user_stream import UserDataStream
+        
+        def report(exit_order, order_id, status):
+            return {'e': 'executionReport', 's': exit_order.symbol, 'i': order_id, 'S': 'SELL', 'o': 'LIMIT',
+                    'X': status, 'x': status, 'p': '0', 'q': str(exit_order.quantity), 'z': '0', 'Z': '0', 'L': '0',
+                    'g': exit_order.order_list_id}
+        
+        simulator = ExchangeSimulator('replay', synthesize_recording(['AAAUSDT', 'BBBUSDT']))
+        server = None
+        user_stream = None
+        try:
+            client = BinanceClient(base_url=simulator.start())
+            manager = ExitOrderManager(client)
+            exits = {}
+            for symbol in ('AAAUSDT', 'BBBUSDT'):
+                price = client.get_ticker_price(symbol)
+                entry = client.place_market_order(symbol, 'BUY', 1.5)
+                exits[symbol] = manager.attach(symbol, 1.5, price * 0.99, price * 1.01, entry_order=entry)
+            cancelled, expired = exits['AAAUSDT'], exits['BBBUSDT']
+            
+            # The exchange cancels one OCO outright; the other's stop expires because its take profit filled
+            client.cancel_order_list('AAAUSDT', cancelled.order_list_id)
+            simulator.fill_order(expired.take_profit_order_id)
+            events = [
+                report(cancelled, cancelled.stop_order_id, 'CANCELED'),
+                report(cancelled, cancelled.take_profit_order_id, 'CANCELED'),
+                {'e': 'listStatus', 's': 'AAAUSDT', 'g': cancelled.order_list_id, 'l': 'ALL_DONE', 'L': 'ALL_DONE'},
+                report(expired, expired.stop_order_id, 'EXPIRED'),
+            ]
+            server = ReplayServer([{'t': i * 0.001, 'frame': json.dumps(event)} for i, event in enumerate(events)])
+            user_stream = UserDataStream(client, ws_url=server.start())
+            manager.attach_user_stream(user_stream)
+            assert user_stream.start()
+            
+            deadline = time.time() + 5
+            while user_stream.events < len(events) and time.time() < deadline:
+                time.sleep(0.05)
+            assert user_stream.is_live() and user_stream.events == len(events)
+            
+            fills, dropped = manager.sync()
+        finally:
+            if user_stream is not None:
+                user_stream.stop()
+            if server is not None:
+                server.stop()
+            simulator.stop()
+        
+        assert dropped == ['AAAUSDT'], dropped
+        assert [(fill['symbol'], fill['reason']) for fill in fills] == [('BBBUSDT', 'take_profit')], fills
+        assert not manager.has('AAAUSDT') and not manager.has('BBBUSDT')
+        print("✅ Cancelled OCO reported dropped; a leg expired by its partner's fill booked as that fill")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Exit order stream test failed: {e}")
+        return False
+
+def test_user_stream():
+    """Test the account ledger against local REST and WebSocket stand-ins"""
+    print("\n👤 Testing user data stream...")
+    
+    try:
+        import json
+        from stream_replay import ReplayServer
+        from exchange_simulator import ExchangeSimulator, synthesize_recording
+        from binance_client import BinanceClient
+        from user_stream import UserDataStream
+        
+        events = [
+            {'e': 'executionReport', 's': 'BTCUSDT', 'i': 7, 'S': 'SELL', 'o': 'LIMIT_MAKER', 'X': 'NEW',
+             'p': '101.0', 'q': '0.5', 'z': '0', 'Z': '0', 'L': '0', 'g': 1},
+            {'e': 'outboundAccountPosition', 'B': [{'a': 'USDT', 'f': '950.5', 'l': '0'}]},
+            {'e': 'executionReport', 's': 'BTCUSDT', 'i': 8, 'S': 'SELL', 'o': 'LIMIT', 'X': 'NEW',
+             'p': '102.0', 'q': '1', 'z': '0', 'Z': '0', 'L': '0', 'g': -1},
+            {'e': 'executionReport', 's': 'BTCUSDT', 'i': 7, 'S': 'SELL', 'o': 'LIMIT_MAKER', 'X': 'FILLED',
+             'p': '101.0', 'q': '0.5', 'z': '0.5', 'Z': '50.5', 'L': '101.0', 'g': 1},
+        ]
+        frames = [{'t': i * 0.001, 'frame': json.dumps(event)} for i, event in enumerate(events)]
+        
+        simulator = ExchangeSimulator('replay', synthesize_recording(['BTCUSDT']))
+        server = ReplayServer(frames)
+        user_stream = UserDataStream(BinanceClient(base_url=simulator.start()), ws_url=server.start())
+        assert user_stream.start()
+        
+        deadline = time.time() + 5
+        while user_stream.events < len(events) and time.time() < deadline:
+            time.sleep(0.05)
+        user_stream.stop()
+        server.stop()
+        simulator.stop()
+        
+        assert user_stream.ledger.get_balance('USDT') == 950.5
+        assert [order['order_id'] for order in user_stream.ledger.get_open_orders('BTCUSDT')] == [8]
+        print(f"✅ Ledger followed {user_stream.events} events: balance and open orders in memory")
+        
+        return True
+    except Exception as e:
+        print(f"❌ User data stream test failed: {e}")
+        return False
+
 def test_strategy():
     """Test strategy initialization"""
     print("\n🤖 Testing Whale Trap strategy...")
@@ -178,6 +1407,100 @@ def test_strategy():
         print(f"❌ Strategy test failed: {e}")
         return False
 
+def test_parallel_scan():
+    """Test that a thread pool scan decides exactly like a serial one (simulator)"""
+    print("\n🧵 Testing parallel scan parity...")
+    
+    try:
+        import asyncio
+        from exchange_simulator import ExchangeSimulator, synthesize_recording
+        from async_binance_client import AsyncBinanceClient
+        from binance_client import BinanceClient
+        from indicator_engine import IndicatorEngine
+        from whale_trap_strategy import WhaleTrapStrategy
+        
+        symbols = [f"SIM{i}USDT" for i in range(12)]
+        simulator = ExchangeSimulator('replay', synthesize_recording(symbols, candles=100, levels=20, seed=17))
+        
+        async def fetch(base_url):
+            async with AsyncBinanceClient(base_url=base_url) as client:
+                arrays = await asyncio.gather(*(client.get_klines_array(symbol, limit=100) for symbol in symbols))
+                books = await client.gather_order_books(symbols, limit=20, arrays=True)
+                return dict(zip(symbols, arrays)), books
+        
+        strategy = WhaleTrapStrategy(risk_mode="pro")
+        try:
+            base_url = simulator.start()
+            klines, books = asyncio.run(fetch(base_url))
+            strategy.binance = BinanceClient(base_url=base_url)
+            indicators = IndicatorEngine().compute(klines)
+            
+            decisions = {}
+            for workers in (1, 4):
+                strategy.scan_workers = workers
+                analyses = strategy.analyze_universe(symbols, klines, books, indicators)
+                decisions[workers] = {symbol: (a['signal'], a['confidence'], a['whale_activity']['detected'])
+                                      for symbol, a in analyses.items()}
+            assert strategy._scan_executor is not None
+        finally:
+            strategy.stop()
+            simulator.stop()
+        
+        assert strategy._scan_executor is None
+        assert len(decisions[1]) == len(symbols)
+        assert decisions[1] == decisions[4], (decisions[1], decisions[4])
+        print(f"✅ {len(symbols)} symbols scored identically by 1 and 4 scan workers; stop() released the pool")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Parallel scan test failed: {e}")
+        return False
+
+def test_ultra_stop():
+    """Test that stopping the ultra strategy ends its scan loop and position monitor (simulator)"""
+    print("\n⏹️ Testing ultra strategy stop...")
+    
+    try:
+        import threading
+        from exchange_simulator import ExchangeSimulator, synthesize_recording
+        from binance_client import BinanceClient
+        from scan_scheduler import ScanScheduler
+        from ultra_ai_strategy import UltraAIStrategy
+        from config import Config
+        
+        simulator = ExchangeSimulator('replay', synthesize_recording(['AAAUSDT']))
+        user_stream_enabled = Config.USER_STREAM_ENABLED
+        Config.USER_STREAM_ENABLED = False
+        try:
+            strategy = UltraAIStrategy()
+            strategy.binance = BinanceClient(base_url=simulator.start())
+            strategy.scheduler = ScanScheduler(period=0.05)
+            scans = []
+            strategy.ultra_market_scan = lambda: scans.append(time.time())
+            
+            thread = threading.Thread(target=strategy.run, daemon=True)
+            thread.start()
+            deadline = time.time() + 5
+            while len(scans) < 2 and time.time() < deadline:
+                time.sleep(0.02)
+            monitor = strategy.position_monitor
+            assert len(scans) >= 2 and monitor is not None and monitor.running
+            
+            strategy.stop()
+            thread.join(timeout=2)
+        finally:
+            Config.USER_STREAM_ENABLED = user_stream_enabled
+            simulator.stop()
+        
+        assert not thread.is_alive() and not strategy.running
+        assert not monitor.running and monitor._thread is None
+        print(f"✅ Scan loop ended after {len(scans)} scans and the position monitor stopped")
+        
+        return True
+    except Exception as e:
+        print(f"❌ Ultra strategy stop test failed: {e}")
+        return False
+
 def test_compounding_calculator():
     """Test compounding calculator"""
     print("\n💰 Testing compounding calculator...")
@@ -256,7 +1579,34 @@ def main():
         ("Configuration", test_config),
         ("Database", test_database),
         ("Binance Client", test_binance_client),
+        ("Connection Pool", test_connection_pool),
+        ("Async Client", test_async_client),
+        ("Fast JSON", test_fast_json),
+        ("Symbol Index", test_symbol_index),
+        ("Price Snapshot", test_price_snapshot),
+        ("24hr Ticker Snapshot", test_ticker_snapshot),
+        ("Rate Limiter", test_rate_limiter),
+        ("Market Stream Replay", test_market_stream_replay),
+        ("Book Metrics", test_book_metrics),
+        ("Local Order Book", test_local_order_book),
+        ("Order Book Manager", test_order_book_manager),
+        ("Exchange Simulator", test_exchange_simulator),
+        ("Market Data Hub", test_market_data_hub),
+        ("Candle Store", test_candle_store),
+        ("Indicator Engine", test_indicator_engine),
+        ("Analysis Pool", test_analysis_pool),
+        ("Incremental Indicators", test_incremental_indicators),
+        ("Screener", test_screener),
+        ("Scan Scheduler", test_scan_scheduler),
+        ("Strategy Engine", test_strategy_engine),
+        ("Position Monitor", test_position_monitor),
+        ("Exit Orders", test_exit_orders),
+        ("Held Quantity Close", test_held_quantity_close),
+        ("Exit Order Stream", test_exit_order_stream),
+        ("User Data Stream", test_user_stream),
         ("Strategy", test_strategy),
+        ("Parallel Scan", test_parallel_scan),
+        ("Ultra Strategy Stop", test_ultra_stop),
         ("Compounding Calculator", test_compounding_calculator),
         ("Web Application", test_web_app),
         ("API Keys", check_api_keys),
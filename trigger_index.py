@@ -0,0 +1,198 @@
+import time
+import heapq
+import itertools
+import threading
+import logging
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Hashable, List, Mapping, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Reasons in the order they win when several fire for one position at once
+STOP_LOSS, TAKE_PROFIT, TIME_EXIT = 'stop_loss', 'take_profit', 'time_exit'
+
+class Trigger:
+    """Client-side exit levels of one long position; None means the exchange (or nobody) watches that level"""
+
+    def __init__(self, key: Hashable, symbol: str, stop_loss: Optional[float], take_profit: Optional[float],
+                 deadline: Optional[float], sequence: int):
+        self.key = key
+        self.symbol = symbol
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.deadline = deadline
+        self.sequence = sequence
+
+class SymbolLevels:
+    """Sorted (level, sequence) lists for one symbol's open positions"""
+
+    def __init__(self):
+        self.stops = []
+        self.take_profits = []
+
+    def __len__(self) -> int:
+        return len(self.stops) + len(self.take_profits)
+
+    @staticmethod
+    def _discard(levels: List[Tuple[float, int]], entry: Tuple[float, int]):
+        i = bisect_left(levels, entry)
+        if i < len(levels) and levels[i] == entry:
+            del levels[i]
+
+    def add(self, trigger: Trigger):
+        if trigger.stop_loss is not None:
+            insort(self.stops, (trigger.stop_loss, trigger.sequence))
+        if trigger.take_profit is not None:
+            insort(self.take_profits, (trigger.take_profit, trigger.sequence))
+
+    def remove(self, trigger: Trigger):
+        if trigger.stop_loss is not None:
+            self._discard(self.stops, (trigger.stop_loss, trigger.sequence))
+        if trigger.take_profit is not None:
+            self._discard(self.take_profits, (trigger.take_profit, trigger.sequence))
+
+    def fired(self, price: float) -> Tuple[List[Tuple[float, int]], List[Tuple[float, int]]]:
+        """Stops at or above price and take-profits at or below it, by binary search"""
+        stops = self.stops
+        take_profits = self.take_profits
+        # The usual answer is nothing, which the highest stop and lowest take-profit decide alone
+        stops = stops[bisect_left(stops, (price, -1)):] if stops and stops[-1][0] >= price else []
+        take_profits = (take_profits[:bisect_right(take_profits, (price, float('inf')))]
+                        if take_profits and take_profits[0][0] <= price else [])
+        return stops, take_profits
+
+class TriggerIndex:
+    """Stop, take-profit and time-exit triggers of open positions, answering a price with only what fired.
+
+    Levels are sorted per symbol, so a price costs two binary searches however many positions the
+    symbol has; deadlines sit in one global min-heap, so only expired positions are ever touched.
+    """
+
+    def __init__(self):
+        self.triggers = {}       # key -> Trigger
+        self._by_sequence = {}   # sequence -> Trigger
+        self._symbols = {}       # symbol -> SymbolLevels
+        self._deadlines = []     # heap of (deadline, sequence); stale entries are skipped lazily
+        self._expired = {}       # sequence -> Trigger past its deadline, until removed
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+        self.checks = 0
+        self.fired = 0
+        self.check_time = 0.0
+
+    def __len__(self) -> int:
+        return len(self.triggers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.triggers
+
+    def add(self, key: Hashable, symbol: str, stop_loss: float = None, take_profit: float = None,
+            deadline: float = None) -> Trigger:
+        """Index a position, replacing any triggers it already had; deadline is a time.time() timestamp"""
+        with self._lock:
+            self._remove(key)
+            trigger = Trigger(key, symbol, stop_loss, take_profit, deadline, next(self._sequence))
+            self.triggers[key] = trigger
+            self._by_sequence[trigger.sequence] = trigger
+            if stop_loss is not None or take_profit is not None:
+                self._symbols.setdefault(symbol, SymbolLevels()).add(trigger)
+            if deadline is not None:
+                heapq.heappush(self._deadlines, (deadline, trigger.sequence))
+            return trigger
+
+    def remove(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._remove(key)
+
+    def _remove(self, key: Hashable) -> bool:
+        trigger = self.triggers.pop(key, None)
+        if trigger is None:
+            return False
+        del self._by_sequence[trigger.sequence]
+        self._expired.pop(trigger.sequence, None)
+        levels = self._symbols.get(trigger.symbol)
+        if levels is not None:
+            levels.remove(trigger)
+            if not levels:
+                del self._symbols[trigger.symbol]
+        # The heap entry goes stale and is dropped when it reaches the top
+        return True
+
+    def _collect_expired(self, now: float):
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][0] <= now:
+            _, sequence = heapq.heappop(deadlines)
+            trigger = self._by_sequence.get(sequence)
+            if trigger is not None:
+                self._expired[sequence] = trigger
+
+    def symbols(self) -> List[str]:
+        """Symbols with at least one open position"""
+        with self._lock:
+            return list({trigger.symbol for trigger in self.triggers.values()})
+
+    def needs_prices(self, now: float = None) -> bool:
+        """Whether any position has a client-side level or an expired hold, i.e. whether a price check can fire"""
+        with self._lock:
+            self._collect_expired(time.time() if now is None else now)
+            return bool(self._symbols) or bool(self._expired)
+
+    def _fire(self, levels: Optional[SymbolLevels], price: float, fired: Dict):
+        if levels is None:
+            return
+        stops, take_profits = levels.fired(price)
+        if not stops and not take_profits:
+            return
+        for reason, entries in ((STOP_LOSS, stops), (TAKE_PROFIT, take_profits)):
+            for _, sequence in entries:
+                key = self._by_sequence[sequence].key
+                if key not in fired:
+                    fired[key] = (reason, price)
+
+    def check(self, symbol: str, price: float, now: float = None) -> List[Tuple[Hashable, str]]:
+        """(key, reason) for every position of symbol whose trigger fired at price"""
+        start = time.perf_counter()
+        fired = {}
+        with self._lock:
+            self._fire(self._symbols.get(symbol), price, fired)
+            self._collect_expired(time.time() if now is None else now)
+            for trigger in self._expired.values():
+                if trigger.symbol == symbol and trigger.key not in fired:
+                    fired[trigger.key] = (TIME_EXIT, price)
+        self._account(start, len(fired))
+        return [(key, reason) for key, (reason, _) in fired.items()]
+
+    def check_snapshot(self, prices: Mapping[str, float], now: float = None) -> List[Tuple[Hashable, str, float]]:
+        """(key, reason, price) for every fired position, reading only symbols that have open triggers"""
+        start = time.perf_counter()
+        fired = {}
+        with self._lock:
+            for symbol, levels in self._symbols.items():
+                price = prices.get(symbol)
+                if price:
+                    self._fire(levels, price, fired)
+            self._collect_expired(time.time() if now is None else now)
+            for trigger in self._expired.values():
+                price = prices.get(trigger.symbol)
+                # A time exit still needs a price to sell at
+                if price and trigger.key not in fired:
+                    fired[trigger.key] = (TIME_EXIT, price)
+        self._account(start, len(fired))
+        return [(key, reason, price) for key, (reason, price) in fired.items()]
+
+    def _account(self, start: float, fired: int):
+        self.checks += 1
+        self.fired += fired
+        self.check_time += time.perf_counter() - start
+
+    def get_stats(self) -> Dict:
+        return {
+            'positions': len(self.triggers),
+            'symbols': len(self._symbols),
+            'expired': len(self._expired),
+            'checks': self.checks,
+            'fired': self.fired,
+            'avg_check_us': round(self.check_time / self.checks * 1e6, 2) if self.checks else 0.0
+        }
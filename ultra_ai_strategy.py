@@ -1,22 +1,43 @@
-import pandas as pd
 import numpy as np
 import time
 import logging
 import threading
 from typing import Dict, List, Optional, Tuple
-from datetime import datetime, timedelta
-import ta
-from binance_client import BinanceClient
-from database import TradingDatabase
+from datetime import datetime
+from market_data_hub import get_market_data_hub
+from incremental_indicators import IndicatorTracker
+from screener import Screener
+from scan_scheduler import ScanScheduler
+from trigger_index import TriggerIndex
+from position_monitor import PositionMonitor
+from strategy_engine import EventStrategy, StrategyEngine
+from exit_orders import ExitOrderManager
+from user_stream import UserDataStream
+from rate_limiter import PRIORITY_MONITOR
 from config import Config
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class UltraAIStrategy:
+class UltraAIStrategy(EventStrategy):
     def __init__(self):
-        self.binance = BinanceClient()
-        self.db = TradingDatabase()
+        # Clients, candles and the database are shared with every other strategy in the process
+        self.hub = get_market_data_hub()
+        self.binance = self.hub.binance
+        self.async_binance = self.hub.async_binance
+        self.market_stream = None
+        self.candle_store = self.hub.candle_store
+        self.indicators = IndicatorTracker(self.candle_store, '1m')
+        self.screener = Screener()
+        self.scheduler = ScanScheduler()
+        self.triggers = TriggerIndex()
+        self.exit_orders = ExitOrderManager(self.binance)
+        self.user_stream = None
+        self.engine = None
+        self.position_monitor = None
+        self.running = False
+        self.trade_lock = threading.RLock()  # Held by entries and exits, which may run on different threads
+        self.db = self.hub.db
         self.current_capital = Config.INITIAL_CAPITAL
         self.active_trades = {}
         self.daily_profit = 0
@@ -26,6 +47,7 @@ class UltraAIStrategy:
         # AI Decision Making
         self.ai_confidence_threshold = 0.3  # Very low threshold for ultra-aggressive
         self.max_concurrent_trades = Config.MAX_COINS_TO_TRADE
+        self.max_hold_time = 120  # Seconds before a time exit (ultra-fast: 2 minutes)
         self.position_size = Config.BASE_POSITION_SIZE
         
         # Performance tracking
@@ -40,49 +62,64 @@ class UltraAIStrategy:
     def get_all_tradeable_coins(self) -> List[str]:
         """Get all available USDT trading pairs"""
         try:
-            exchange_info = self.binance.get_exchange_info()
-            if 'error' in exchange_info:
-                return []
-            
-            usdt_pairs = []
-            for symbol_info in exchange_info.get('symbols', []):
-                symbol = symbol_info['symbol']
-                if (symbol.endswith('USDT') and 
-                    symbol_info['status'] == 'TRADING' and
-                    symbol_info['isSpotTradingAllowed']):
-                    usdt_pairs.append(symbol)
-            
+            usdt_pairs = self.binance.symbol_index.tradeable_symbols('USDT')
             return usdt_pairs[:Config.MAX_COINS_TO_TRADE]
         
         except Exception as e:
             logger.error(f"Error getting tradeable coins: {e}")
             return ['BTCUSDT', 'ETHUSDT', 'BNBUSDT']  # Fallback
     
-    def ultra_fast_analysis(self, symbol: str) -> Dict:
+    def start_user_stream(self):
+        """Follow balances and order fills over the user data stream instead of polling the account"""
+        if not Config.USER_STREAM_ENABLED or self.user_stream is not None:
+            return
+        user_stream = UserDataStream(self.binance)
+        if user_stream.start():
+            self.user_stream = user_stream
+            self.exit_orders.attach_user_stream(user_stream)
+    
+    def start_market_stream(self, symbols: List[str]):
+        """Stream klines and tickers for the universe instead of polling REST"""
+        # One stream serves every strategy in the process
+        market_stream = self.hub.start_market_stream(self, symbols)
+        if market_stream is None or market_stream is self.market_stream:
+            return
+        self.market_stream = market_stream
+        if self.position_monitor is not None:
+            self.position_monitor.attach(self.market_stream)
+    
+    def get_scan_klines(self, symbols: List[str], limit: int) -> Dict[str, np.ndarray]:
+        """Kline views for the scan; streamed symbols are current, the rest fetch only new candles"""
+        return self.hub.get_klines(symbols, '1m', limit)
+    
+    def ultra_fast_analysis(self, symbol: str, klines: np.ndarray = None) -> Dict:
         """Ultra-fast market analysis for scalping"""
         try:
-            # Get 1-minute klines for fast analysis
-            klines = self.binance.get_klines(symbol, '1m', 10)
+            # Get 1-minute klines for fast analysis unless prefetched by the scan
+            if klines is None:
+                klines = self.candle_store.get(symbol, '1m', 10)
             
-            if not klines or 'error' in klines:
+            if klines is None or len(klines) == 0:
                 return {'signal': 'no_data', 'confidence': 0}
             
-            # Convert to DataFrame
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-                'taker_buy_quote', 'ignore'
-            ])
-            
-            # Convert to numeric
-            for col in ['open', 'high', 'low', 'close', 'volume']:
-                df[col] = pd.to_numeric(df[col])
+            # Only close and volume are read; decoded arrays are used as-is, raw REST rows
+            # are parsed field by field into a preallocated array
+            if isinstance(klines, np.ndarray):
+                closes = klines[:, 4]
+                volumes = klines[:, 5]
+            else:
+                fields = np.empty((2, len(klines)), dtype=np.float64)
+                for i, row in enumerate(klines):
+                    fields[0, i] = float(row[4])
+                    fields[1, i] = float(row[5])
+                closes, volumes = fields
+            count = len(closes)
             
             # Ultra-fast indicators
-            current_price = df['close'].iloc[-1]
-            prev_price = df['close'].iloc[-2]
-            current_volume = df['volume'].iloc[-1]
-            avg_volume = df['volume'].rolling(5).mean().iloc[-1]
+            current_price = closes[-1]
+            prev_price = closes[-2]
+            current_volume = volumes[-1]
+            avg_volume = volumes[-5:].mean() if count >= 5 else np.nan
             
             # Calculate ultra-fast signals
             price_change = (current_price - prev_price) / prev_price
@@ -106,14 +143,16 @@ class UltraAIStrategy:
                 signal_type = 'volume_spike'
             
             # Price acceleration
-            if len(df) >= 3:
-                price_accel = (df['close'].iloc[-1] - df['close'].iloc[-2]) - (df['close'].iloc[-2] - df['close'].iloc[-3])
+            if count >= 3:
+                price_accel = (closes[-1] - closes[-2]) - (closes[-2] - closes[-3])
                 if price_accel > 0:
                     signal_strength += 0.2
             
-            # RSI for oversold/overbought (ultra-fast)
-            if len(df) >= 14:
-                rsi = ta.momentum.rsi(df['close'], window=14).iloc[-1]
+            # RSI for oversold/overbought, kept incrementally over the store's full history
+            # since the scan itself only looks at 10 candles
+            state = self.indicators.sync(symbol)
+            rsi = state.rsi.value if state is not None else None
+            if rsi is not None:
                 if rsi < 30:  # Oversold
                     signal_strength += 0.2
                 elif rsi > 70:  # Overbought
@@ -184,8 +223,8 @@ class UltraAIStrategy:
             if position_size < 0.1:  # Minimum 0.1 USDT
                 return False
             
-            # Get current price
-            current_price = self.binance.get_ticker_price(symbol)
+            # Get current price from a recent bulk snapshot
+            current_price = self.get_current_price(symbol, Config.PRICE_SNAPSHOT_MAX_AGE)
             if not current_price:
                 return False
             
@@ -193,12 +232,12 @@ class UltraAIStrategy:
             quantity = position_size / current_price
             
             # Round quantity to appropriate precision
-            symbol_info = self.binance.get_symbol_info(symbol)
-            if symbol_info:
-                lot_size_filter = next((f for f in symbol_info['filters'] if f['filterType'] == 'LOT_SIZE'), None)
-                if lot_size_filter:
-                    step_size = float(lot_size_filter['stepSize'])
-                    quantity = round(quantity / step_size) * step_size
+            rules = self.binance.symbol_index.get(symbol)
+            if rules:
+                quantity = rules.quantize_quantity(quantity)
+                if not rules.meets_minimums(quantity, current_price):
+                    logger.info(f"Order for {symbol} below exchange minimums, skipping")
+                    return False
             
             # Place market buy order
             order = self.binance.place_market_order(symbol, 'BUY', quantity)
@@ -207,6 +246,9 @@ class UltraAIStrategy:
                 logger.error(f"Failed to place order for {symbol}: {order['error']}")
                 return False
             
+            # Base-asset commission leaves less than was bought; every exit sells what is actually held
+            quantity = self.exit_orders.net_quantity(symbol, quantity, order)
+            
             # Calculate stop loss and take profit
             stop_loss_price = current_price * (1 - Config.STOP_LOSS_PERCENTAGE / 100)
             take_profit_price = current_price * (1 + Config.TAKE_PROFIT_PERCENTAGE / 100)
@@ -233,6 +275,11 @@ class UltraAIStrategy:
                 'position_size': position_size
             }
             
+            # Stop loss and take profit rest on the exchange from the moment we are filled
+            if Config.EXCHANGE_EXITS_ENABLED:
+                self.exit_orders.attach(symbol, quantity, stop_loss_price, take_profit_price)
+            self.index_triggers(symbol)
+            
             # Update capital
             self.current_capital -= position_size
             
@@ -247,37 +294,81 @@ class UltraAIStrategy:
             logger.error(f"Error executing ultra trade for {symbol}: {e}")
             return False
     
+    def get_current_price(self, symbol: str, max_age: float = 0) -> Optional[float]:
+        """Get a price from the bulk snapshot, falling back to a single-symbol request"""
+        snapshot = self.binance.get_all_prices(max_age)
+        if snapshot is not None and symbol in snapshot:
+            return snapshot.get(symbol)
+        return self.binance.get_ticker_price(symbol)
+    
+    def book_exit_fills(self):
+        """Exits resting on the exchange only need their fills booked"""
+        with self.trade_lock:
+            fills, dropped = self.exit_orders.sync()
+            for fill in fills:
+                trade_info = self.active_trades.get(fill['symbol'])
+                if trade_info is not None:
+                    self.close_ultra_trade(fill['symbol'], fill['reason'], fill['price'],
+                                           trade_info['position_size'], exit_filled=True)
+            
+            # Exits that ended without a fill hand their levels back to the client-side triggers
+            for symbol in dropped:
+                if symbol in self.active_trades:
+                    self.index_triggers(symbol)
+    
+    def index_triggers(self, symbol: str):
+        """Index the levels the exchange is not already watching, plus the time exit"""
+        trade_info = self.active_trades[symbol]
+        exit_order = self.exit_orders.get(symbol)
+        self.triggers.add(
+            symbol, symbol,
+            stop_loss=trade_info['stop_loss'] if exit_order is None else None,
+            take_profit=trade_info['take_profit'] if exit_order is None or not exit_order.covers_take_profit else None,
+            deadline=trade_info['entry_time'].timestamp() + self.max_hold_time
+        )
+    
+    def on_exit_trigger(self, symbol: str, exit_reason: str, current_price: float) -> bool:
+        """Close a position whose stop loss, take profit or time exit fired; call with trade_lock held"""
+        trade_info = self.active_trades.get(symbol)
+        if trade_info is None:
+            self.triggers.remove(symbol)
+            return True
+        return self.close_ultra_trade(symbol, exit_reason, current_price, trade_info['position_size'])
+    
+    def start_position_monitor(self):
+        """Watch exits on their own thread so a slow scan never delays a stop"""
+        if not Config.POSITION_MONITOR_ENABLED or self.position_monitor is not None:
+            return
+        self.position_monitor = PositionMonitor(self.triggers, self.on_exit_trigger, self.binance, self.trade_lock)
+        if self.market_stream is not None:
+            self.position_monitor.attach(self.market_stream)
+        self.position_monitor.start()
+    
     def monitor_ultra_trades(self):
         """Monitor and manage ultra-fast trades"""
-        for symbol, trade_info in list(self.active_trades.items()):
-            try:
-                current_price = self.binance.get_ticker_price(symbol)
-                if not current_price:
-                    continue
-                
-                entry_price = trade_info['entry_price']
-                stop_loss = trade_info['stop_loss']
-                take_profit = trade_info['take_profit']
-                position_size = trade_info['position_size']
-                
-                # Check stop loss
-                if current_price <= stop_loss:
-                    self.close_ultra_trade(symbol, 'stop_loss', current_price, position_size)
-                
-                # Check take profit
-                elif current_price >= take_profit:
-                    self.close_ultra_trade(symbol, 'take_profit', current_price, position_size)
-                
-                # Time-based exit (ultra-fast: 2 minutes max)
-                time_in_trade = datetime.now() - trade_info['entry_time']
-                if time_in_trade > timedelta(minutes=2):
-                    self.close_ultra_trade(symbol, 'time_exit', current_price, position_size)
-            
-            except Exception as e:
-                logger.error(f"Error monitoring ultra trade for {symbol}: {e}")
+        self.book_exit_fills()
+        
+        # The position monitor thread watches prices when it runs
+        if self.position_monitor is not None:
+            return
+        
+        # Prices are needed only for client-side levels and expired holds
+        if not self.triggers.needs_prices():
+            return
+        
+        # One request prices every open position
+        snapshot = self.binance.get_all_prices(priority=PRIORITY_MONITOR)
+        if snapshot is None:
+            return
+        
+        # Only positions whose stop loss, take profit or time exit fired come back
+        with self.trade_lock:
+            for symbol, exit_reason, current_price in self.triggers.check_snapshot(snapshot):
+                self.on_exit_trigger(symbol, exit_reason, current_price)
     
-    def close_ultra_trade(self, symbol: str, exit_reason: str, exit_price: float, position_size: float):
-        """Close ultra trade and compound profits"""
+    def close_ultra_trade(self, symbol: str, exit_reason: str, exit_price: float, position_size: float,
+                          exit_filled: bool = False) -> bool:
+        """Close ultra trade and compound profits; exit_filled means an exchange-side exit already sold. True once closed"""
         try:
             trade_info = self.active_trades[symbol]
             entry_price = trade_info['entry_price']
@@ -286,8 +377,15 @@ class UltraAIStrategy:
             # Calculate PnL
             pnl = (exit_price - entry_price) * quantity
             
-            # Place sell order
-            order = self.binance.place_market_order(symbol, 'SELL', quantity)
+            if exit_filled:
+                order = {}
+            else:
+                # Resting exits lock the quantity; if they cannot be cancelled they may have filled
+                if not self.exit_orders.cancel(symbol):
+                    return False
+                
+                # Place sell order
+                order = self.binance.place_market_order(symbol, 'SELL', quantity)
             
             if 'error' not in order:
                 # Update database
@@ -316,49 +414,113 @@ class UltraAIStrategy:
                 
                 # Remove from active trades
                 del self.active_trades[symbol]
+                self.triggers.remove(symbol)
+                self.scheduler.wake(symbol)
+                return True
             
+            logger.error(f"Failed to close {symbol}: {order['error']}")
+            # The exchange exits were cancelled, so every level is watched client side again
+            self.index_triggers(symbol)
+            return False
+        
         except Exception as e:
             logger.error(f"Error closing ultra trade for {symbol}: {e}")
+            return False
     
     def ultra_market_scan(self):
         """Ultra-fast market scanning"""
+        self.scheduler.begin_cycle()
         try:
             # Get all tradeable coins
             symbols = self.get_all_tradeable_coins()
             
-            logger.info(f"🔍 Scanning {len(symbols)} coins...")
+            # Only symbols that are moving get klines and analysis (a klines refresh costs weight 2)
+            if Config.SCREENER_ENABLED:
+                symbols = self.screener.screen(self.binance.get_24hr_snapshot(), symbols, weight_per_symbol=2)
+            
+            # Quiet symbols and ones we just passed on are revisited less often
+            candidates = self.scheduler.select(symbol for symbol in symbols if symbol not in self.active_trades)
+            
+            logger.info(f"🔍 Scanning {len(candidates)} of {len(symbols)} coins...")
+            
+            # Fetch klines for the symbols that are due concurrently
+            klines_by_symbol = self.get_scan_klines(candidates, 10)
             
             # Analyze each symbol ultra-fast
-            for symbol in symbols:
+            for symbol in candidates:
                 # Skip if we have max trades
                 if len(self.active_trades) >= self.max_concurrent_trades:
                     break
                 
-                # Skip if we already have this symbol
-                if symbol in self.active_trades:
-                    continue
+                # Out of time for this cycle: the rest stay due and go first next cycle
+                if self.scheduler.past_deadline():
+                    break
                 
                 # Ultra-fast analysis
-                analysis = self.ultra_fast_analysis(symbol)
+                analysis = self.ultra_fast_analysis(symbol, klines_by_symbol.get(symbol))
                 
                 # Execute trade if conditions met
-                if self.should_enter_trade(analysis):
-                    self.execute_ultra_trade(symbol, analysis)
+                with self.trade_lock:
+                    entered = self.should_enter_trade(analysis) and self.execute_ultra_trade(symbol, analysis)
                 
-                # Small delay to avoid rate limits
-                time.sleep(0.01)  # 10ms delay
-            
-            # Monitor existing trades
-            self.monitor_ultra_trades()
-            
-            # Save wallet balance
-            self.db.save_wallet_balance(self.current_capital)
+                self.scheduler.schedule(
+                    symbol,
+                    volatility=abs(analysis.get('price_change', 0)) * 100,
+                    volume_ratio=analysis.get('volume_ratio'),
+                    signal=analysis['confidence'],
+                    held=symbol in self.active_trades,
+                    rejected=analysis['confidence'] >= self.ai_confidence_threshold and not entered
+                )
             
-            # Log performance
-            self.log_performance()
+            self.housekeeping()
             
         except Exception as e:
             logger.error(f"Error in ultra market scan: {e}")
+        finally:
+            self.scheduler.end_cycle()
+    
+    def housekeeping(self):
+        """Monitor open trades, save the wallet balance and log performance"""
+        # Monitor existing trades
+        self.monitor_ultra_trades()
+        
+        # Save wallet balance
+        self.db.save_wallet_balance(self.current_capital)
+        
+        # Log performance
+        self.log_performance()
+    
+    # Event-driven mode: StrategyEngine calls these from its dispatcher thread
+    
+    def on_candle_close(self, symbol: str, bars: np.ndarray):
+        """Analyze a symbol the moment its candle closes"""
+        if symbol in self.active_trades or len(self.active_trades) >= self.max_concurrent_trades:
+            return
+        analysis = self.ultra_fast_analysis(symbol, bars[-10:])
+        with self.trade_lock:
+            if self.should_enter_trade(analysis):
+                self.execute_ultra_trade(symbol, analysis)
+    
+    def on_fill(self, order: Dict):
+        """Book exchange-side exits as soon as they trade"""
+        if order['side'] == 'SELL' and order['symbol'] in self.active_trades:
+            self.book_exit_fills()
+    
+    def run_event_driven(self):
+        """Trade on candle closes from the market stream instead of rescanning the universe on a clock"""
+        self.engine = StrategyEngine(self.candle_store)
+        self.engine.register(self)
+        self.engine.attach(self.market_stream)
+        if self.user_stream is not None:
+            self.engine.attach_user_stream(self.user_stream)
+        # Housekeeping runs on the dispatcher thread too, so it never races a handler
+        self.engine.every(Config.SCAN_INTERVAL, self.housekeeping)
+        
+        try:
+            self.engine.run()
+        except KeyboardInterrupt:
+            logger.info("Ultra AI Strategy stopped by user")
+            self.engine.stop()
     
     def log_performance(self):
         """Log current performance metrics"""
@@ -374,6 +536,14 @@ class UltraAIStrategy:
             logger.info(f"   Win Rate: {win_rate:.1f}%")
             logger.info(f"   Time Running: {time_running}")
             
+            pool_stats = self.binance.get_pool_stats()
+            logger.info(f"   HTTP Pool: {pool_stats['hits']} hits / {pool_stats['misses']} misses")
+            
+            if self.position_monitor is not None and self.position_monitor.exits:
+                monitor_stats = self.position_monitor.get_stats()
+                logger.info(f"   Exits: {monitor_stats['exits']}, detection to order p95 "
+                            f"{monitor_stats['latency_p95_ms']}ms, {monitor_stats['over_budget']} over budget")
+            
             # Check if we're on track for 1M
             days_elapsed = time_running.days
             if days_elapsed > 0:
@@ -388,16 +558,38 @@ class UltraAIStrategy:
         except Exception as e:
             logger.error(f"Error logging performance: {e}")
     
+    def stop(self):
+        """Stop the scan loop or event engine, exit monitoring and streams"""
+        self.running = False
+        if self.engine is not None:
+            self.engine.stop()
+        if self.position_monitor is not None:
+            self.position_monitor.stop()
+        if self.user_stream is not None:
+            self.user_stream.stop()
+        # The market stream is shared, so only this strategy's symbols leave it
+        self.hub.release_market_stream(self)
+    
     def run(self):
         """Main ultra AI strategy loop"""
         logger.info("🚀 Starting Ultra AI Strategy for 1M goal...")
         logger.info(f"Initial capital: ${self.current_capital:,.2f}")
         logger.info(f"Target: $1,000,000 in 6 months")
         
-        while True:
+        self.binance.warm_up()
+        self.start_user_stream()
+        self.start_market_stream(self.get_all_tradeable_coins())
+        self.start_position_monitor()
+        
+        self.running = True
+        if Config.EVENT_DRIVEN and self.market_stream is not None:
+            self.run_event_driven()
+            return
+        
+        while self.running:
             try:
                 self.ultra_market_scan()
-                time.sleep(Config.SCAN_INTERVAL)
+                self.scheduler.wait_next()
                 
             except KeyboardInterrupt:
                 logger.info("Ultra AI Strategy stopped by user")
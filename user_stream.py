@@ -0,0 +1,219 @@
+import asyncio
+import json
+import time
+import threading
+import logging
+from typing import Callable, Dict, List, Optional
+import websockets
+from async_binance_client import BackgroundLoop
+from config import Config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# executionReport statuses after which an order no longer rests on the book
+FINAL_ORDER_STATUSES = {'FILLED', 'CANCELED', 'REJECTED', 'EXPIRED', 'EXPIRED_IN_MATCH'}
+
+class AccountLedger:
+    """In-memory balances and open orders kept current from user data stream events"""
+
+    def __init__(self):
+        self.balances = {}     # asset -> {'free': float, 'locked': float}
+        self.open_orders = {}  # orderId -> latest executionReport fields
+        self.updated_at = 0.0
+        self._lock = threading.Lock()
+
+    def load_account(self, account: Dict):
+        """Seed balances from a REST /api/v3/account response"""
+        with self._lock:
+            self.balances = {
+                balance['asset']: {'free': float(balance['free']), 'locked': float(balance['locked'])}
+                for balance in account.get('balances', [])
+            }
+            self.updated_at = time.time()
+
+    def load_open_orders(self, orders: List[Dict]):
+        """Seed open orders from a REST /api/v3/openOrders response"""
+        with self._lock:
+            self.open_orders = {
+                order['orderId']: {
+                    'symbol': order['symbol'], 'side': order['side'], 'type': order['type'],
+                    'status': order['status'], 'price': float(order['price']),
+                    'quantity': float(order['origQty']), 'executed': float(order['executedQty']),
+                    'order_list_id': order.get('orderListId', -1)
+                }
+                for order in orders
+            }
+
+    def apply_event(self, event: Dict) -> Optional[str]:
+        """Apply one user data event; returns its type"""
+        kind = event.get('e')
+        with self._lock:
+            if kind == 'outboundAccountPosition':
+                for balance in event['B']:
+                    self.balances[balance['a']] = {'free': float(balance['f']), 'locked': float(balance['l'])}
+            elif kind == 'balanceUpdate':
+                balance = self.balances.setdefault(event['a'], {'free': 0.0, 'locked': 0.0})
+                balance['free'] += float(event['d'])
+            elif kind == 'executionReport':
+                if event['X'] in FINAL_ORDER_STATUSES:
+                    self.open_orders.pop(event['i'], None)
+                else:
+                    self.open_orders[event['i']] = {
+                        'symbol': event['s'], 'side': event['S'], 'type': event['o'],
+                        'status': event['X'], 'price': float(event['p']),
+                        'quantity': float(event['q']), 'executed': float(event['z']),
+                        'order_list_id': event.get('g', -1)
+                    }
+            else:
+                return kind
+            self.updated_at = time.time()
+        return kind
+
+    def get_balance(self, asset: str = 'USDT') -> float:
+        """Free balance for an asset"""
+        balance = self.balances.get(asset)
+        return balance['free'] if balance else 0.0
+
+    def get_open_orders(self, symbol: str = None) -> List[Dict]:
+        return [dict(order, order_id=order_id) for order_id, order in list(self.open_orders.items())
+                if symbol is None or order['symbol'] == symbol]
+
+class UserDataStream:
+    """listenKey user data stream feeding an AccountLedger, with keepalive and reconnects"""
+
+    def __init__(self, binance_client, ws_url: str = None, ledger: AccountLedger = None):
+        self.binance = binance_client
+        self.ws_url = (ws_url or Config.BINANCE_WS_URL).rstrip('/')
+        self.ledger = ledger or AccountLedger()
+
+        self.listen_key = None
+        self.connected = False
+        self.running = False
+        self.events = 0
+        self.reconnects = 0
+
+        self._listeners = []
+        self._loop = None
+        self._future = None
+        self._runner = None
+
+    def subscribe(self, listener: Callable[[str, Dict], None]):
+        """Register listener(kind, event) for every user data event"""
+        self._listeners.append(listener)
+
+    def is_live(self) -> bool:
+        """Whether ledger reads reflect the exchange without a REST call"""
+        return self.running and self.connected
+
+    def start(self) -> bool:
+        """Seed the ledger over REST, then follow the stream in a background thread"""
+        if self.running:
+            return True
+        if not self._open_listen_key():
+            return False
+
+        account = self.binance.get_account_info()
+        if 'error' not in account:
+            self.ledger.load_account(account)
+        open_orders = self.binance.get_open_orders()
+        if isinstance(open_orders, list):
+            self.ledger.load_open_orders(open_orders)
+
+        self.running = True
+        self._loop = BackgroundLoop()
+        self._future = asyncio.run_coroutine_threadsafe(self._run(), self._loop.loop)
+        logger.info("User data stream started")
+        return True
+
+    def stop(self):
+        self.running = False
+        if self._loop is not None:
+            # Cancel the task itself so the socket closes cleanly before the loop stops
+            self._loop.loop.call_soon_threadsafe(self._cancel_runner)
+            try:
+                self._future.result(timeout=5)
+            except Exception:
+                pass
+            self._loop.loop.call_soon_threadsafe(self._loop.loop.stop)
+        if self.listen_key:
+            self.binance.close_listen_key(self.listen_key)
+            self.listen_key = None
+
+    def _cancel_runner(self):
+        if self._runner is not None:
+            self._runner.cancel()
+
+    def _open_listen_key(self) -> bool:
+        response = self.binance.create_listen_key()
+        if 'error' in response:
+            logger.error(f"Could not open user data stream: {response['error']}")
+            return False
+        self.listen_key = response['listenKey']
+        return True
+
+    async def _keepalive(self):
+        # A listenKey expires 60 minutes after the last keepalive
+        while self.running:
+            await asyncio.sleep(Config.USER_STREAM_KEEPALIVE)
+            response = await asyncio.to_thread(self.binance.keepalive_listen_key, self.listen_key)
+            if 'error' in response:
+                logger.warning(f"listenKey keepalive failed: {response['error']}")
+
+    async def _run(self):
+        self._runner = asyncio.current_task()
+        keepalive = asyncio.create_task(self._keepalive())
+        delay = 1.0
+        try:
+            while self.running:
+                try:
+                    async with websockets.connect(f"{self.ws_url}/ws/{self.listen_key}") as ws:
+                        self.connected = True
+                        delay = 1.0
+                        async for raw in ws:
+                            self.handle_message(json.loads(raw))
+                            if not self.connected:
+                                break  # listenKey expired
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"User data stream connection lost: {e}")
+                self.connected = False
+
+                if not self.running:
+                    break
+                self.reconnects += 1
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                # The key may have expired while we were away; events missed meanwhile need a reseed
+                if await asyncio.to_thread(self._open_listen_key):
+                    account = await asyncio.to_thread(self.binance.get_account_info)
+                    if 'error' not in account:
+                        self.ledger.load_account(account)
+        finally:
+            keepalive.cancel()
+            self.connected = False
+
+    def handle_message(self, message: Dict):
+        """Apply one stream message to the ledger and notify listeners"""
+        event = message.get('data', message)
+        kind = self.ledger.apply_event(event)
+        if kind == 'listenKeyExpired':
+            logger.warning("listenKey expired, reconnecting")
+            self.connected = False
+        self.events += 1
+
+        for listener in self._listeners:
+            try:
+                listener(kind, event)
+            except Exception as e:
+                logger.error(f"User data stream listener error: {e}")
+
+    def get_stats(self) -> Dict:
+        return {
+            'running': self.running,
+            'connected': self.connected,
+            'events': self.events,
+            'reconnects': self.reconnects,
+            'open_orders': len(self.ledger.open_orders)
+        }
@@ -1,35 +1,70 @@
-import pandas as pd
+import asyncio
 import numpy as np
 import time
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
-from datetime import datetime, timedelta
-import ta
-from binance_client import BinanceClient
-from database import TradingDatabase
+from datetime import datetime
+from async_binance_client import get_background_loop
+from market_data_hub import get_market_data_hub
+from indicator_engine import IndicatorEngine
+from orderbook_analytics import analyze_book, analyze_books
+from screener import Screener
+from scan_scheduler import ScanScheduler
+from trigger_index import TriggerIndex
+from position_monitor import PositionMonitor
+from strategy_engine import EventStrategy, StrategyEngine
+from analysis_pool import ProcessIndicatorEngine
+from exit_orders import ExitOrderManager
+from user_stream import UserDataStream
+from rate_limiter import PRIORITY_MONITOR
 from config import Config
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class WhaleTrapStrategy:
+class WhaleTrapStrategy(EventStrategy):
     def __init__(self, risk_mode: str = "pro"):
         self.risk_mode = risk_mode
-        self.binance = BinanceClient()
-        self.db = TradingDatabase()
+        # Clients, candles and the database are shared with every other strategy in the process
+        self.hub = get_market_data_hub()
+        self.binance = self.hub.binance
+        self.async_binance = self.hub.async_binance
+        self.market_stream = None
+        self.order_books = None
+        self.candle_store = self.hub.candle_store
+        # Worker processes keep indicator math off the GIL shared with the web server
+        self.indicator_engine = ProcessIndicatorEngine() if Config.ANALYSIS_PROCESSES > 0 else IndicatorEngine()
+        self.screener = Screener()
+        self.scheduler = ScanScheduler()
+        self.triggers = TriggerIndex()
+        self.exit_orders = ExitOrderManager(self.binance)
+        self.user_stream = None
+        self.engine = None
+        self.position_monitor = None
+        self.trade_lock = threading.RLock()  # Held by entries and exits, which may run on different threads
+        self.db = self.hub.db
         self.position_size = Config.get_position_size()
         self.stop_loss_pct = Config.STOP_LOSS_PERCENTAGE
         self.take_profit_pct = Config.TAKE_PROFIT_PERCENTAGE
+        self.max_hold_time = 4 * 3600  # Seconds before a time exit (4-hour max hold)
         
         # Market analysis parameters
         self.volume_spike_threshold = Config.VOLUME_SPIKE_THRESHOLD
         self.price_spike_threshold = Config.PRICE_SPIKE_THRESHOLD
+        self.min_confidence = 0.6
         self.scan_interval = Config.SCAN_INTERVAL
+        self.scan_workers = max(1, Config.SCAN_WORKERS)
+        self._scan_executor = None
+        self.scan_stats = {}
+        self.running = False
         
         # Strategy state
         self.active_trades = {}
         self.market_data_cache = {}
         self.last_scan_time = {}
+        self.candle_indicators = {}  # symbol -> indicators at its last candle close (event-driven mode)
         
         logger.info(f"WhaleTrap Strategy initialized - Risk Mode: {risk_mode}")
     
@@ -53,178 +88,98 @@ class WhaleTrapStrategy:
             logger.error(f"Error getting top coins: {e}")
             return ['BTCUSDT', 'ETHUSDT', 'BNBUSDT', 'ADAUSDT', 'SOLUSDT']
     
-    def get_market_data(self, symbol: str, interval: str = '1m', limit: int = 100) -> pd.DataFrame:
-        """Get and process market data for analysis"""
-        try:
-            klines = self.binance.get_klines(symbol, interval, limit)
-            
-            if not klines or 'error' in klines:
-                return pd.DataFrame()
-            
-            df = pd.DataFrame(klines, columns=[
-                'timestamp', 'open', 'high', 'low', 'close', 'volume',
-                'close_time', 'quote_volume', 'trades', 'taker_buy_base',
-                'taker_buy_quote', 'ignore'
-            ])
-            
-            # Convert to numeric
-            numeric_columns = ['open', 'high', 'low', 'close', 'volume']
-            for col in numeric_columns:
-                df[col] = pd.to_numeric(df[col])
-            
-            df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-            df.set_index('timestamp', inplace=True)
-            
-            return df
-        
-        except Exception as e:
-            logger.error(f"Error getting market data for {symbol}: {e}")
-            return pd.DataFrame()
+    def detect_volume_spike(self, indicators: Dict) -> bool:
+        """Detect unusual volume spikes"""
+        # NaN (under 20 candles of history) compares False
+        return indicators['volume_ratio'] > self.volume_spike_threshold
     
-    def calculate_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Calculate technical indicators for analysis"""
-        if df.empty:
-            return df
-        
+    def detect_price_spike(self, indicators: Dict) -> bool:
+        """Detect unusual price movements"""
+        # Check recent price change, upper Bollinger Band breakout and RSI overbought conditions
+        return (abs(indicators['price_change']) > self.price_spike_threshold / 100 or 
+               indicators['close'] > indicators['bb_upper'] * 1.02 or 
+               indicators['rsi'] > 70)
+    
+    def detect_whale_activity(self, symbol: str, order_book: Dict = None, metrics: Dict = None) -> Dict:
+        """Detect potential whale activity patterns; metrics is this symbol's row of the scan's BookMetrics"""
         try:
-            # Volume indicators
-            df['volume_sma'] = ta.volume.volume_sma(df['close'], df['volume'], window=20)
-            df['volume_ratio'] = df['volume'] / df['volume_sma']
-            
-            # Price indicators
-            df['price_sma'] = ta.trend.sma_indicator(df['close'], window=20)
-            df['price_ema'] = ta.trend.ema_indicator(df['close'], window=12)
-            df['rsi'] = ta.momentum.rsi(df['close'], window=14)
-            df['macd'] = ta.trend.macd_diff(df['close'])
-            df['bb_upper'], df['bb_middle'], df['bb_lower'] = ta.volatility.bollinger_bands(df['close'])
-            
-            # Volatility indicators
-            df['atr'] = ta.volatility.average_true_range(df['high'], df['low'], df['close'])
-            df['price_change'] = df['close'].pct_change()
-            df['volume_change'] = df['volume'].pct_change()
-            
-            return df
+            if metrics is None:
+                # A synced local book answers in microseconds without any REST call
+                local_book = None
+                if order_book is None and self.order_books is not None:
+                    local_book = self.order_books.get_book(symbol, Config.STREAM_MAX_AGE)
+                
+                if local_book is not None:
+                    metrics = local_book.whale_metrics(100)
+                else:
+                    # Get order book unless prefetched by the scan
+                    if order_book is None:
+                        order_book = self.hub.get_order_book(symbol, 100)
+                    
+                    if 'error' in order_book:
+                        return {'detected': False, 'confidence': 0}
+                    
+                    metrics = analyze_book(order_book)
+            
+            # The book's own mid price stands in for a separate ticker request
+            return self.score_whale_activity(metrics, metrics['mid_price'])
         
         except Exception as e:
-            logger.error(f"Error calculating indicators: {e}")
-            return df
+            logger.error(f"Error detecting whale activity: {e}")
+            return {'detected': False, 'confidence': 0}
     
-    def detect_volume_spike(self, df: pd.DataFrame) -> bool:
-        """Detect unusual volume spikes"""
-        if df.empty or len(df) < 20:
-            return False
+    def score_whale_activity(self, metrics: Dict, current_price: Optional[float]) -> Dict:
+        """Turn order book metrics into a whale confidence score"""
+        imbalance = metrics['imbalance']
+        large_bids = metrics['large_bids']
+        large_asks = metrics['large_asks']
         
-        try:
-            current_volume = df['volume'].iloc[-1]
-            avg_volume = df['volume'].rolling(window=20).mean().iloc[-1]
-            
-            volume_ratio = current_volume / avg_volume if avg_volume > 0 else 0
-            
-            return volume_ratio > self.volume_spike_threshold
+        whale_confidence = 0
         
-        except Exception as e:
-            logger.error(f"Error detecting volume spike: {e}")
-            return False
-    
-    def detect_price_spike(self, df: pd.DataFrame) -> bool:
-        """Detect unusual price movements"""
-        if df.empty or len(df) < 10:
-            return False
+        # Strong buying pressure
+        if imbalance > 0.2 and large_bids > large_asks:
+            whale_confidence += 0.4
         
-        try:
-            # Check recent price change
-            recent_change = abs(df['price_change'].iloc[-1])
-            
-            # Check if price is above upper Bollinger Band
-            current_price = df['close'].iloc[-1]
-            bb_upper = df['bb_upper'].iloc[-1]
-            
-            # Check RSI for overbought conditions
-            current_rsi = df['rsi'].iloc[-1]
-            
-            return (recent_change > self.price_spike_threshold / 100 or 
-                   current_price > bb_upper * 1.02 or 
-                   current_rsi > 70)
+        # Large order presence
+        if large_bids > 5 or large_asks > 5:
+            whale_confidence += 0.3
         
-        except Exception as e:
-            logger.error(f"Error detecting price spike: {e}")
-            return False
-    
-    def detect_whale_activity(self, symbol: str) -> Dict:
-        """Detect potential whale activity patterns"""
-        try:
-            # Get order book
-            order_book = self.binance.get_order_book(symbol, limit=100)
-            
-            if 'error' in order_book:
-                return {'detected': False, 'confidence': 0}
-            
-            bids = pd.DataFrame(order_book['bids'], columns=['price', 'quantity'])
-            asks = pd.DataFrame(order_book['asks'], columns=['price', 'quantity'])
-            
-            bids['price'] = pd.to_numeric(bids['price'])
-            bids['quantity'] = pd.to_numeric(bids['quantity'])
-            asks['price'] = pd.to_numeric(asks['price'])
-            asks['quantity'] = pd.to_numeric(asks['quantity'])
-            
-            # Calculate order book imbalance
-            total_bid_volume = bids['quantity'].sum()
-            total_ask_volume = asks['quantity'].sum()
-            
-            imbalance = (total_bid_volume - total_ask_volume) / (total_bid_volume + total_ask_volume)
-            
-            # Check for large orders
-            large_bids = bids[bids['quantity'] > bids['quantity'].quantile(0.9)]
-            large_asks = asks[asks['quantity'] > asks['quantity'].quantile(0.9)]
-            
-            whale_confidence = 0
-            
-            # Strong buying pressure
-            if imbalance > 0.2 and len(large_bids) > len(large_asks):
-                whale_confidence += 0.4
-            
-            # Large order presence
-            if len(large_bids) > 5 or len(large_asks) > 5:
+        # Price near support/resistance
+        if current_price:
+            price_position = (current_price - metrics['lowest_bid']) / (metrics['highest_ask'] - metrics['lowest_bid'])
+            if price_position < 0.1 or price_position > 0.9:
                 whale_confidence += 0.3
-            
-            # Price near support/resistance
-            current_price = self.binance.get_ticker_price(symbol)
-            if current_price:
-                price_position = (current_price - bids['price'].min()) / (asks['price'].max() - bids['price'].min())
-                if price_position < 0.1 or price_position > 0.9:
-                    whale_confidence += 0.3
-            
-            return {
-                'detected': whale_confidence > 0.5,
-                'confidence': whale_confidence,
-                'imbalance': imbalance,
-                'large_orders': len(large_bids) + len(large_asks)
-            }
         
-        except Exception as e:
-            logger.error(f"Error detecting whale activity: {e}")
-            return {'detected': False, 'confidence': 0}
+        return {
+            'detected': whale_confidence > 0.5,
+            'confidence': whale_confidence,
+            'imbalance': imbalance,
+            'large_orders': large_bids + large_asks,
+            'pressure': metrics.get('pressure')
+        }
     
-    def analyze_market_conditions(self, symbol: str) -> Dict:
-        """Comprehensive market analysis"""
+    def analyze_market_conditions(self, symbol: str, klines: np.ndarray = None, order_book: Dict = None,
+                                  indicators: Dict = None, book_metrics: Dict = None) -> Dict:
+        """Comprehensive market analysis; indicators and book_metrics are this symbol's rows of the scan's batches"""
         try:
-            # Get market data
-            df = self.get_market_data(symbol, '1m', 100)
-            if df.empty:
+            # Score this symbol alone when the scan did not already score the universe
+            if indicators is None:
+                if klines is None:
+                    klines = self.candle_store.get(symbol, '1m', 100)
+                indicators = self.indicator_engine.compute({symbol: klines}).row(symbol)
+            if indicators is None:
                 return {'signal': 'no_data', 'confidence': 0}
             
-            # Calculate indicators
-            df = self.calculate_technical_indicators(df)
-            
             # Check for spikes
-            volume_spike = self.detect_volume_spike(df)
-            price_spike = self.detect_price_spike(df)
+            volume_spike = self.detect_volume_spike(indicators)
+            price_spike = self.detect_price_spike(indicators)
             
             # Check whale activity
-            whale_activity = self.detect_whale_activity(symbol)
+            whale_activity = self.detect_whale_activity(symbol, order_book, book_metrics)
             
-            # Get 24hr stats
-            ticker_24h = self.binance.get_24hr_ticker(symbol)
+            # Get 24hr stats from the shared snapshot
+            snapshot = self.binance.get_24hr_snapshot()
+            ticker_24h = snapshot.get(symbol) if snapshot is not None else None
             
             # Calculate signal strength
             signal_strength = 0
@@ -245,23 +200,21 @@ class WhaleTrapStrategy:
                 signal_strength += whale_activity['confidence'] * 0.4
                 signal_type = 'whale_activity'
             
-            # Trend analysis
-            if len(df) >= 20:
-                current_price = df['close'].iloc[-1]
-                sma_20 = df['price_sma'].iloc[-1]
-                
-                if current_price > sma_20 * 1.02:  # Strong uptrend
-                    signal_strength += 0.2
-                elif current_price < sma_20 * 0.98:  # Strong downtrend
-                    signal_strength -= 0.2
+            # Trend analysis (the SMA is NaN below 20 candles, so neither branch fires)
+            current_price = indicators['close']
+            sma_20 = indicators['price_sma']
+            
+            if current_price > sma_20 * 1.02:  # Strong uptrend
+                signal_strength += 0.2
+            elif current_price < sma_20 * 0.98:  # Strong downtrend
+                signal_strength -= 0.2
             
             # RSI analysis
-            if len(df) >= 14:
-                rsi = df['rsi'].iloc[-1]
-                if rsi < 30:  # Oversold
-                    signal_strength += 0.1
-                elif rsi > 70:  # Overbought
-                    signal_strength -= 0.1
+            rsi = indicators['rsi']
+            if rsi < 30:  # Oversold
+                signal_strength += 0.1
+            elif rsi > 70:  # Overbought
+                signal_strength -= 0.1
             
             return {
                 'symbol': symbol,
@@ -270,9 +223,10 @@ class WhaleTrapStrategy:
                 'volume_spike': volume_spike,
                 'price_spike': price_spike,
                 'whale_activity': whale_activity,
-                'current_price': df['close'].iloc[-1] if not df.empty else None,
-                'volume_ratio': df['volume_ratio'].iloc[-1] if not df.empty else None,
-                'rsi': df['rsi'].iloc[-1] if not df.empty else None,
+                'current_price': current_price,
+                'volume_ratio': indicators['volume_ratio'],
+                'volatility': indicators['atr'] / current_price * 100,
+                'rsi': rsi,
                 'timestamp': datetime.now()
             }
         
@@ -286,7 +240,7 @@ class WhaleTrapStrategy:
             return False
         
         # Minimum confidence threshold
-        if analysis['confidence'] < 0.6:
+        if analysis['confidence'] < self.min_confidence:
             return False
         
         # Check if we already have an active trade for this symbol
@@ -294,7 +248,7 @@ class WhaleTrapStrategy:
             return False
         
         # Check available balance
-        balance = self.binance.get_balance('USDT')
+        balance = self.get_usdt_balance()
         if balance < self.position_size:
             return False
         
@@ -313,7 +267,7 @@ class WhaleTrapStrategy:
         position_size = base_size * confidence_multiplier * risk_multiplier
         
         # Ensure we don't exceed available balance
-        balance = self.binance.get_balance('USDT')
+        balance = self.get_usdt_balance()
         return min(position_size, balance * 0.95)  # Keep 5% buffer
     
     def execute_trade(self, symbol: str, analysis: Dict) -> bool:
@@ -328,8 +282,8 @@ class WhaleTrapStrategy:
             if position_size < 10:  # Minimum trade size
                 return False
             
-            # Get current price
-            current_price = self.binance.get_ticker_price(symbol)
+            # Get current price from a recent bulk snapshot
+            current_price = self.get_current_price(symbol, Config.PRICE_SNAPSHOT_MAX_AGE)
             if not current_price:
                 return False
             
@@ -337,12 +291,12 @@ class WhaleTrapStrategy:
             quantity = position_size / current_price
             
             # Round quantity to appropriate precision
-            symbol_info = self.binance.get_symbol_info(symbol)
-            if symbol_info:
-                lot_size_filter = next((f for f in symbol_info['filters'] if f['filterType'] == 'LOT_SIZE'), None)
-                if lot_size_filter:
-                    step_size = float(lot_size_filter['stepSize'])
-                    quantity = round(quantity / step_size) * step_size
+            rules = self.binance.symbol_index.get(symbol)
+            if rules:
+                quantity = rules.quantize_quantity(quantity)
+                if not rules.meets_minimums(quantity, current_price):
+                    logger.info(f"Order for {symbol} below exchange minimums, skipping")
+                    return False
             
             # Place market buy order
             order = self.binance.place_market_order(symbol, 'BUY', quantity)
@@ -351,6 +305,9 @@ class WhaleTrapStrategy:
                 logger.error(f"Failed to place order for {symbol}: {order['error']}")
                 return False
             
+            # Base-asset commission leaves less than was bought; every exit sells what is actually held
+            quantity = self.exit_orders.net_quantity(symbol, quantity, order)
+            
             # Calculate stop loss and take profit
             stop_loss_price = current_price * (1 - self.stop_loss_pct / 100)
             take_profit_price = current_price * (1 + self.take_profit_pct / 100)
@@ -376,6 +333,11 @@ class WhaleTrapStrategy:
                 'entry_time': datetime.now()
             }
             
+            # Stop loss and take profit rest on the exchange from the moment we are filled
+            if Config.EXCHANGE_EXITS_ENABLED:
+                self.exit_orders.attach(symbol, quantity, stop_loss_price, take_profit_price)
+            self.index_triggers(symbol)
+            
             logger.info(f"Entered trade for {symbol}: {quantity} @ {current_price}")
             logger.info(f"Stop Loss: {stop_loss_price}, Take Profit: {take_profit_price}")
             
@@ -385,36 +347,77 @@ class WhaleTrapStrategy:
             logger.error(f"Error executing trade for {symbol}: {e}")
             return False
     
+    def get_current_price(self, symbol: str, max_age: float = 0) -> Optional[float]:
+        """Get a price from the bulk snapshot, falling back to a single-symbol request"""
+        snapshot = self.binance.get_all_prices(max_age)
+        if snapshot is not None and symbol in snapshot:
+            return snapshot.get(symbol)
+        return self.binance.get_ticker_price(symbol)
+    
+    def book_exit_fills(self):
+        """Exits resting on the exchange only need their fills booked"""
+        with self.trade_lock:
+            fills, dropped = self.exit_orders.sync()
+            for fill in fills:
+                if fill['symbol'] in self.active_trades:
+                    self.close_trade(fill['symbol'], fill['reason'], fill['price'], exit_filled=True)
+            
+            # Exits that ended without a fill hand their levels back to the client-side triggers
+            for symbol in dropped:
+                if symbol in self.active_trades:
+                    self.index_triggers(symbol)
+    
+    def index_triggers(self, symbol: str):
+        """Index the levels the exchange is not already watching, plus the time exit"""
+        trade_info = self.active_trades[symbol]
+        exit_order = self.exit_orders.get(symbol)
+        self.triggers.add(
+            symbol, symbol,
+            stop_loss=trade_info['stop_loss'] if exit_order is None else None,
+            take_profit=trade_info['take_profit'] if exit_order is None or not exit_order.covers_take_profit else None,
+            deadline=trade_info['entry_time'].timestamp() + self.max_hold_time
+        )
+    
+    def on_exit_trigger(self, symbol: str, exit_reason: str, current_price: float) -> bool:
+        """Close a position whose stop loss, take profit or time exit fired; call with trade_lock held"""
+        if symbol not in self.active_trades:
+            self.triggers.remove(symbol)
+            return True
+        return self.close_trade(symbol, exit_reason, current_price)
+    
+    def start_position_monitor(self):
+        """Watch exits on their own thread so a slow scan never delays a stop"""
+        if not Config.POSITION_MONITOR_ENABLED or self.position_monitor is not None:
+            return
+        self.position_monitor = PositionMonitor(self.triggers, self.on_exit_trigger, self.binance, self.trade_lock)
+        if self.market_stream is not None:
+            self.position_monitor.attach(self.market_stream)
+        self.position_monitor.start()
+    
     def monitor_trades(self):
         """Monitor active trades and manage exits"""
-        for symbol, trade_info in list(self.active_trades.items()):
-            try:
-                current_price = self.binance.get_ticker_price(symbol)
-                if not current_price:
-                    continue
-                
-                entry_price = trade_info['entry_price']
-                stop_loss = trade_info['stop_loss']
-                take_profit = trade_info['take_profit']
-                
-                # Check stop loss
-                if current_price <= stop_loss:
-                    self.close_trade(symbol, 'stop_loss', current_price)
-                
-                # Check take profit
-                elif current_price >= take_profit:
-                    self.close_trade(symbol, 'take_profit', current_price)
-                
-                # Check time-based exit (optional)
-                time_in_trade = datetime.now() - trade_info['entry_time']
-                if time_in_trade > timedelta(hours=4):  # 4-hour max hold
-                    self.close_trade(symbol, 'time_exit', current_price)
-            
-            except Exception as e:
-                logger.error(f"Error monitoring trade for {symbol}: {e}")
+        self.book_exit_fills()
+        
+        # The position monitor thread watches prices when it runs
+        if self.position_monitor is not None:
+            return
+        
+        # Prices are needed only for client-side levels and expired holds
+        if not self.triggers.needs_prices():
+            return
+        
+        # One request prices every open position
+        snapshot = self.binance.get_all_prices(priority=PRIORITY_MONITOR)
+        if snapshot is None:
+            return
+        
+        # Only positions whose stop loss, take profit or time exit fired come back
+        with self.trade_lock:
+            for symbol, exit_reason, current_price in self.triggers.check_snapshot(snapshot):
+                self.on_exit_trigger(symbol, exit_reason, current_price)
     
-    def close_trade(self, symbol: str, exit_reason: str, exit_price: float):
-        """Close a trade and calculate PnL"""
+    def close_trade(self, symbol: str, exit_reason: str, exit_price: float, exit_filled: bool = False) -> bool:
+        """Close a trade and calculate PnL; exit_filled means an exchange-side exit already sold. True once closed"""
         try:
             trade_info = self.active_trades[symbol]
             entry_price = trade_info['entry_price']
@@ -423,8 +426,15 @@ class WhaleTrapStrategy:
             # Calculate PnL
             pnl = (exit_price - entry_price) * quantity
             
-            # Place sell order
-            order = self.binance.place_market_order(symbol, 'SELL', quantity)
+            if exit_filled:
+                order = {}
+            else:
+                # Resting exits lock the quantity; if they cannot be cancelled they may have filled
+                if not self.exit_orders.cancel(symbol):
+                    return False
+                
+                # Place sell order
+                order = self.binance.place_market_order(symbol, 'SELL', quantity)
             
             if 'error' not in order:
                 # Update database
@@ -439,56 +449,265 @@ class WhaleTrapStrategy:
                 
                 # Remove from active trades
                 del self.active_trades[symbol]
+                self.triggers.remove(symbol)
+                self.scheduler.wake(symbol)
+                return True
             
+            logger.error(f"Failed to close {symbol}: {order['error']}")
+            # The exchange exits were cancelled, so every level is watched client side again
+            self.index_triggers(symbol)
+            return False
+        
         except Exception as e:
             logger.error(f"Error closing trade for {symbol}: {e}")
+            return False
+    
+    def start_user_stream(self):
+        """Follow balances and order fills over the user data stream instead of polling the account"""
+        if not Config.USER_STREAM_ENABLED or self.user_stream is not None:
+            return
+        user_stream = UserDataStream(self.binance)
+        if user_stream.start():
+            self.user_stream = user_stream
+            self.exit_orders.attach_user_stream(user_stream)
+    
+    def get_usdt_balance(self) -> float:
+        """Free USDT from the in-memory ledger, or /api/v3/account when the stream is not live"""
+        if self.user_stream is not None and self.user_stream.is_live():
+            return self.user_stream.ledger.get_balance('USDT')
+        return self.binance.get_balance('USDT')
+    
+    def start_market_stream(self, symbols: List[str]):
+        """Stream klines and tickers for the universe instead of polling REST"""
+        # One stream and one set of local books serve every strategy in the process
+        market_stream = self.hub.start_market_stream(self, symbols)
+        if market_stream is None or market_stream is self.market_stream:
+            return
+        self.market_stream = market_stream
+        self.order_books = self.hub.order_books
+        if self.position_monitor is not None:
+            self.position_monitor.attach(self.market_stream)
+    
+    def prefetch_market_data(self, symbols: List[str]) -> Tuple[Dict, Dict]:
+        """Refresh candles and fetch order books for all symbols concurrently"""
+        # Symbols with a synced local book need no REST depth snapshot
+        book_symbols = symbols
+        if self.order_books is not None:
+            book_symbols = [symbol for symbol in symbols if self.order_books.get_book(symbol, Config.STREAM_MAX_AGE) is None]
+        
+        async def fetch():
+            return await asyncio.gather(
+                self.hub.refresh_klines_async(symbols, '1m', 100),
+                self.hub.get_order_books_async(book_symbols, 100)
+            )
+        
+        _, books_by_symbol = get_background_loop().run(fetch())
+        klines_by_symbol = {symbol: self.candle_store.view(symbol, '1m', 100) for symbol in symbols}
+        return klines_by_symbol, books_by_symbol
+    
+    def analyze_universe(self, symbols: List[str], klines_by_symbol: Dict, books_by_symbol: Dict,
+                         indicators) -> Dict[str, Dict]:
+        """Analyze prefetched symbols, serially unless SCAN_WORKERS asks for a thread pool"""
+        # Every prefetched book is measured in one vectorized batch
+        book_metrics = analyze_books(books_by_symbol)
+        
+        def analyze(symbol):
+            start = time.perf_counter()
+            analysis = self.analyze_market_conditions(
+                symbol, klines_by_symbol.get(symbol), books_by_symbol.get(symbol),
+                indicators=indicators.row(symbol), book_metrics=book_metrics.row(symbol)
+            )
+            return symbol, analysis, time.perf_counter() - start
+        
+        scored = [symbol for symbol in symbols if symbol in indicators]
+        start = time.perf_counter()
+        if self.scan_workers > 1 and len(scored) > 1:
+            if self._scan_executor is None:
+                self._scan_executor = ThreadPoolExecutor(max_workers=self.scan_workers, thread_name_prefix='whale-scan')
+            results = list(self._scan_executor.map(analyze, scored))
+        else:
+            results = [analyze(symbol) for symbol in scored]
+        elapsed = time.perf_counter() - start
+        
+        busy = sum(result[2] for result in results)
+        workers = min(self.scan_workers, max(len(scored), 1))
+        self.scan_stats = {
+            'symbols': len(scored),
+            'workers': workers,
+            'analysis_time': round(elapsed, 4),
+            'busy_time': round(busy, 4),
+            'utilization': round(busy / (workers * elapsed), 3) if elapsed > 0 else 0.0
+        }
+        return {symbol: analysis for symbol, analysis, _ in results}
     
     def scan_market(self):
         """Main market scanning function"""
+        cycle_start = time.perf_counter()
+        self.scheduler.begin_cycle()
         try:
             symbols = self.get_top_coins()
-            
-            for symbol in symbols:
-                # Skip if we already have an active trade
-                if symbol in self.active_trades:
-                    continue
+            self.start_market_stream(symbols)
+            candidates = [symbol for symbol in symbols if symbol not in self.active_trades]
+            
+            # Full analysis costs a klines refresh (2) and a depth snapshot (5) per symbol
+            if Config.SCREENER_ENABLED:
+                candidates = self.screener.screen(self.binance.get_24hr_snapshot(), candidates, weight_per_symbol=7)
+            # Quiet symbols and ones we just passed on are revisited less often
+            candidates = self.scheduler.select(candidates)
+            klines_by_symbol, books_by_symbol = self.prefetch_market_data(candidates)
+            
+            # One vectorized pass scores the whole universe
+            indicators = self.indicator_engine.compute(klines_by_symbol)
+            analyses = self.analyze_universe(candidates, klines_by_symbol, books_by_symbol, indicators)
+            
+            # Decisions stay on this thread, in universe order, so trades never race each other
+            for symbol in candidates:
+                # Out of time for this cycle: the rest stay due and go first next cycle
+                if self.scheduler.past_deadline():
+                    break
                 
-                # Analyze market conditions
-                analysis = self.analyze_market_conditions(symbol)
+                analysis = analyses.get(symbol)
+                if analysis is None:
+                    continue
                 
                 # Save market data
                 if analysis.get('current_price'):
                     self.db.save_market_data(symbol, analysis['current_price'], 0)
                 
                 # Execute trade if conditions are met
-                if self.should_enter_trade(analysis):
-                    self.execute_trade(symbol, analysis)
+                with self.trade_lock:
+                    entered = self.should_enter_trade(analysis) and self.execute_trade(symbol, analysis)
                 
-                # Small delay to avoid rate limits
-                time.sleep(0.1)
+                self.scheduler.schedule(
+                    symbol,
+                    volatility=analysis.get('volatility'),
+                    volume_ratio=analysis.get('volume_ratio'),
+                    signal=analysis['confidence'],
+                    held=symbol in self.active_trades,
+                    rejected=analysis['confidence'] >= self.min_confidence and not entered
+                )
             
-            # Monitor existing trades
-            self.monitor_trades()
+            self.housekeeping()
             
-            # Save wallet balance
-            balance = self.binance.get_balance('USDT')
-            self.db.save_wallet_balance(balance)
+            self.scan_stats['cycle_time'] = round(time.perf_counter() - cycle_start, 4)
+            logger.info(f"Scan cycle: {self.scan_stats['symbols']} symbols in {self.scan_stats['cycle_time']:.2f}s, "
+                        f"worker utilization {self.scan_stats['utilization']:.0%}")
             
         except Exception as e:
             logger.error(f"Error in market scan: {e}")
+        finally:
+            self.scheduler.end_cycle()
+    
+    def housekeeping(self):
+        """Monitor open trades and save the wallet balance"""
+        # Monitor existing trades
+        self.monitor_trades()
+        
+        # Save wallet balance
+        balance = self.get_usdt_balance()
+        self.db.save_wallet_balance(balance)
+    
+    # Event-driven mode: StrategyEngine calls these from its dispatcher thread
+    
+    def evaluate_event(self, symbol: str, indicators: Dict, book_metrics: Dict = None):
+        """Decide on one symbol from its latest candle indicators and book"""
+        if symbol in self.active_trades:
+            return
+        analysis = self.analyze_market_conditions(symbol, indicators=indicators, book_metrics=book_metrics)
+        with self.trade_lock:
+            if self.should_enter_trade(analysis):
+                self.execute_trade(symbol, analysis)
+    
+    def on_candle_close(self, symbol: str, bars: np.ndarray):
+        """Rescore indicators once per closed candle"""
+        indicators = self.indicator_engine.compute({symbol: bars}).row(symbol)
+        if indicators is None:
+            return
+        self.candle_indicators[symbol] = indicators
+        self.evaluate_event(symbol, indicators)
+    
+    def on_book_update(self, symbol: str, book):
+        """Whale activity moves with the book, so re-decide on the last candle's indicators"""
+        indicators = self.candle_indicators.get(symbol)
+        if indicators is not None:
+            self.evaluate_event(symbol, indicators, book.whale_metrics(100))
+    
+    def on_fill(self, order: Dict):
+        """Book exchange-side exits as soon as they trade"""
+        if order['side'] == 'SELL' and order['symbol'] in self.active_trades:
+            self.book_exit_fills()
+    
+    def run_event_driven(self):
+        """Trade on candle closes and book updates from the market stream instead of scanning on a clock"""
+        self.start_market_stream(self.get_top_coins())
+        if self.market_stream is None:
+            return False
+        
+        self.engine = StrategyEngine(self.candle_store)
+        self.engine.register(self)
+        self.engine.attach(self.market_stream)
+        if self.order_books is not None:
+            self.engine.attach_order_books(self.order_books)
+        if self.user_stream is not None:
+            self.engine.attach_user_stream(self.user_stream)
+        # Housekeeping runs on the dispatcher thread too, so it never races a handler
+        self.engine.every(self.scan_interval, self.housekeeping)
+        
+        try:
+            self.engine.run()
+        except KeyboardInterrupt:
+            logger.info("Strategy stopped by user")
+            self.engine.stop()
+        return True
+    
+    def stop(self):
+        """Stop the scan loop or event engine, exit monitoring and streams, and release the scan workers"""
+        self.running = False
+        if self.engine is not None:
+            self.engine.stop()
+        if self.position_monitor is not None:
+            self.position_monitor.stop()
+        if self.user_stream is not None:
+            self.user_stream.stop()
+        # The market stream is shared, so only this strategy's symbols leave it
+        self.hub.release_market_stream(self)
+        if self._scan_executor is not None:
+            self._scan_executor.shutdown(wait=True)
+            self._scan_executor = None
     
     def run(self):
         """Main strategy loop"""
         logger.info("Starting WhaleTrap Strategy...")
         
-        while True:
+        self.binance.warm_up()
+        self.start_user_stream()
+        self.start_position_monitor()
+        
+        self.running = True
+        if Config.EVENT_DRIVEN and self.run_event_driven():
+            return
+        
+        while self.running:
             try:
                 self.scan_market()
-                time.sleep(self.scan_interval)
+                self.scheduler.wait_next()
                 
             except KeyboardInterrupt:
                 logger.info("Strategy stopped by user")
                 break
             except Exception as e:
                 logger.error(f"Strategy error: {e}")
-                time.sleep(60)  # Wait before retrying 
\ No newline at end of file
+                time.sleep(60)  # Wait before retrying 
+
+_analysis_strategy = None
+_analysis_strategy_lock = threading.Lock()
+
+def get_analysis_strategy() -> WhaleTrapStrategy:
+    """Get the process-wide strategy the web apps use for on-demand analysis"""
+    global _analysis_strategy
+
+    if _analysis_strategy is None:
+        with _analysis_strategy_lock:
+            if _analysis_strategy is None:
+                _analysis_strategy = WhaleTrapStrategy()
+    return _analysis_strategy